@@ -0,0 +1,57 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# compare the speed of the JSON codecs on recorded SauceNAO API responses,
+# usage: python bin/benchmark_codec.py [--number 2000] [responses...]
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from saucenao.codec import JSON_CODECS, get_codec  # noqa: E402
+
+DEFAULT_RESPONSE = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'tests', 'resources',
+                                'search_results.json')
+
+
+def benchmark():
+    """Decode the passed responses with every available codec and print the average time per response,
+    the previous path decoded the text of the response before parsing it, which is measured as "json (text)"
+
+    :return:
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('responses', nargs='*', default=[DEFAULT_RESPONSE], help='recorded SauceNAO API responses')
+    parser.add_argument('-n', '--number', default=2000, type=int, help='decoded responses per measurement')
+    args = parser.parse_args()
+
+    responses = []
+    for response in args.responses:
+        with open(response, 'rb') as f:
+            responses.append(f.read())
+
+    def print_duration(name, function):
+        duration = min(timeit.repeat(function, number=args.number, repeat=3))
+        print("{0:>12s}: {1:8.3f} µs per response".format(name, duration / (args.number * len(responses)) * 1e6))
+
+    expected = [json.loads(content.decode('utf-8')) for content in responses]
+    print_duration('json (text)', lambda: [json.loads(content.decode('utf-8')) for content in responses])
+    for name in sorted(JSON_CODECS):
+        try:
+            codec = get_codec(name)
+        except ImportError as e:
+            print("{0:>12s}: skipped, {1:s}".format(name, str(e)))
+            continue
+
+        if [codec.loads(content) for content in responses] != expected:
+            print("{0:>12s}: skipped, decoded responses differ".format(name))
+            continue
+        print_duration(name, lambda: [codec.loads(content) for content in responses])
+
+
+if __name__ == '__main__':
+    benchmark()
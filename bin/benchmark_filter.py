@@ -0,0 +1,119 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# compare the compiled filter plan with the previous per file evaluation on a synthetic directory,
+# usage: python bin/benchmark_filter.py [--entries 1000000] [--directory path]
+
+import argparse
+import datetime
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from stat import ST_MTIME, ST_SIZE
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from saucenao.files.constraint import Constraint  # noqa: E402
+from saucenao.files.filter import Filter  # noqa: E402
+
+SUFFIXES = ('.jpg', '.png', '.gif', '.txt', '.json', '.mp4', '.webm', '.zip', '.psd', '.html')
+
+
+def create_directory(directory: str, entries: int):
+    """Create the empty files of the synthetic directory, every tenth file is an image
+
+    :type directory: str
+    :type entries: int
+    :return:
+    """
+    flags = os.O_CREAT | os.O_WRONLY
+    for i in range(entries):
+        os.close(os.open(os.path.join(directory, 'file_{0:07d}{1:s}'.format(i, SUFFIXES[i % len(SUFFIXES)])), flags))
+
+
+def get_timestamp_from_datestring(date_string) -> float:
+    """Previous conversion of the date string, evaluated for every file
+
+    :param date_string:
+    :return:
+    """
+    if re.match(r'\d+.\d+.\d+ \d+:\d+:\d+', date_string):
+        return datetime.datetime.strptime(date_string, "%d.%m.%Y %H:%M:%S").timestamp()
+    elif re.match(r'\d+.\d+.\d+ \d+:\d+', date_string):
+        return datetime.datetime.strptime(date_string, "%d.%m.%Y %H:%M").timestamp()
+    return datetime.datetime.strptime(date_string, "%d.%m.%Y").timestamp()
+
+
+def previous_apply(directory: str, file_filter: Filter):
+    """Previous evaluation of the filter: listing the directory, checking every FSO with separate syscalls
+    and the constraints in a fixed order with the date parsed per file
+
+    :type directory: str
+    :type file_filter: Filter
+    :return:
+    """
+    for file_system_object in os.listdir(directory):
+        abs_path = os.path.join(directory, file_system_object)
+        if not os.path.exists(abs_path):
+            continue
+        if file_filter._filter_assert_is_file and not os.path.isfile(abs_path):
+            continue
+        file_stats = os.stat(abs_path)
+        if file_filter._filter_modified_date and not file_filter._filter_modified_date.cmp_func(
+                file_stats[ST_MTIME], get_timestamp_from_datestring(file_filter._filter_modified_date.value)):
+            continue
+        if file_filter._filter_name and not file_filter._filter_name.cmp_func(file_system_object,
+                                                                              file_filter._filter_name.value):
+            continue
+        if file_filter._filter_file_type and not file_filter._filter_file_type.cmp_func(
+                Path(abs_path).suffix, file_filter._filter_file_type.value):
+            continue
+        if file_filter._filter_file_size and not file_filter._filter_file_size.cmp_func(
+                file_stats[ST_SIZE], file_filter._filter_file_size.value):
+            continue
+        yield file_system_object
+
+
+def benchmark():
+    """Filter the synthetic directory with both evaluations and print the duration per entry
+
+    :return:
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-e', '--entries', default=1000000, type=int, help='entries of the synthetic directory')
+    parser.add_argument('-d', '--directory', help='existing directory to filter instead of a synthetic one')
+    args = parser.parse_args()
+
+    directory = args.directory
+    if directory is None:
+        directory = tempfile.mkdtemp()
+        start = time.perf_counter()
+        create_directory(directory, args.entries)
+        print("created {0:d} entries in {1:.1f} s".format(args.entries, time.perf_counter() - start))
+
+    file_filter = Filter(assert_is_file=True,
+                         modified_date=Constraint('01.01.2000', cmp_func=Constraint.cmp_value_bigger_or_equal),
+                         file_type=Constraint(['.jpg', '.png'], cmp_func=Constraint.cmp_value_in),
+                         size=Constraint(0, cmp_func=Constraint.cmp_value_bigger_or_equal))
+    try:
+        entries = max(1, len(os.listdir(directory)))
+        results = []
+        for name, function in (('previous', lambda: previous_apply(directory, file_filter)),
+                               ('compiled', lambda: file_filter.apply(directory))):
+            start = time.perf_counter()
+            results.append(sorted(function()))
+            duration = time.perf_counter() - start
+            print("{0:>8s}: {1:7.2f} s, {2:6.2f} µs per entry, {3:d} matches".format(
+                name, duration, duration / entries * 1e6, len(results[-1])))
+        print("parity: {0}".format(results[0] == results[1]))
+    finally:
+        if args.directory is None:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    benchmark()
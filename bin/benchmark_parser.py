@@ -0,0 +1,51 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# compare the speed of the HTML parser engines on recorded SauceNAO pages,
+# usage: python bin/benchmark_parser.py [--number 200] [pages...]
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from saucenao.parser import PARSER_ENGINES, SoupResultParser, get_parser  # noqa: E402
+
+DEFAULT_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'tests', 'resources',
+                            'search_results.html')
+
+
+def benchmark():
+    """Parse the passed pages with every available engine and print the average time per page
+
+    :return:
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('pages', nargs='*', default=[DEFAULT_PAGE], help='recorded SauceNAO result pages')
+    parser.add_argument('-n', '--number', default=200, type=int, help='parsed pages per measurement')
+    args = parser.parse_args()
+
+    pages = []
+    for page in args.pages:
+        with open(page, 'r', encoding='utf-8') as f:
+            pages.append(f.read())
+
+    expected = [SoupResultParser().parse(html) for html in pages]
+    for engine in sorted(PARSER_ENGINES):
+        try:
+            result_parser = get_parser(engine)
+        except ImportError as e:
+            print("{0:>5s}: skipped, {1:s}".format(engine, str(e)))
+            continue
+
+        parity = [result_parser.parse(html) for html in pages] == expected
+        duration = min(timeit.repeat(lambda: [result_parser.parse(html) for html in pages],
+                                     number=args.number, repeat=3))
+        print("{0:>5s}: {1:8.3f} ms per page, parity: {2}".format(
+            engine, duration / (args.number * len(pages)) * 1000, parity))
+
+
+if __name__ == '__main__':
+    benchmark()
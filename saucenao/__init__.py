@@ -4,11 +4,22 @@
 import argparse
 import logging
 
+from saucenao.cache import ResultCache
 from saucenao.files import Constraint, FileHandler, Filter
+from saucenao.files.manifest import ScanManifest
+from saucenao.files.walker import DirectoryWalker
+from saucenao.index import PerceptualIndex
+from saucenao.journal import ProgressJournal
+from saucenao.keypool import ApiKey
+from saucenao.limiter import FileLockLimiter
+from saucenao.parser import PARSER_ENGINES
+from saucenao.preprocess import ImagePreprocessor
+from saucenao.result import SauceNaoResult
 from saucenao.saucenao import SauceNao, SauceNaoDatabase
 from saucenao.worker import Worker
+from saucenao.aio import AsyncSauceNao, AsyncWorker
 
-__all__ = [SauceNao, SauceNaoDatabase, FileHandler, Filter, Constraint]
+__all__ = [SauceNao, SauceNaoDatabase, SauceNaoResult, FileHandler, Filter, Constraint]
 
 
 def run_application():
@@ -21,9 +32,14 @@ def run_application():
     parser.add_argument('-db', '--databases', default=999, type=int, help='which databases should be searched')
     parser.add_argument('-min', '--minimum-similarity', default=65, type=float,
                         help='minimum similarity percentage')
+    parser.add_argument('-maxr', '--max-results', type=int, help='maximum amount of results per image')
     parser.add_argument('-c', '--combine-api-types', action='store_true',
                         help='combine html and json api response to retrieve more information')
+    parser.add_argument('-e', '--enrich-results', action='store_true',
+                        help='retrieve the information of combined api types with a single json api request')
     parser.add_argument('-k', '--api-key', help='API key of your account on SauceNao')
+    parser.add_argument('-ks', '--api-keys', type=str,
+                        help='comma separated pool of API keys used in turns, suffix premium keys with ":premium"')
     parser.add_argument('-p', '--premium', help='is API key related user premium')
     parser.add_argument('-x', '--exclude-categories', type=str, help='exclude specific categories from moving')
     parser.add_argument('-mv', '--move-to-categories', action='store_true', help='move images to categories')
@@ -32,6 +48,27 @@ def run_application():
     parser.add_argument('-o', '--output-type', default=0, type=int, help='0(html) or 2(json) API response')
     parser.add_argument('-sf', '--start-file',
                         help='with which file the checks start in case of after reaching the daily limit')
+    parser.add_argument('-rl', '--rate-limit-file',
+                        help='state file of the rate limiter to share the search limit with other processes, '
+                             'not supported with --api-keys')
+    parser.add_argument('-maxd', '--max-upload-dimension', type=int,
+                        help='downscale images exceeding the dimension before uploading them, requires Pillow')
+    parser.add_argument('-maxb', '--max-upload-bytes', type=int,
+                        help='re-encode images exceeding the byte budget before uploading them, requires Pillow')
+    parser.add_argument('-cl', '--cluster-threshold', type=int,
+                        help='check near-duplicates only once, maximum distance of their perceptual hashes (0-64), '
+                             'requires Pillow')
+    parser.add_argument('-cache', '--cache-file', help='SQLite file to cache the results of already checked images')
+    parser.add_argument('-idx', '--index-file',
+                        help='SQLite file of the perceptual index to reuse the results of similar identified images, '
+                             'requires Pillow')
+    parser.add_argument('-idxd', '--index-distance', default=4, type=int,
+                        help='maximum distance of the perceptual hashes of similar images in a new index')
+    parser.add_argument('-pe', '--parser-engine', choices=sorted(PARSER_ENGINES),
+                        help='engine parsing the HTML responses, defaults to lxml if installed, else html')
+    parser.add_argument('-stream', '--stream-responses', action='store_true',
+                        help='parse HTML responses while they arrive and stop reading them once the results are '
+                             'complete')
     parser.add_argument('-log', '--log-level', default=logging.ERROR, type=int,
                         help='which log level should be used, check logging._levelNames for options')
 
@@ -42,11 +79,30 @@ def run_application():
                         help='filters files for modified after given date. '
                              'Format of date has to match "d.m.Y[ H:M[:S]]"')
 
+    parser.add_argument('-r', '--recursive', action='store_true',
+                        help='check the files of all subdirectories, the subdirectories are scanned concurrently')
+    parser.add_argument('-inc', '--include', action='append',
+                        help='only check files with a relative path matching the glob, can be used multiple times')
+    parser.add_argument('-exc', '--exclude', action='append',
+                        help='skip files and directories with a relative path matching the glob, '
+                             'can be used multiple times')
+    parser.add_argument('-depth', '--max-depth', type=int, help='maximum depth of the checked subdirectories')
+    parser.add_argument('-mf', '--manifest-file', type=str,
+                        help='SQLite manifest of the checked files, following runs only check new, modified '
+                             'or failed files')
+    parser.add_argument('-jf', '--journal-file', type=str,
+                        help='journal of the completed files, interrupted runs resume where they stopped')
+    parser.add_argument('-ww', '--walk-workers', default=DirectoryWalker.DEFAULT_WORKERS, type=int,
+                        help='threads scanning the subdirectories concurrently')
+
     parser.add_argument('-tmin', '--title-minimum-similarity', default=95, type=float,
                         help='minimum similarity percentage for title search with BakaUpdates, MyAnimeList and '
                              'VisualNovelDatabase')
 
     args = parser.parse_args()
+    if args.rate_limit_file and args.api_keys:
+        # the keys of the pool are paced by their own limiters, the shared limit wouldn't be used
+        parser.error('--rate-limit-file can not be combined with --api-keys')
 
     file_filter = Filter(assert_is_file=True)
     if args.filter_creation_date:
@@ -55,12 +111,38 @@ def run_application():
     if args.filter_modified_date:
         file_filter._filter_modified_date = Constraint(value=args.filter_modified_date,
                                                        cmp_func=Constraint.cmp_value_bigger_or_equal)
-    working_files = FileHandler.get_files(args.dir, file_filter)
+    manifest = ScanManifest(args.manifest_file) if args.manifest_file else None
+    working_files = FileHandler.get_files(args.dir, file_filter, recursive=args.recursive, include=args.include,
+                                          exclude=args.exclude, max_depth=args.max_depth, workers=args.walk_workers,
+                                          manifest=manifest)
+
+    preprocessor = None
+    if args.max_upload_dimension or args.max_upload_bytes:
+        preprocessor = ImagePreprocessor()
+        if args.max_upload_dimension:
+            preprocessor.max_dimension = args.max_upload_dimension
+        if args.max_upload_bytes:
+            preprocessor.max_bytes = args.max_upload_bytes
+
+    api_keys = None
+    if args.api_keys:
+        api_keys = [ApiKey.from_string(key) for key in args.api_keys.split(',') if key.strip()]
 
     saucenao_worker = Worker(files=working_files, directory=args.dir, databases=args.databases,
-                             minimum_similarity=args.minimum_similarity, combine_api_types=args.combine_api_types,
+                             minimum_similarity=args.minimum_similarity, max_results=args.max_results,
+                             combine_api_types=args.combine_api_types, enrich_results=args.enrich_results,
                              api_key=args.api_key, is_premium=args.premium,
                              exclude_categories=args.exclude_categories, move_to_categories=args.move_to_categories,
                              use_author_as_category=args.use_author_as_category, start_file=args.start_file,
-                             log_level=args.log_level, title_minimum_similarity=args.title_minimum_similarity)
+                             log_level=args.log_level, title_minimum_similarity=args.title_minimum_similarity,
+                             api_keys=api_keys, preprocessor=preprocessor,
+                             cache=ResultCache(args.cache_file) if args.cache_file else None,
+                             cluster_threshold=args.cluster_threshold,
+                             index=PerceptualIndex(args.index_file, max_distance=args.index_distance)
+                             if args.index_file else None, parser_engine=args.parser_engine,
+                             stream_responses=args.stream_responses, manifest=manifest,
+                             journal=ProgressJournal(args.journal_file) if args.journal_file else None)
+    if args.rate_limit_file:
+        saucenao_worker.limiter = FileLockLimiter(
+            path=args.rate_limit_file, limit=saucenao_worker.LIMIT_30_SECONDS[saucenao_worker.account_type])
     return saucenao_worker.run()
@@ -0,0 +1,209 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, AsyncGenerator
+
+from saucenao.exceptions import RetryLaterException, UnknownStatusCodeException
+from saucenao.files.manifest import ScanManifest
+from saucenao.saucenao import SauceNao
+from saucenao.worker import Worker
+
+
+class AsyncSauceNao(SauceNao):
+    """
+    asyncio client for SauceNao, the blocking searches are executed in a thread pool
+    so multiple uploads can be in flight inside one event loop
+    """
+
+    def __init__(self, *args, executor=None, **kwargs):
+        """Initializing function
+
+        :type executor: concurrent.futures.Executor
+        :type args:
+        :type kwargs:
+        """
+        super().__init__(*args, **kwargs)
+        # one search slot per allowed search in 30 seconds
+        self.concurrency = max(1, int(self.search_limit_30s))
+
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        self.executor = executor
+
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Close the session and shut down the executor if they were created by this instance
+
+        :return:
+        """
+        super().close()
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
+
+    async def check_file(self, file_name: str) -> list:
+        """Check the given file for results on SauceNAO, the file is opened and streamed inside of the executor
+
+        :type file_name: str
+        :return:
+        """
+        return (await self._check_file_async(file_name))[0]
+
+    async def check_file_object(self, file_content: BinaryIO) -> list:
+        """Check the passed file content for results on SauceNAO
+
+        :type file_content: BinaryIO
+        :return:
+        """
+        # the rate limiter blocks inside of the executor threads, not in the event loop
+        async with self.semaphore:
+            return await self._run_in_executor(super().check_file_object, file_content)
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Property for the semaphore limiting the searches in flight,
+        asyncio primitives get bound to the running loop on creation, so it's created lazily
+
+        :return:
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def _run_in_executor(self, func, *args):
+        """Run the blocking function in the executor of this instance
+
+        :type func: Callable
+        :type args:
+        :return:
+        """
+        return await asyncio.get_event_loop().run_in_executor(self.executor, func, *args)
+
+    async def _check_file_async(self, file_name: str, with_digest: bool = False) -> tuple:
+        """Check the given file for results on SauceNAO, the file is opened and streamed inside of the executor
+
+        :type file_name: str
+        :type with_digest: bool
+        :return: the filtered results and the SHA-256 hex digest of the file if requested
+        """
+        async with self.semaphore:
+            return await self._run_in_executor(self._check_file, file_name, with_digest)
+
+
+class AsyncWorker(Worker, AsyncSauceNao):
+    """
+    asyncio worker class for checking a list of files concurrently
+    """
+
+    # marks the end of the files pulled in the executor
+    _DONE = object()
+
+    async def run(self) -> AsyncGenerator[dict, None]:
+        """Check all files with SauceNao and execute the specified tasks,
+        results are yielded in the order the searches complete
+
+        :return:
+        """
+        # searches which are in flight or whose results weren't yielded yet
+        tasks = set()
+        finished = False
+        try:
+            async for file_name, duplicates in self.__iterate_clusters():
+                if len(tasks) >= self.concurrency:
+                    done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        tasks.discard(task)
+                        for result in task.result():
+                            yield result
+
+                tasks.add(asyncio.ensure_future(self.__check(file_name, duplicates)))
+
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.discard(task)
+                    for result in task.result():
+                        yield result
+            finished = True
+        finally:
+            # the remaining searches get cancelled if a search failed or the consumer stopped iterating
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            # the searches complete out of order, the journal only contains the completed files
+            self._end_journal(finished)
+
+    async def __iterate_clusters(self):
+        """Yield the files to check paired with their near-duplicates,
+        the files are pulled in the executor since walking directories, reading the manifest and hashing blocks
+
+        :return:
+        """
+        if self.cluster_threshold is not None:
+            # hashing all files for the clusters would block the event loop
+            for cluster in await self._run_in_executor(list, self.clusters):
+                yield cluster
+            return
+
+        clusters = iter(self.clusters)
+        while True:
+            cluster = await self._run_in_executor(next, clusters, self._DONE)
+            if cluster is self._DONE:
+                return
+            yield cluster
+
+    async def __check(self, file_name, duplicates: list) -> list:
+        """Check the file and execute the specified tasks for it and its duplicates in the executor
+
+        :type file_name: str|BinaryIO
+        :type duplicates: list
+        :return:
+        """
+        attempt = 0
+        digest = None
+        # repeated attempts of file objects start from the position of the first attempt again
+        position = None if isinstance(file_name, str) else file_name.tell()
+        while True:
+            try:
+                if isinstance(file_name, str):
+                    filtered_results, digest = await self._check_file_async(file_name, self.manifest is not None)
+                else:
+                    if attempt:
+                        file_name.seek(position)
+                    filtered_results = await self.check_file_object(file_name)
+                break
+            except RetryLaterException as e:
+                attempt += 1
+                if not self.retry_policy.can_retry(attempt):
+                    await self._run_in_executor(self._record, file_name, ScanManifest.STATUS_FAILED)
+                    raise UnknownStatusCodeException(str(e))
+
+                # only this file waits for its retry, the other searches keep running
+                delay = self.retry_policy.get_delay(attempt)
+                self.logger.info("{0:s}, retrying {1} after {2:.2f} seconds".format(str(e), file_name, delay))
+                await asyncio.sleep(delay)
+            except Exception:
+                await self._run_in_executor(self._record, file_name, ScanManifest.STATUS_FAILED)
+                raise
+
+        status = ScanManifest.STATUS_FOUND if filtered_results else ScanManifest.STATUS_NOT_FOUND
+        results = []
+        for checked_file_name in [file_name] + duplicates:
+            # recorded before the results get processed, which may move the file,
+            # the duplicates have a different content and get hashed by the manifest
+            content_hash = digest if checked_file_name is file_name else None
+            await self._run_in_executor(self._record, checked_file_name, status, content_hash)
+            result = await self._run_in_executor(self._process_results, checked_file_name, filtered_results)
+            await self._run_in_executor(self._journal_completed, checked_file_name)
+            if result:
+                results.append(result)
+        return results
@@ -0,0 +1,142 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import sqlite3
+import threading
+import time
+
+from saucenao import codec
+
+
+class ResultCache(object):
+    """
+    persistent cache of the sorted search results keyed by the digest of the file content and the search options,
+    stored in SQLite so multiple processes can share it safely
+    """
+
+    # evict the least recently used entries only every n inserts, counting the entries isn't free
+    EVICTION_INTERVAL = 100
+
+    def __init__(self, path: str, ttl: float = 30 * 24 * 60 * 60, negative_ttl: float = 24 * 60 * 60,
+                 max_entries: int = 100000):
+        """Initializing function
+
+        :type path: str
+        :type ttl: float
+        :type negative_ttl: float
+        :type max_entries: int
+        """
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self._inserts = 0
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS results ('
+                                 'key TEXT PRIMARY KEY, results TEXT NOT NULL, empty INTEGER NOT NULL, '
+                                 'created REAL NOT NULL, accessed REAL NOT NULL)')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def get_key(digest: str, databases, output_type) -> str:
+        """Build the cache key of the file content digest and the search options
+
+        :type digest: str
+        :type databases: SauceNaoDatabase|int
+        :type output_type: int|str
+        :return:
+        """
+        return '{0:s}:{1}:{2}'.format(digest, getattr(databases, 'value', databases), output_type)
+
+    def get(self, key: str):
+        """Return the cached results or None if they are not cached or expired
+
+        :type key: str
+        :return: list|None
+        """
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute('SELECT results, empty, created FROM results WHERE key = ?',
+                                           (key,)).fetchone()
+            if row is not None:
+                results, empty, created = row
+                if now - created <= (self.negative_ttl if empty else self.ttl):
+                    self._connection.execute('UPDATE results SET accessed = ? WHERE key = ?', (now, key))
+                    self.hits += 1
+                    return codec.loads(results)
+                self._connection.execute('DELETE FROM results WHERE key = ?', (key,))
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, results: list):
+        """Cache the results, empty results are cached with the negative TTL
+
+        :type key: str
+        :type results: list
+        :return:
+        """
+        now = time.time()
+        with self._lock:
+            self._connection.execute('INSERT OR REPLACE INTO results (key, results, empty, created, accessed) '
+                                     'VALUES (?, ?, ?, ?, ?)', (key, codec.dumps(results), not results, now, now))
+            self._inserts += 1
+            if self._inserts % self.EVICTION_INTERVAL == 0:
+                self.__evict()
+
+    def evict(self):
+        """Remove the expired and least recently used entries exceeding the maximum amount of entries
+
+        :return:
+        """
+        with self._lock:
+            self.__evict()
+
+    def __evict(self):
+        now = time.time()
+        self._connection.execute('DELETE FROM results WHERE (empty AND created < ?) OR created < ?',
+                                 (now - self.negative_ttl, now - self.ttl))
+        self._connection.execute('DELETE FROM results WHERE key IN '
+                                 '(SELECT key FROM results ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+                                 (self.max_entries,))
+
+    @property
+    def entries(self) -> int:
+        """Property for the amount of cached entries
+
+        :return:
+        """
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    @property
+    def stats(self) -> dict:
+        """Property for the hit and miss statistics of this instance
+
+        :return:
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        """Close the database connection
+
+        :return:
+        """
+        with self._lock:
+            self._connection.close()
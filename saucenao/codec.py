@@ -0,0 +1,124 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class JsonCodec(object):
+    """
+    JSON codec of the standard library, decodes bytes and strings and encodes to strings
+    """
+
+    name = 'json'
+    available = True
+
+    @staticmethod
+    def loads(data):
+        """Decode the JSON document, bytes are decoded as UTF-8 by the codec itself
+
+        :type data: bytes|str
+        :return:
+        """
+        return json.loads(data)
+
+    @staticmethod
+    def dumps(obj) -> str:
+        """Encode the object as JSON document
+
+        :type obj: object
+        :return:
+        """
+        return json.dumps(obj)
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    orjson codec, decodes bytes directly without building a string first
+    """
+
+    name = 'orjson'
+    available = orjson is not None
+
+    @staticmethod
+    def loads(data):
+        return orjson.loads(data)
+
+    @staticmethod
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode('utf-8')
+
+
+class UjsonCodec(JsonCodec):
+    """
+    ujson codec, decodes bytes directly without building a string first
+    """
+
+    name = 'ujson'
+    available = ujson is not None
+
+    @staticmethod
+    def loads(data):
+        return ujson.loads(data)
+
+    @staticmethod
+    def dumps(obj) -> str:
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+
+
+JSON_CODECS = {
+    JsonCodec.name: JsonCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    UjsonCodec.name: UjsonCodec,
+}
+
+# the fastest installed codec is used by default, all codecs decode to the same structures
+DEFAULT_JSON_CODEC = next(codec.name for codec in (OrjsonCodec, UjsonCodec, JsonCodec) if codec.available)
+
+
+def get_codec(name: str = None):
+    """Return the codec with the passed name, the fastest installed codec is used if none is passed
+
+    :type name: str
+    :return: JsonCodec
+    """
+    if name is None:
+        name = DEFAULT_JSON_CODEC
+
+    if name not in JSON_CODECS:
+        raise ValueError("unknown JSON codec: {0!r}, available codecs are: {1:s}".format(
+            name, ', '.join(sorted(JSON_CODECS))))
+
+    codec = JSON_CODECS[name]
+    if not codec.available:
+        raise ImportError("the {0:s} codec requires {0:s}, install it with: pip install {0:s}".format(name))
+    return codec
+
+
+_default_codec = get_codec()
+
+
+def loads(data):
+    """Decode the JSON document with the fastest installed codec
+
+    :type data: bytes|str
+    :return:
+    """
+    return _default_codec.loads(data)
+
+
+def dumps(obj) -> str:
+    """Encode the object with the fastest installed codec
+
+    :type obj: object
+    :return:
+    """
+    return _default_codec.dumps(obj)
@@ -12,3 +12,11 @@ class InvalidOrWrongApiKeyException(Exception):
 
 class UnknownStatusCodeException(Exception):
     pass
+
+
+class RetryLaterException(Exception):
+    pass
+
+
+class ResultParserException(Exception):
+    pass
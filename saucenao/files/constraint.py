@@ -1,5 +1,6 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
+import re
 from typing import Callable
 
 
@@ -37,3 +38,35 @@ class Constraint:
     @staticmethod
     def cmp_value_not_equals(x, y):
         return x != y
+
+    @staticmethod
+    def cmp_value_in(x, y):
+        return x in y
+
+    @staticmethod
+    def cmp_value_not_in(x, y):
+        return x not in y
+
+    @staticmethod
+    def cmp_value_matches(x, y):
+        return re.match(y, x) is not None
+
+    def compile(self) -> Callable:
+        """Compile the constraint into a predicate of the compared value,
+        collections of membership tests become sets and patterns get compiled once
+
+        :return:
+        """
+        cmp_func = self.cmp_func
+        value = self.value
+        if cmp_func in (Constraint.cmp_value_in, Constraint.cmp_value_not_in) and isinstance(value, (list, tuple)):
+            try:
+                value = frozenset(value)
+            except TypeError:
+                # unhashable values can only be compared one by one
+                pass
+        elif cmp_func is Constraint.cmp_value_matches:
+            pattern = re.compile(value)
+            return lambda x: pattern.match(x) is not None
+
+        return lambda x: cmp_func(x, value)
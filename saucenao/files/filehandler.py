@@ -4,27 +4,62 @@ import html
 import os
 import re
 from shutil import move
-from typing import Generator
+from typing import Generator, Iterable
 
-from saucenao.files.filter import Filter
+from saucenao.files.filter import Filter, scan_directory
+from saucenao.files.manifest import ScanManifest
+from saucenao.files.walker import DirectoryWalker
 
 
 class FileHandler:
     @staticmethod
-    def get_files(directory, file_filter=None) -> Generator[str, None, None]:
-        """Get all files from given directory
+    def get_files(directory, file_filter=None, recursive=False, include=None, exclude=None, max_depth=None,
+                  workers=DirectoryWalker.DEFAULT_WORKERS, manifest=None) -> Generator[str, None, None]:
+        """Get all files from given directory, recursively walked subdirectories are scanned concurrently
+        and their files are returned with their path relative to the directory.
+        With a manifest only the files which are new, modified or failed in previous runs are returned
 
         :type directory: str
         :type file_filter: Filter
+        :type recursive: bool
+        :type include: Iterable[str]
+        :type exclude: Iterable[str]
+        :type max_depth: int
+        :type workers: int
+        :type manifest: ScanManifest
         :return:
         """
-        if file_filter:
+        files = FileHandler.__scan_files(directory, file_filter, recursive, include, exclude, max_depth, workers)
+        if manifest is not None:
+            files = manifest.filter(directory, files)
+        yield from files
+
+    @staticmethod
+    def __scan_files(directory, file_filter, recursive, include, exclude, max_depth,
+                     workers) -> Generator[str, None, None]:
+        """Get all files from given directory matching the filter
+
+        :type directory: str
+        :type file_filter: Filter
+        :type recursive: bool
+        :type include: Iterable[str]
+        :type exclude: Iterable[str]
+        :type max_depth: int
+        :type workers: int
+        :return:
+        """
+        if recursive or include or exclude:
+            walker = DirectoryWalker(file_filter=file_filter, include=include, exclude=exclude,
+                                     max_depth=max_depth if recursive else 0, workers=workers)
+            yield from walker.walk(directory)
+        elif file_filter:
             for f in file_filter.apply(directory=directory):
                 yield f
         else:
-            for f in os.listdir(directory):
-                if os.path.isfile(os.path.join(directory, f)):
-                    yield f
+            # the directory entries cache their type, so no additional stat is required for most files
+            for entry in scan_directory(directory):
+                if entry.is_file():
+                    yield entry.name
 
     @staticmethod
     def unicode_translate(text, chars="", replacement="") -> str:
@@ -53,4 +88,5 @@ class FileHandler:
         folder = os.path.abspath(FileHandler.unicode_translate(folder, "\n\t\r", "   "))
         if not os.path.exists(folder):
             os.makedirs(folder)
-        move(os.path.join(base_directory, filename), os.path.join(folder, filename))
+        # files of subdirectories are moved into the category folder without their subdirectories
+        move(os.path.join(base_directory, filename), os.path.join(folder, os.path.basename(filename)))
@@ -3,12 +3,123 @@
 import datetime
 import os
 import re
-from pathlib import Path
-from stat import ST_CTIME, ST_MTIME, ST_SIZE
-from typing import Generator
+from functools import lru_cache
+from operator import itemgetter
+from stat import ST_CTIME, ST_MTIME, ST_SIZE, S_ISDIR, S_ISREG
+from typing import Generator, Iterable
 
 from saucenao.files.constraint import Constraint
 
+# supported formats of the date constraints, the most specific format first
+DATE_FORMATS = (
+    (re.compile(r'\d+.\d+.\d+ \d+:\d+:\d+'), "%d.%m.%Y %H:%M:%S"),
+    (re.compile(r'\d+.\d+.\d+ \d+:\d+'), "%d.%m.%Y %H:%M"),
+    (re.compile(r'\d+.\d+.\d+'), "%d.%m.%Y"),
+)
+
+# relative costs of the checks, the compiled plan runs the cheap checks first
+COST_NAME = 0
+# the type is cached by the directory entries, only symlinks and passed FSOs require a stat
+COST_TYPE = 1
+COST_STAT = 2
+
+
+class PathEntry:
+    """
+    entry of an explicitly passed path with the interface of os.DirEntry,
+    the stat result is cached after the first call like the directory entries cache their type
+    """
+
+    __slots__ = ('name', 'path', '_stat')
+
+    def __init__(self, directory: str, name: str):
+        """Initializing function
+
+        :type directory: str
+        :type name: str
+        """
+        self.name = name
+        self.path = os.path.join(directory, name)
+        self._stat = None
+
+    def stat(self) -> os.stat_result:
+        """Return the stat result of the path following symlinks, raises an OSError if it doesn't exist
+
+        :return:
+        """
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+    def is_file(self) -> bool:
+        try:
+            return S_ISREG(self.stat().st_mode)
+        except OSError:
+            return False
+
+    def is_dir(self) -> bool:
+        try:
+            return S_ISDIR(self.stat().st_mode)
+        except OSError:
+            return False
+
+    def is_symlink(self) -> bool:
+        return os.path.islink(self.path)
+
+
+def entry_exists(entry) -> bool:
+    """Check if the entry exists, listed entries which aren't symlinks exist without checking the file system again
+
+    :type entry: os.DirEntry|PathEntry
+    :return:
+    """
+    if isinstance(entry, os.DirEntry) and not entry.is_symlink():
+        return True
+
+    try:
+        entry.stat()
+    except OSError:
+        return False
+    return True
+
+
+def get_suffix(name: str) -> str:
+    """Return the suffix of the name like pathlib does without creating a path object
+
+    :type name: str
+    :return:
+    """
+    name = os.path.basename(name)
+    i = name.rfind('.')
+    if 0 < i < len(name) - 1:
+        return name[i:]
+    return ''
+
+
+def matches_plan(plan: tuple, entry) -> bool:
+    """Check if the entry passes all predicates of the compiled plan,
+    entries removed in the meantime don't match
+
+    :type plan: tuple
+    :type entry: os.DirEntry|PathEntry
+    :return:
+    """
+    try:
+        return all(predicate(entry) for predicate in plan)
+    except OSError:
+        return False
+
+
+def scan_directory(directory: str) -> Generator[os.DirEntry, None, None]:
+    """Stream the entries of the directory instead of loading all names into memory
+
+    :type directory: str
+    :return:
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            yield entry
+
 
 class Filter:
     """
@@ -48,77 +159,97 @@ class Filter:
         """
         if self._file_system_objects is None:
             if self._directory:
-                return os.listdir(self._directory)
+                return (entry.name for entry in scan_directory(self._directory))
             else:
                 return []
         return self._file_system_objects
 
     @staticmethod
+    @lru_cache(maxsize=32)
     def _get_timestamp_from_datestring(date_string) -> float:
         """Convert the given date string to timestamp
 
         :param date_string:
         :return:
         """
-        if re.match(r'\d+.\d+.\d+ \d+:\d+:\d+', date_string):
-            return datetime.datetime.strptime(date_string, "%d.%m.%Y %H:%M:%S").timestamp()
-        elif re.match(r'\d+.\d+.\d+ \d+:\d+', date_string):
-            return datetime.datetime.strptime(date_string, "%d.%m.%Y %H:%M").timestamp()
-        elif re.match(r'\d+.\d+.\d+', date_string):
-            return datetime.datetime.strptime(date_string, "%d.%m.%Y").timestamp()
-        else:
-            raise AttributeError("The date doesn't fit the format: d.m.Y[ H:M[:S]]")
+        for pattern, date_format in DATE_FORMATS:
+            if pattern.match(date_string):
+                return datetime.datetime.strptime(date_string, date_format).timestamp()
+        raise AttributeError("The date doesn't fit the format: d.m.Y[ H:M[:S]]")
 
-    def apply(self, directory='', file_system_objects=None) -> Generator[str, None, None]:
-        """Apply the filter values to the given FSOs(File System Objects)
+    def entries(self, directory='', file_system_objects=None) -> Iterable:
+        """Return the entries of the passed FSOs or else of the directory
 
         :type directory: str
         :type file_system_objects: list|tuple|Generator
         :return:
         """
-        self._directory = directory
-        self._file_system_objects = file_system_objects
+        if file_system_objects is not None:
+            return (PathEntry(directory, file_system_object) for file_system_object in file_system_objects)
+        if directory:
+            return scan_directory(directory)
+        return []
+
+    def compile(self) -> tuple:
+        """Compile the constraints once into a plan of predicates of the FSO entries ordered by their cost,
+        the date strings get parsed once and the name and suffix get checked before the type and stat result
 
-        for file_system_object in self.file_system_objects:
-            abs_path = os.path.join(directory, file_system_object)
+        :return:
+        """
+        plan = [(COST_TYPE, entry_exists)]
+
+        if self._filter_assert_is_file:
+            plan.append((COST_TYPE, lambda entry: entry.is_file()))
+
+        if self._filter_assert_is_folder:
+            plan.append((COST_TYPE, lambda entry: entry.is_dir()))
 
-            # check if the FSO exists, else we can't access the metadata
-            if not os.path.exists(abs_path):
-                continue
+        if self._filter_creation_date:
+            creation_date = self._compile_date(self._filter_creation_date)
+            plan.append((COST_STAT, lambda entry: creation_date(entry.stat()[ST_CTIME])))
 
-            # check if the FSO is a file
-            if self._filter_assert_is_file and not os.path.isfile(abs_path):
-                continue
+        if self._filter_modified_date:
+            modified_date = self._compile_date(self._filter_modified_date)
+            plan.append((COST_STAT, lambda entry: modified_date(entry.stat()[ST_MTIME])))
 
-            # check if the FSO is a folder
-            if self._filter_assert_is_folder and not os.path.isdir(abs_path):
-                continue
+        if self._filter_name:
+            name = self._filter_name.compile()
+            plan.append((COST_NAME, lambda entry: name(entry.name)))
 
-            file_stats = os.stat(abs_path)
+        if self._filter_file_type:
+            file_type = self._filter_file_type.compile()
+            plan.append((COST_NAME, lambda entry: file_type(get_suffix(entry.name))))
 
-            # check if the FSO creation date matches the constraint
-            if self._filter_creation_date and not self.apply_creation_date(file_stats):
-                continue
+        if self._filter_file_size:
+            file_size = self._filter_file_size.compile()
+            plan.append((COST_STAT, lambda entry: file_size(entry.stat()[ST_SIZE])))
 
-            # check if the FSO modification date matches the constraint
-            if self._filter_modified_date and not self.apply_modified_date(file_stats):
-                continue
+        # the sort is stable, so checks of the same cost keep their order
+        return tuple(predicate for _, predicate in sorted(plan, key=itemgetter(0)))
 
-            # check if the FSO name matches the constraint
-            if self._filter_name and not self._filter_name.cmp_func(file_system_object, self._filter_name.value):
-                continue
+    def _compile_date(self, constraint: Constraint):
+        """Compile the date constraint with the date string parsed to a timestamp
+
+        :type constraint: Constraint
+        :return:
+        """
+        return Constraint(self._get_timestamp_from_datestring(constraint.value), constraint.cmp_func).compile()
 
-            # check if the FSO suffix matches the constraint
-            if self._filter_file_type and not self._filter_file_type.cmp_func(Path(abs_path).suffix,
-                                                                              self._filter_file_type.value):
-                continue
+    def apply(self, directory='', file_system_objects=None) -> Generator[str, None, None]:
+        """Apply the filter values to the given FSOs(File System Objects),
+        the types cached by the directory entries are used and the FSOs only get stat'ed if a constraint requires it
 
-            # check if the FSO size matches the constraint
-            if self._filter_file_size and not self._filter_file_size.cmp_func(file_stats[ST_SIZE],
-                                                                              self._filter_file_size.value):
-                continue
+        :type directory: str
+        :type file_system_objects: list|tuple|Generator
+        :return:
+        """
+        self._directory = directory
+        self._file_system_objects = file_system_objects
+        plan = self.compile()
 
-            yield file_system_object
+        for entry in self.entries(directory, file_system_objects):
+            if matches_plan(plan, entry):
+                yield entry.name
 
     def apply_creation_date(self, file_stats: os.stat_result) -> bool:
         """Apply creation date option
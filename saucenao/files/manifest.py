@@ -0,0 +1,228 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from itertools import islice
+from typing import Generator, Iterable
+
+
+class ScanManifest(object):
+    """
+    persistent manifest of the checked files with their size, modification time, content hash
+    and the outcome of their last check, stored in SQLite.
+    Re-runs only return the files which are new, modified or failed before, unchanged files only cost a stat
+    and are looked up in batches. Files moved or touched without changing their content are recognized by their hash
+    """
+
+    STATUS_FOUND = 'found'
+    STATUS_NOT_FOUND = 'not_found'
+    STATUS_FAILED = 'failed'
+
+    # outcomes of files which don't have to be checked again as long as they don't change
+    PROCESSED_STATUSES = (STATUS_FOUND, STATUS_NOT_FOUND)
+
+    # files looked up in the manifest with a single query
+    BATCH_SIZE = 500
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, path: str):
+        """Initializing function
+
+        :type path: str
+        """
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        # the manifest can be rebuilt, so the commits don't have to wait for the disk
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS files ('
+                                 'path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime INTEGER NOT NULL, hash TEXT, '
+                                 'status TEXT NOT NULL, updated REAL NOT NULL)')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS files_size ON files (size)')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS files_hash ON files (hash)')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def get_path(directory: str, file_name: str) -> str:
+        """Return the absolute path of the file the manifest entries are keyed by
+
+        :type directory: str
+        :type file_name: str
+        :return:
+        """
+        return os.path.abspath(os.path.join(directory, file_name))
+
+    @classmethod
+    def get_hash(cls, path: str) -> str:
+        """Return the SHA-256 hex digest of the file content like the digest of the uploaded files
+
+        :type path: str
+        :return:
+        """
+        content_hash = hashlib.sha256()
+        with open(path, 'rb') as file_object:
+            for chunk in iter(lambda: file_object.read(cls.HASH_CHUNK_SIZE), b''):
+                content_hash.update(chunk)
+        return content_hash.hexdigest()
+
+    def filter(self, directory: str, file_names: Iterable[str]) -> Generator[str, None, None]:
+        """Yield the files which are new, modified or failed before, unchanged files are skipped
+
+        :type directory: str
+        :type file_names: Iterable[str]
+        :return:
+        """
+        file_names = iter(file_names)
+        while True:
+            batch = list(islice(file_names, self.BATCH_SIZE))
+            if not batch:
+                return
+
+            paths = [self.get_path(directory, file_name) for file_name in batch]
+            entries = self.__get_entries(paths)
+            for file_name, path in zip(batch, paths):
+                if not self.__is_unchanged(path, entries.get(path)):
+                    yield file_name
+
+    def __get_entries(self, paths: list) -> dict:
+        """Return the manifest entries of the paths with a single query
+
+        :type paths: list
+        :return:
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT path, size, mtime, hash, status FROM files WHERE path IN ({0:s})'.format(
+                    ', '.join('?' * len(paths))), paths).fetchall()
+        return {row[0]: row[1:] for row in rows}
+
+    def __is_unchanged(self, path: str, entry) -> bool:
+        """Check if the file was processed already and didn't change since then,
+        the content only gets hashed if the size or modification time changed or the path is new
+
+        :type path: str
+        :type entry: tuple|None
+        :return:
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            # the file gets checked and fails there like it did without manifest
+            return False
+
+        if entry is not None:
+            size, mtime, content_hash, status = entry
+            if status not in self.PROCESSED_STATUSES:
+                return False
+            if size == stat.st_size and mtime == stat.st_mtime_ns:
+                return True
+            if size != stat.st_size or content_hash is None:
+                return False
+            # touched without changing the content
+            processed = (content_hash, status) if self.__hash(path) == content_hash else None
+        else:
+            # moved or copied files are only hashed if a processed file with the same size exists
+            with self._lock:
+                candidate = self._connection.execute('SELECT 1 FROM files WHERE size = ? AND status IN (?, ?) '
+                                                     'LIMIT 1', (stat.st_size,) + self.PROCESSED_STATUSES).fetchone()
+            if candidate is None:
+                return False
+            processed = self.__get_processed(self.__hash(path))
+
+        if processed is None:
+            return False
+
+        self.__set(path, stat, *processed)
+        return True
+
+    def __hash(self, path: str):
+        """Return the hash of the file content or None if it can't be read
+
+        :type path: str
+        :return: str|None
+        """
+        try:
+            return self.get_hash(path)
+        except OSError:
+            return None
+
+    def __get_processed(self, content_hash: str):
+        """Return the hash and status of a processed file with the content hash or None if there is none
+
+        :type content_hash: str
+        :return: tuple|None
+        """
+        if content_hash is None:
+            return None
+
+        with self._lock:
+            row = self._connection.execute('SELECT status FROM files WHERE hash = ? AND status IN (?, ?) LIMIT 1',
+                                           (content_hash,) + self.PROCESSED_STATUSES).fetchone()
+        if row is None:
+            return None
+        return content_hash, row[0]
+
+    def record(self, directory: str, file_name: str, status: str, content_hash: str = None):
+        """Record the outcome of the check of the file with its current size and modification time,
+        the content gets hashed if no hash is passed
+
+        :type directory: str
+        :type file_name: str
+        :type status: str
+        :type content_hash: str
+        :return:
+        """
+        path = self.get_path(directory, file_name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+
+        if content_hash is None:
+            content_hash = self.__hash(path)
+        self.__set(path, stat, content_hash, status)
+
+    def __set(self, path: str, stat: os.stat_result, content_hash: str, status: str):
+        with self._lock:
+            self._connection.execute('INSERT OR REPLACE INTO files (path, size, mtime, hash, status, updated) '
+                                     'VALUES (?, ?, ?, ?, ?, ?)',
+                                     (path, stat.st_size, stat.st_mtime_ns, content_hash, status, time.time()))
+
+    def get_status(self, directory: str, file_name: str):
+        """Return the recorded outcome of the file or None if it isn't recorded
+
+        :type directory: str
+        :type file_name: str
+        :return: str|None
+        """
+        with self._lock:
+            row = self._connection.execute('SELECT status FROM files WHERE path = ?',
+                                           (self.get_path(directory, file_name),)).fetchone()
+        return row[0] if row else None
+
+    @property
+    def entries(self) -> int:
+        """Property for the amount of recorded files
+
+        :return:
+        """
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+    def close(self):
+        """Close the database connection
+
+        :return:
+        """
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,223 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import fnmatch
+import os
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Generator, Iterable
+
+from saucenao.files.filter import Filter, matches_plan
+
+
+def compile_globs(patterns: Iterable[str]):
+    """Compile the glob patterns into one match function of the relative paths or None if no patterns are passed
+
+    :type patterns: Iterable[str]
+    :return: Callable|None
+    """
+    if not patterns:
+        return None
+
+    pattern = re.compile('|'.join(fnmatch.translate(os.path.normcase(pattern)) for pattern in patterns))
+    return lambda path: pattern.match(os.path.normcase(path)) is not None
+
+
+def iterate_entries(path: str) -> Generator[os.DirEntry, None, None]:
+    """Stream the entries of the directory, reading the directory stops at the first error like os.walk does
+
+    :type path: str
+    :return:
+    """
+    try:
+        entries = os.scandir(path)
+    except OSError:
+        return
+
+    with entries:
+        while True:
+            try:
+                entry = next(entries)
+            except (StopIteration, OSError):
+                return
+            yield entry
+
+
+class _WalkState:
+    """
+    state of a single walk shared between the scanning threads
+    """
+
+    def __init__(self, plan: tuple, queue_size: int):
+        """Initializing function
+
+        :type plan: tuple
+        :type queue_size: int
+        """
+        self.plan = plan
+        self.results = queue.Queue(maxsize=queue_size)
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+        self.pending = 0
+        # (device, inode) of the scanned directories, so symlinks can't lead into loops
+        self.visited = set()
+
+
+class DirectoryWalker:
+    """
+    recursive walk of a directory tree scanning the subdirectories concurrently on a thread pool.
+    The matching files are passed through a bounded queue, so they can be consumed while the walk continues
+    and the scanning threads wait instead of buffering the whole tree if the consumer is slower.
+    The order of the files is only deterministic inside of a directory
+    """
+
+    DEFAULT_WORKERS = 8
+    DEFAULT_QUEUE_SIZE = 1024
+    THREAD_NAME_PREFIX = 'saucenao-walk'
+
+    # marks the end of the walk in the queue of the results
+    _DONE = object()
+
+    def __init__(self, file_filter: Filter = None, include: Iterable[str] = None, exclude: Iterable[str] = None,
+                 max_depth: int = None, follow_symlinks: bool = True, workers: int = DEFAULT_WORKERS,
+                 queue_size: int = DEFAULT_QUEUE_SIZE):
+        """Initializing function
+
+        :type file_filter: Filter
+        :type include: Iterable[str]
+        :type exclude: Iterable[str]
+        :type max_depth: int
+        :type follow_symlinks: bool
+        :type workers: int
+        :type queue_size: int
+        """
+        # without filter only files are returned like in the flat directory
+        self.file_filter = file_filter or Filter(assert_is_file=True)
+        # globs of the relative paths, excluded directories aren't walked at all
+        self.include = compile_globs(include)
+        self.exclude = compile_globs(exclude)
+        # depth of the walked subdirectories, 0 only scans the passed directory
+        self.max_depth = max_depth
+        self.follow_symlinks = follow_symlinks
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+
+    def walk(self, directory: str) -> Generator[str, None, None]:
+        """Walk the directory and yield the paths relative to it of all files matching the filter and globs
+
+        :type directory: str
+        :return:
+        """
+        state = _WalkState(self.file_filter.compile(), self.queue_size)
+        # missing directories raise the error of os.scandir like the flat directory does
+        stat = os.stat(directory)
+        state.visited.add((stat.st_dev, stat.st_ino))
+
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.THREAD_NAME_PREFIX)
+        try:
+            self.__submit(state, executor, directory, '', 0)
+            while True:
+                item = state.results.get()
+                if item is self._DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # stops the scanning threads if the consumer stops early
+            state.stopped.set()
+            executor.shutdown(wait=False)
+
+    def __submit(self, state: _WalkState, executor: ThreadPoolExecutor, path: str, relative_path: str, depth: int):
+        """Schedule the scan of the directory, the walk is done once no scans are pending anymore
+
+        :type state: _WalkState
+        :type executor: ThreadPoolExecutor
+        :type path: str
+        :type relative_path: str
+        :type depth: int
+        :return:
+        """
+        with state.lock:
+            state.pending += 1
+        executor.submit(self.__scan, state, executor, path, relative_path, depth)
+
+    def __scan(self, state: _WalkState, executor: ThreadPoolExecutor, path: str, relative_path: str, depth: int):
+        """Scan the directory, schedule the scans of its subdirectories and pass the matching files to the consumer
+
+        :type state: _WalkState
+        :type executor: ThreadPoolExecutor
+        :type path: str
+        :type relative_path: str
+        :type depth: int
+        :return:
+        """
+        try:
+            if state.stopped.is_set():
+                return
+
+            descend = self.max_depth is None or depth < self.max_depth
+            # only the subdirectories are kept, they're scanned once the handle of this directory is closed
+            subdirectories = []
+            for entry in iterate_entries(path):
+                entry_path = os.path.join(relative_path, entry.name) if relative_path else entry.name
+                if self.exclude and self.exclude(entry_path):
+                    continue
+
+                if descend and entry.is_dir() and (self.follow_symlinks or not entry.is_symlink()) \
+                        and self.__visit(state, entry.path):
+                    subdirectories.append((entry.path, entry_path))
+
+                if self.include and not self.include(entry_path):
+                    continue
+
+                if matches_plan(state.plan, entry) and not self.__put(state, entry_path):
+                    return
+
+            for subdirectory_path, subdirectory_relative_path in subdirectories:
+                self.__submit(state, executor, subdirectory_path, subdirectory_relative_path, depth + 1)
+        except Exception as e:
+            self.__put(state, e)
+        finally:
+            with state.lock:
+                state.pending -= 1
+                done = not state.pending
+            if done:
+                self.__put(state, self._DONE)
+
+    @staticmethod
+    def __visit(state: _WalkState, path: str) -> bool:
+        """Mark the directory as visited, returns False if it was visited already or doesn't exist
+
+        :type state: _WalkState
+        :type path: str
+        :return:
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+
+        key = (stat.st_dev, stat.st_ino)
+        with state.lock:
+            if key in state.visited:
+                return False
+            state.visited.add(key)
+        return True
+
+    @staticmethod
+    def __put(state: _WalkState, item) -> bool:
+        """Pass the item to the consumer, waits while the queue is full until the walk gets stopped
+
+        :type state: _WalkState
+        :param item:
+        :return:
+        """
+        while not state.stopped.is_set():
+            try:
+                state.results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
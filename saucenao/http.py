@@ -2,15 +2,24 @@
 # -*- coding: utf-8 -*-
 
 import requests
+from requests.adapters import HTTPAdapter, DEFAULT_POOLSIZE, DEFAULT_RETRIES
 
 from saucenao.exceptions import *
 
 PREVIOUS_STATUS_CODE = None
 
+# connection pool defaults of the transport shared by all requests of a SauceNao instance
+DEFAULT_POOL_CONNECTIONS = DEFAULT_POOLSIZE
+DEFAULT_POOL_MAXSIZE = DEFAULT_POOLSIZE
+DEFAULT_MAX_RETRIES = DEFAULT_RETRIES
+
 STATUS_CODE_OK = 1
 STATUS_CODE_SKIP = 2
 STATUS_CODE_REPEAT = 3
 
+# SauceNAO responds in UTF-8, which is used if the response declares no charset instead of guessing it
+DEFAULT_ENCODING = 'utf-8'
+
 
 def verify_status_code(request_response: requests.Response) -> tuple:
     """Verify the status code of the post request to the search url and raise exceptions if the code is unexpected
@@ -39,3 +48,44 @@ def verify_status_code(request_response: requests.Response) -> tuple:
     else:
         msg = "Unknown status code: {0:d}".format(request_response.status_code)
         return STATUS_CODE_REPEAT, msg
+
+
+def get_response_encoding(request_response: requests.Response) -> str:
+    """Return the charset declared in the headers of the response or else the default encoding,
+    requests would fall back to ISO-8859-1 or run the slow charset detection over the whole body
+
+    :type request_response: requests.Response
+    :return:
+    """
+    if 'charset' in request_response.headers.get('Content-Type', '').lower() and request_response.encoding:
+        return request_response.encoding
+    return DEFAULT_ENCODING
+
+
+def get_response_text(request_response: requests.Response) -> str:
+    """Decode the body of the response with the declared or else the default encoding
+
+    :type request_response: requests.Response
+    :return:
+    """
+    return request_response.content.decode(get_response_encoding(request_response), errors='replace')
+
+
+def create_session(pool_connections: int = DEFAULT_POOL_CONNECTIONS, pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                   max_retries=DEFAULT_MAX_RETRIES, adapter: HTTPAdapter = None) -> requests.Session:
+    """Create a session with a pooled keep-alive transport mounted for http and https,
+    so consecutive uploads reuse the already established connections to SauceNAO
+
+    :type pool_connections: int
+    :type pool_maxsize: int
+    :type max_retries: int|urllib3.util.retry.Retry
+    :type adapter: HTTPAdapter
+    :return:
+    """
+    if adapter is None:
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=max_retries)
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
@@ -0,0 +1,131 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import sqlite3
+import threading
+
+from saucenao import codec
+from saucenao.phash import hamming_distance
+
+
+class PerceptualIndex(object):
+    """
+    persistent index of the perceptual hashes of identified images and their results stored in SQLite.
+    The 64 bit hashes are split into max_distance + 1 chunks stored in indexed columns, by the pigeonhole principle
+    every hash within max_distance matches at least one chunk exactly (multi-index hashing),
+    so lookups only compare a few candidates instead of all entries
+    """
+
+    HASH_BITS = 64
+
+    def __init__(self, path: str, max_distance: int = 4):
+        """Initializing function, the distance of an existing index is fixed by its chunk layout
+
+        :type path: str
+        :type max_distance: int
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA mmap_size=268435456')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        self._connection.execute('INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)',
+                                 ('max_distance', max_distance))
+        self.max_distance = self._connection.execute('SELECT value FROM meta WHERE key = ?',
+                                                     ('max_distance',)).fetchone()[0]
+
+        chunk_count = self.max_distance + 1
+        self._chunk_bits = [self.HASH_BITS // chunk_count + (i < self.HASH_BITS % chunk_count)
+                            for i in range(chunk_count)]
+        self._chunk_columns = ['chunk{0:d}'.format(i) for i in range(chunk_count)]
+
+        self._connection.execute('CREATE TABLE IF NOT EXISTS hashes (id INTEGER PRIMARY KEY, hash INTEGER NOT NULL, '
+                                 'options TEXT NOT NULL, results TEXT NOT NULL, {0:s})'
+                                 .format(', '.join(column + ' INTEGER NOT NULL' for column in self._chunk_columns)))
+        for column in self._chunk_columns:
+            self._connection.execute('CREATE INDEX IF NOT EXISTS hashes_{0:s} ON hashes ({0:s}, options)'
+                                     .format(column))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def entries(self) -> int:
+        """Property for the amount of indexed images
+
+        :return:
+        """
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM hashes').fetchone()[0]
+
+    def _split(self, value: int) -> list:
+        """Split the hash into its chunks
+
+        :type value: int
+        :return:
+        """
+        chunks = []
+        for bits in self._chunk_bits:
+            chunks.append(value & ((1 << bits) - 1))
+            value >>= bits
+        return chunks
+
+    @staticmethod
+    def _to_signed(value: int) -> int:
+        """SQLite integers are signed 64 bit integers
+
+        :type value: int
+        :return:
+        """
+        return value - (1 << 64) if value >= 1 << 63 else value
+
+    def add(self, value: int, options: str, results: list):
+        """Add the perceptual hash of an identified image with its results
+
+        :type value: int
+        :type options: str
+        :type results: list
+        :return:
+        """
+        with self._lock:
+            self._connection.execute(
+                'INSERT INTO hashes (hash, options, results, {0:s}) VALUES (?, ?, ?, {1:s})'.format(
+                    ', '.join(self._chunk_columns), ', '.join('?' * len(self._chunk_columns))),
+                [self._to_signed(value), options, codec.dumps(results)] + self._split(value))
+
+    def search(self, value: int, options: str, max_distance: int = None):
+        """Return the results of the closest indexed image within the distance or None if there is none
+
+        :type value: int
+        :type options: str
+        :type max_distance: int
+        :return: list|None
+        """
+        if max_distance is None or max_distance > self.max_distance:
+            max_distance = self.max_distance
+
+        query = 'SELECT hash, results FROM hashes WHERE options = ? AND ({0:s})'.format(
+            ' OR '.join(column + ' = ?' for column in self._chunk_columns))
+        with self._lock:
+            candidates = self._connection.execute(query, [options] + self._split(value)).fetchall()
+
+        best_distance, best_results = None, None
+        for candidate, results in candidates:
+            distance = hamming_distance(value, candidate & ((1 << 64) - 1))
+            if distance <= max_distance and (best_distance is None or distance < best_distance):
+                best_distance, best_results = distance, results
+
+        if best_results is None:
+            return None
+        return codec.loads(best_results)
+
+    def close(self):
+        """Close the database connection
+
+        :return:
+        """
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,136 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import json
+import os
+import threading
+import time
+from typing import Generator, Iterable
+
+
+class ProgressJournal(object):
+    """
+    append-only journal of the completed files of a run, so an interrupted run resumes where it stopped.
+    Every completed file is appended as one JSON line, the journal is only synced to the disk every `sync_records`
+    records or `sync_interval` seconds. Files completed in any order are skipped on resume,
+    only the names of the completed files are kept in memory instead of the whole file list
+    """
+
+    SYNC_RECORDS = 100
+    SYNC_INTERVAL = 1.0
+
+    def __init__(self, path: str, sync_records: int = SYNC_RECORDS, sync_interval: float = SYNC_INTERVAL):
+        """Initializing function
+
+        :type path: str
+        :type sync_records: int
+        :type sync_interval: float
+        """
+        self.path = path
+        self.sync_records = max(1, sync_records)
+        self.sync_interval = sync_interval
+
+        self._lock = threading.Lock()
+        self.completed = self.__load()
+        self._file = open(path, 'ab')
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __contains__(self, file_name) -> bool:
+        return file_name in self.completed
+
+    def __len__(self) -> int:
+        return len(self.completed)
+
+    def __load(self) -> set:
+        """Read the completed files of the previous runs, a record torn by a crash gets cut off
+
+        :return:
+        """
+        try:
+            with open(self.path, 'rb') as journal:
+                content = journal.read()
+        except FileNotFoundError:
+            return set()
+
+        end = content.rfind(b'\n') + 1
+        if end < len(content):
+            # the last record wasn't written completely, the file simply gets checked again
+            with open(self.path, 'r+b') as journal:
+                journal.truncate(end)
+
+        completed = set()
+        for line in content[:end].splitlines():
+            try:
+                completed.add(json.loads(line))
+            except ValueError:
+                continue
+        return completed
+
+    def filter(self, files: Iterable) -> Generator:
+        """Yield the files which weren't completed yet while streaming the passed files
+
+        :type files: Iterable
+        :return:
+        """
+        for file_name in files:
+            if not isinstance(file_name, str) or file_name not in self.completed:
+                yield file_name
+
+    def record(self, file_name: str):
+        """Append the completed file to the journal, the journal gets synced once enough records are pending
+
+        :type file_name: str
+        :return:
+        """
+        with self._lock:
+            if file_name in self.completed:
+                return
+
+            self.completed.add(file_name)
+            # escaped as ASCII, so names which aren't valid UTF-8 keep their surrogates
+            self._file.write(json.dumps(file_name).encode('ascii') + b'\n')
+            self._unsynced += 1
+            if self._unsynced >= self.sync_records or time.monotonic() - self._last_sync >= self.sync_interval:
+                self.__sync()
+
+    def sync(self):
+        """Write the pending records to the disk
+
+        :return:
+        """
+        with self._lock:
+            self.__sync()
+
+    def __sync(self):
+        if self._file.closed:
+            return
+
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def reset(self):
+        """Clear the journal after a completed run, so the next run starts from the beginning again
+
+        :return:
+        """
+        with self._lock:
+            self.completed.clear()
+            self._file.truncate(0)
+            self.__sync()
+
+    def close(self):
+        """Sync the pending records and close the journal
+
+        :return:
+        """
+        with self._lock:
+            self.__sync()
+            self._file.close()
@@ -0,0 +1,151 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import threading
+import time
+from typing import Iterable, Union
+
+from saucenao.exceptions import DailyLimitReachedException
+from saucenao.limiter import RateLimiter, TokenBucketLimiter
+from saucenao import quota
+from saucenao.quota import QuotaState
+
+
+class ApiKey(object):
+    """
+    API key with its own rate limiter and daily usage
+    """
+
+    ACCOUNT_TYPE_BASIC = quota.ACCOUNT_TYPE_BASIC
+    ACCOUNT_TYPE_PREMIUM = quota.ACCOUNT_TYPE_PREMIUM
+
+    # search limits per 30 seconds of the account types
+    LIMIT_30_SECONDS = quota.LIMIT_30_SECONDS
+
+    # the daily limit of SauceNAO is reset 24 hours after it has been reached
+    DAILY_RESET_SECONDS = 24 * 60 * 60
+
+    def __init__(self, key: str, is_premium=False, daily_limit: int = None, limiter: RateLimiter = None):
+        """Initializing function
+
+        :type key: str
+        :type is_premium: bool
+        :type daily_limit: int
+        :type limiter: RateLimiter
+        """
+        self.key = key
+        self.account_type = self.ACCOUNT_TYPE_PREMIUM if is_premium else self.ACCOUNT_TYPE_BASIC
+        self.daily_limit = daily_limit
+
+        if limiter is None:
+            limiter = TokenBucketLimiter(limit=self.LIMIT_30_SECONDS[self.account_type], period=30)
+        self.limiter = limiter
+        self.quota = QuotaState()
+
+        self.usage = 0
+        self.usage_reset_time = None
+        self.retired_until = None
+
+    def __repr__(self):
+        return "ApiKey({0:s}..., {1:s}, usage={2:d})".format(self.key[:6], self.account_type, self.usage)
+
+    @classmethod
+    def from_string(cls, value: str):
+        """Create an API key from the "key[:premium]" notation of the command line
+
+        :type value: str
+        :return:
+        """
+        key, _, account_type = value.strip().partition(':')
+        return cls(key, is_premium=account_type.lower() == cls.ACCOUNT_TYPE_PREMIUM)
+
+    def is_available(self, now: float) -> bool:
+        """Check if the key can be used for searches and reset the daily usage after 24 hours
+
+        :type now: float
+        :return:
+        """
+        if self.usage_reset_time is not None and now >= self.usage_reset_time:
+            self.usage = 0
+            self.usage_reset_time = None
+            self.retired_until = None
+
+        if self.retired_until is not None:
+            return False
+
+        return self.daily_limit is None or self.usage < self.daily_limit
+
+    def retire(self, now: float):
+        """Retire the key until its daily usage gets reset
+
+        :type now: float
+        :return:
+        """
+        self.retired_until = self.usage_reset_time or now + self.DAILY_RESET_SECONDS
+        self.usage_reset_time = self.retired_until
+
+
+class ApiKeyPool(object):
+    """
+    pool of API keys, every search is sent with the key which has capacity the soonest,
+    which distributes the searches proportional to the search limits of the keys
+    """
+
+    def __init__(self, keys: Iterable[Union[ApiKey, str]]):
+        """Initializing function
+
+        :type keys: Iterable
+        """
+        self.keys = [key if isinstance(key, ApiKey) else ApiKey(key) for key in keys]
+        if not self.keys:
+            raise ValueError("the API key pool requires at least one key")
+        self._lock = threading.Lock()
+
+    @property
+    def limit_30s(self) -> float:
+        """Property for the combined search limit per 30 seconds of all keys, reported limits take precedence
+
+        :return:
+        """
+        return sum(key.limiter.limit for key in self.keys)
+
+    @property
+    def available_keys(self) -> list:
+        """Property for all keys which are currently not retired
+
+        :return:
+        """
+        now = time.time()
+        with self._lock:
+            return [key for key in self.keys if key.is_available(now)]
+
+    def acquire(self, searches: int = 1) -> ApiKey:
+        """Select the key with capacity the soonest, count the searches and block until its limiter allows them
+
+        :type searches: int
+        :return:
+        """
+        now = time.time()
+        with self._lock:
+            keys = [key for key in self.keys if key.is_available(now)]
+            if not keys:
+                raise DailyLimitReachedException('Daily search limit of all API keys reached')
+
+            api_key = min(keys, key=lambda k: k.limiter.time_until_available(searches))
+            wait = api_key.limiter.reserve(searches)
+
+            api_key.usage += searches
+            if api_key.usage_reset_time is None:
+                api_key.usage_reset_time = now + ApiKey.DAILY_RESET_SECONDS
+
+        if wait > 0:
+            time.sleep(wait)
+        return api_key
+
+    def retire(self, api_key: ApiKey):
+        """Retire the exhausted key until its daily usage gets reset
+
+        :type api_key: ApiKey
+        :return:
+        """
+        with self._lock:
+            api_key.retire(time.time())
@@ -0,0 +1,222 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import os
+import threading
+import time
+from typing import Callable
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # windows has no fcntl module, use the locking function of msvcrt instead
+    fcntl = None
+    import msvcrt
+
+
+class RateLimiter(object):
+    """
+    token bucket allowing `limit` searches per `period` seconds with bursts of up to `burst` searches,
+    the backends only differ in where the bucket state is stored
+    """
+
+    def __init__(self, limit: float, period: float = 30.0, burst: float = 1):
+        """Initializing function
+
+        :type limit: float
+        :type period: float
+        :type burst: float
+        """
+        self.limit = limit
+        self.period = period
+        self.burst = burst
+
+    @property
+    def rate(self) -> float:
+        """Property for the refilled tokens per second
+
+        :return:
+        """
+        return self.limit / self.period
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Take the tokens from the bucket and block until they are available, returns the waited seconds
+
+        :type tokens: float
+        :return:
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Take the tokens from the bucket without blocking and return the seconds until they may be used
+
+        :type tokens: float
+        :return:
+        """
+
+        def reserve(available):
+            # reserve the tokens right away, a negative balance queues up all following acquisitions
+            return available - tokens, self.__get_wait(available, tokens)
+
+        return self._update_state(reserve)
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take the tokens from the bucket only if they are available right now
+
+        :type tokens: float
+        :return:
+        """
+
+        def take(available):
+            if available >= tokens:
+                return available - tokens, True
+            return available, False
+
+        return self._update_state(take)
+
+    def time_until_available(self, tokens: float = 1) -> float:
+        """Return the seconds until the tokens are available without taking them
+
+        :type tokens: float
+        :return:
+        """
+        return self._update_state(lambda available: (available, self.__get_wait(available, tokens)))
+
+    def __get_wait(self, available: float, tokens: float) -> float:
+        """Return the seconds until the tokens may be used, more tokens than the bucket can hold
+        only wait for a full bucket, the remaining tokens are taken on credit
+
+        :type available: float
+        :type tokens: float
+        :return:
+        """
+        return max(0.0, (min(tokens, self.burst) - available) / self.rate)
+
+    def update(self, limit: float = None, available: float = None):
+        """Adjust the limit and cap the available tokens with the remaining searches reported by SauceNAO
+
+        :type limit: float
+        :type available: float
+        :return:
+        """
+        if limit:
+            self.limit = limit
+        if available is not None:
+            self._update_state(lambda current: (min(current, available), None))
+
+    def _refill(self, available: float, last_update: float, now: float) -> float:
+        """Return the available tokens after refilling the bucket for the elapsed time
+
+        :type available: float
+        :type last_update: float
+        :type now: float
+        :return:
+        """
+        return min(float(self.burst), available + max(0.0, now - last_update) * self.rate)
+
+    def _update_state(self, update: Callable):
+        """Refill the bucket and atomically replace the available tokens with the first value returned by update,
+        the second value is returned
+
+        :type update: Callable
+        :return:
+        """
+        raise NotImplementedError
+
+
+class TokenBucketLimiter(RateLimiter):
+    """
+    in-process thread-safe token bucket
+    """
+
+    def __init__(self, limit: float, period: float = 30.0, burst: float = 1):
+        """Initializing function
+
+        :type limit: float
+        :type period: float
+        :type burst: float
+        """
+        super().__init__(limit=limit, period=period, burst=burst)
+        self._lock = threading.Lock()
+        self._available = float(burst)
+        self._last_update = time.monotonic()
+
+    def _update_state(self, update: Callable):
+        with self._lock:
+            now = time.monotonic()
+            available = self._refill(self._available, self._last_update, now)
+            self._available, result = update(available)
+            self._last_update = now
+            return result
+
+
+class FileLockLimiter(RateLimiter):
+    """
+    token bucket stored in a state file guarded by an exclusive file lock,
+    all processes on the host using the same path share the same budget
+    """
+
+    def __init__(self, path: str, limit: float, period: float = 30.0, burst: float = 1):
+        """Initializing function
+
+        :type path: str
+        :type limit: float
+        :type period: float
+        :type burst: float
+        """
+        super().__init__(limit=limit, period=period, burst=burst)
+        self.path = path
+        # file locks are held per process, so threads of the same process have to be serialized additionally
+        self._lock = threading.Lock()
+
+    def _update_state(self, update: Callable):
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                self.__lock_file(fd)
+                try:
+                    now = time.time()
+                    state = os.read(fd, 64).split()
+                    if len(state) == 2:
+                        available = self._refill(float(state[0]), float(state[1]), now)
+                    else:
+                        available = float(self.burst)
+
+                    available, result = update(available)
+
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    os.ftruncate(fd, 0)
+                    os.write(fd, '{0!r} {1!r}'.format(available, now).encode('ascii'))
+                    return result
+                finally:
+                    self.__unlock_file(fd)
+            finally:
+                os.close(fd)
+
+    @staticmethod
+    def __lock_file(fd: int):
+        """Block until the exclusive lock of the file is acquired
+
+        :type fd: int
+        :return:
+        """
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:  # pragma: no cover
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+
+    @staticmethod
+    def __unlock_file(fd: int):
+        """Release the exclusive lock of the file
+
+        :type fd: int
+        :return:
+        """
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:  # pragma: no cover
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
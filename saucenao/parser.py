@@ -0,0 +1,556 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import codecs
+from html.parser import HTMLParser
+from typing import Iterable
+
+from bs4 import BeautifulSoup as Soup
+from bs4 import element
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    etree = None
+
+from saucenao.exceptions import ResultParserException
+
+CLASS_TABLE_CONTENT = 'resulttablecontent'
+CLASS_TITLE = 'resulttitle'
+CLASS_SIMILARITY = 'resultsimilarityinfo'
+CLASS_MISC_INFO = 'resultmiscinfo'
+CLASS_CONTENT_COLUMN = 'resultcontentcolumn'
+
+# whitespace characters of HTML, strings consisting only of them are collapsed by bs4
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+
+def normalize_string(text: str) -> str:
+    """Collapse strings consisting only of whitespace like BeautifulSoup does while building the tree
+
+    :type text: str
+    :return:
+    """
+    if text and not text.strip(ASCII_SPACES):
+        return '\n' if '\n' in text else ' '
+    return text
+
+
+def select_results(similarities: list, minimum_similarity: float = None, limit: int = None) -> list:
+    """Return the indexes of the results with at least the minimum similarity in document order,
+    limited to the most similar results if a limit is passed
+
+    :type similarities: list
+    :type minimum_similarity: float
+    :type limit: int
+    :return:
+    """
+    if minimum_similarity is None and limit is None:
+        return list(range(len(similarities)))
+
+    similarities = [float(similarity) for similarity in similarities]
+    selected = [index for index, similarity in enumerate(similarities)
+                if minimum_similarity is None or similarity >= minimum_similarity]
+    if limit is not None and len(selected) > limit:
+        # the sort is stable, so equally similar results keep their order like in the sorted results
+        selected = sorted(sorted(selected, key=lambda index: similarities[index], reverse=True)[:limit])
+    return selected
+
+
+class ResultParser(object):
+    """
+    parser engine extracting the results of the SauceNAO HTML response into the structure of the JSON API response,
+    engines failing to parse a page fall back to BeautifulSoup.
+    Results below the minimum similarity or outside of the limit are skipped before their fields get extracted
+    """
+
+    name = ''
+
+    def parse(self, html: str, minimum_similarity: float = None, limit: int = None) -> dict:
+        """Parse the results of the passed HTML response
+
+        :type html: str
+        :type minimum_similarity: float
+        :type limit: int
+        :return:
+        """
+        try:
+            return self._parse(html, minimum_similarity, limit)
+        except ResultParserException:
+            return SoupResultParser()._parse(html, minimum_similarity, limit)
+
+    def _parse(self, html: str, minimum_similarity: float = None, limit: int = None) -> dict:
+        """Parse the results with the engine, raises a ResultParserException if the page is not understood
+
+        :type html: str
+        :type minimum_similarity: float
+        :type limit: int
+        :return:
+        """
+        raise NotImplementedError
+
+    def parse_stream(self, chunks: Iterable[bytes], encoding: str = 'utf-8', minimum_similarity: float = None,
+                     limit: int = None) -> dict:
+        """Parse the results of the HTML response arriving in chunks of bytes,
+        engines without incremental parsing decode the complete response first
+
+        :type chunks: Iterable[bytes]
+        :type encoding: str
+        :type minimum_similarity: float
+        :type limit: int
+        :return:
+        """
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        html = ''.join(decoder.decode(chunk) for chunk in chunks) + decoder.decode(b'', final=True)
+        return self.parse(html, minimum_similarity, limit)
+
+    @staticmethod
+    def _create_result(similarity: str, title: str = '', content: list = None, ext_urls: list = None) -> dict:
+        """Create a result in the format of the JSON API response
+
+        :type similarity: str
+        :type title: str
+        :type content: list
+        :type ext_urls: list
+        :return:
+        """
+        return {
+            'header': {
+                'similarity': similarity
+            },
+            'data': {
+                'title': title,
+                'content': content if content is not None else [],
+                'ext_urls': ext_urls if ext_urls is not None else []
+            }
+        }
+
+
+class SoupResultParser(ResultParser):
+    """
+    reference engine walking the BeautifulSoup tree, slow but tolerant to any markup
+    """
+
+    name = 'bs4'
+
+    def _parse(self, html: str, minimum_similarity: float = None, limit: int = None) -> dict:
+        """Parse the results from the BeautifulSoup tree of the page
+
+        :type html: str
+        :type minimum_similarity: float
+        :type limit: int
+        :return:
+        """
+        soup = Soup(html, 'html.parser')
+        # basic format of json API response
+        results = {'header': {}, 'results': []}
+
+        cells = soup.find_all('td', attrs={"class": CLASS_TABLE_CONTENT})
+        # mandatory field in SauceNao
+        similarities = [res.find_next('div', attrs={"class": CLASS_SIMILARITY}).text.replace('%', '')
+                        for res in cells]
+
+        for index in select_results(similarities, minimum_similarity, limit):
+            res = cells[index]  # type: element.Tag
+            similarity = similarities[index]
+            # optional field in SauceNao
+            title_tag = res.find_next('div', attrs={"class": CLASS_TITLE})
+            if title_tag:
+                title = title_tag.text
+            else:
+                title = ''
+
+            # mandatory field in SauceNao
+            alternate_links = [a_tag['href'] for a_tag in
+                               res.find_next('div', attrs={"class": CLASS_MISC_INFO}).find_all('a', href=True)]
+            content_column = []
+            content_column_tags = res.find_all('div', attrs={"class": CLASS_CONTENT_COLUMN})
+            for content_column_tag in content_column_tags:
+                for br in content_column_tag.find_all('br'):
+                    br.replace_with('\n')
+                content_column.append(content_column_tag.text)
+
+            results['results'].append(self._create_result(similarity, title, content_column, alternate_links))
+
+        return results
+
+
+class _ResultHTMLParser(HTMLParser):
+    """
+    single pass state machine collecting the fields of all result cells while the page is fed,
+    every field is taken from the first matching block following the start of the cell like bs4's find_next
+    """
+
+    # fields of the result data filled by the blocks following the cell
+    FOLLOWING_FIELDS = {
+        CLASS_TITLE: 'title',
+        CLASS_SIMILARITY: 'similarity',
+        CLASS_MISC_INFO: 'ext_urls',
+    }
+
+    def __init__(self, minimum_similarity: float = None, limit: int = None, stop_early: bool = False):
+        """Initializing function
+
+        :type minimum_similarity: float
+        :type limit: int
+        :type stop_early: bool
+        """
+        super().__init__(convert_charrefs=True)
+        self.minimum_similarity = minimum_similarity
+        self.limit = limit
+        # SauceNAO lists the results descending by similarity, so with stop_early all results following
+        # a result below the minimum similarity or beyond the limit are skipped without looking at them
+        self.stop_early = stop_early
+        self.exhausted = False
+        self.results = []
+        # results still waiting for the next block of the following fields
+        self._pending = {field: [] for field in self.FOLLOWING_FIELDS.values()}
+        # results of the currently open cells with the depth of the cell and currently open blocks
+        self._cells = []
+        self._blocks = []
+        self._td_depth = 0
+        self._div_depth = 0
+        # text between two tags, possibly delivered in multiple chunks
+        self._data = []
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_data()
+        if tag == 'div':
+            self._div_depth += 1
+            classes = self._get_classes(attrs)
+            if not classes:
+                return
+
+            for class_name, field in self.FOLLOWING_FIELDS.items():
+                if class_name in classes:
+                    self._open_block(field, self._pending[field])
+                    self._pending[field] = []
+
+            if CLASS_CONTENT_COLUMN in classes and self._cells:
+                self._open_block('content', [cell for cell, _ in self._cells])
+        elif tag == 'td':
+            self._td_depth += 1
+            if CLASS_TABLE_CONTENT in self._get_classes(attrs):
+                result = {'title': None, 'similarity': None, 'ext_urls': None, 'content': [], 'skipped': False}
+                if self.stop_early and (self.exhausted or self.limit is not None and self.selected >= self.limit):
+                    result['skipped'] = True
+                    self.exhausted = True
+                self.results.append(result)
+                self._cells.append((result, self._td_depth))
+                for pending in self._pending.values():
+                    pending.append(result)
+        elif tag == 'a':
+            for field, _, _, collected in self._blocks:
+                if field == 'ext_urls' and collected is not None:
+                    href = dict(attrs).get('href', False)
+                    if href is not False:
+                        collected.append(href or '')
+        elif tag == 'br':
+            for field, _, _, collected in self._blocks:
+                if field == 'content' and collected is not None:
+                    collected.append('\n')
+
+    def handle_endtag(self, tag):
+        self._flush_data()
+        if tag == 'div':
+            while self._blocks and self._blocks[-1][1] == self._div_depth:
+                field, _, targets, collected = self._blocks.pop()
+                if collected is None:
+                    continue
+
+                value = ''.join(collected) if field != 'ext_urls' else None
+                for result in targets:
+                    if field == 'content':
+                        result['content'].append(value)
+                    elif field == 'ext_urls':
+                        result[field] = list(collected)
+                    else:
+                        result[field] = value
+
+                if field == 'similarity' and self.minimum_similarity is not None:
+                    for result in targets:
+                        result['skipped'] = float(result['similarity'].replace('%', '')) < self.minimum_similarity
+                        self.exhausted = self.exhausted or (self.stop_early and result['skipped'])
+            self._div_depth = max(0, self._div_depth - 1)
+        elif tag == 'td':
+            while self._cells and self._cells[-1][1] == self._td_depth:
+                self._cells.pop()
+            self._td_depth = max(0, self._td_depth - 1)
+
+    def handle_data(self, data):
+        self._data.append(data)
+
+    def handle_comment(self, data):
+        self._flush_data()
+
+    def handle_decl(self, decl):
+        self._flush_data()
+
+    def handle_pi(self, data):
+        self._flush_data()
+
+    def close(self):
+        super().close()
+        self._flush_data()
+
+    def _flush_data(self):
+        """Append the text since the last tag to the currently open blocks
+
+        :return:
+        """
+        if not self._data:
+            return
+
+        data = normalize_string(''.join(self._data))
+        self._data = []
+        for field, _, _, collected in self._blocks:
+            if field != 'ext_urls' and collected is not None:
+                collected.append(data)
+
+    @property
+    def selected(self) -> int:
+        """Property for the amount of results which weren't skipped so far
+
+        :return:
+        """
+        return sum(1 for result in self.results if not result['skipped'])
+
+    @property
+    def done(self) -> bool:
+        """Property if no further result is selected and all fields of the selected results are complete,
+        so the rest of the page can't change the results anymore
+
+        :return:
+        """
+        if not self.exhausted:
+            return False
+
+        for pending in self._pending.values():
+            if any(not result['skipped'] for result in pending):
+                return False
+        if any(collected is not None for _, _, _, collected in self._blocks):
+            return False
+        return not any(not result['skipped'] for result, _ in self._cells)
+
+    def _open_block(self, field: str, targets: list):
+        """Start collecting the field for the passed results, results below the minimum similarity are left out
+
+        :type field: str
+        :type targets: list
+        :return:
+        """
+        targets = [result for result in targets if not result['skipped']]
+        # blocks without any results are still tracked to find their end
+        self._blocks.append((field, self._div_depth, targets, [] if targets else None))
+
+    @staticmethod
+    def _get_classes(attrs) -> list:
+        """Extract the classes of the tag attributes
+
+        :type attrs: list
+        :return:
+        """
+        for name, value in attrs:
+            if name == 'class' and value:
+                return value.split()
+        return []
+
+
+class HtmlResultParser(ResultParser):
+    """
+    fast engine extracting similarity, title, content columns and links in a single sweep of html.parser
+    """
+
+    name = 'html'
+
+    def _parse(self, html: str, minimum_similarity: float = None, limit: int = None) -> dict:
+        """Parse the results with a single pass over the page
+
+        :type html: str
+        :type minimum_similarity: float
+        :type limit: int
+        :return:
+        """
+        parser = _ResultHTMLParser(minimum_similarity)
+        parser.feed(html)
+        parser.close()
+        return self._get_results(parser, limit)
+
+    def parse_stream(self, chunks: Iterable[bytes], encoding: str = 'utf-8', minimum_similarity: float = None,
+                     limit: int = None) -> dict:
+        """Parse the results while the chunks of the HTML response arrive and stop reading them
+        as soon as the following results can't be selected anymore.
+        This relies on SauceNAO listing the results descending by similarity
+
+        :type chunks: Iterable[bytes]
+        :type encoding: str
+        :type minimum_similarity: float
+        :type limit: int
+        :return:
+        """
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        parser = _ResultHTMLParser(minimum_similarity, limit, stop_early=True)
+        # the decoded page is kept to fall back to BeautifulSoup
+        decoded = []
+        chunks = iter(chunks)
+        for chunk in chunks:
+            decoded.append(decoder.decode(chunk))
+            parser.feed(decoded[-1])
+            if parser.done:
+                break
+        else:
+            decoded.append(decoder.decode(b'', final=True))
+            parser.feed(decoded[-1])
+            parser.close()
+
+        try:
+            return self._get_results(parser, limit)
+        except ResultParserException:
+            html = ''.join(decoded) + ''.join(decoder.decode(chunk) for chunk in chunks) + \
+                   decoder.decode(b'', final=True)
+            return SoupResultParser()._parse(html, minimum_similarity, limit)
+
+    def _get_results(self, parser: _ResultHTMLParser, limit: int = None) -> dict:
+        """Select the results of the fed parser in the format of the JSON API response
+
+        :type parser: _ResultHTMLParser
+        :type limit: int
+        :return:
+        """
+        cells = [result for result in parser.results if not result['skipped']]
+        for result in cells:
+            # the similarity and the miscellaneous info are mandatory fields in SauceNao
+            if result['similarity'] is None or result['ext_urls'] is None:
+                raise ResultParserException("result without similarity or miscellaneous info")
+
+        similarities = [result['similarity'].replace('%', '') for result in cells]
+        results = {'header': {}, 'results': []}
+        for index in select_results(similarities, limit=limit):
+            result = cells[index]
+            results['results'].append(self._create_result(similarities[index], result['title'] or '',
+                                                          result['content'], result['ext_urls']))
+        return results
+
+
+class LxmlResultParser(ResultParser):
+    """
+    fast engine building the tree with lxml and extracting the fields with precompiled XPath expressions
+    """
+
+    name = 'lxml'
+
+    CLASS_CONDITION = "contains(concat(' ', normalize-space(@class), ' '), ' {0:s} ')"
+
+    def __init__(self):
+        """Initializing function"""
+        if etree is None:
+            raise ImportError("the lxml parser engine requires lxml, install it with: pip install SauceNAO[lxml]")
+
+        self._cells = etree.XPath("//td[{0:s}]".format(self.CLASS_CONDITION.format(CLASS_TABLE_CONTENT)))
+        # first block in document order after the start of the cell, equal to find_next of bs4
+        self._following = {
+            class_name: etree.XPath("(descendant::div[{0:s}] | following::div[{0:s}])[1]".format(
+                self.CLASS_CONDITION.format(class_name)))
+            for class_name in (CLASS_TITLE, CLASS_SIMILARITY, CLASS_MISC_INFO)
+        }
+        self._content_columns = etree.XPath("descendant::div[{0:s}]".format(
+            self.CLASS_CONDITION.format(CLASS_CONTENT_COLUMN)))
+        self._links = etree.XPath("descendant::a[@href]/@href")
+
+    def _parse(self, html: str, minimum_similarity: float = None, limit: int = None) -> dict:
+        """Parse the results from the lxml tree of the page
+
+        :type html: str
+        :type minimum_similarity: float
+        :type limit: int
+        :return:
+        """
+        results = {'header': {}, 'results': []}
+        if not html.strip():
+            return results
+
+        try:
+            document = lxml.html.document_fromstring(html)
+        except (ValueError, etree.ParserError) as e:
+            raise ResultParserException(str(e))
+
+        cells = self._cells(document)
+        similarities = []
+        for cell in cells:
+            similarity_tag = self._following[CLASS_SIMILARITY](cell)
+            if not similarity_tag:
+                raise ResultParserException("result without similarity")
+            similarities.append(self._get_text(similarity_tag[0]).replace('%', ''))
+
+        for index in select_results(similarities, minimum_similarity, limit):
+            cell = cells[index]
+            title_tag = self._following[CLASS_TITLE](cell)
+            misc_info_tag = self._following[CLASS_MISC_INFO](cell)
+            if not misc_info_tag:
+                raise ResultParserException("result without miscellaneous info")
+
+            content_column = [self._get_text(content_column_tag, replace_br=True)
+                              for content_column_tag in self._content_columns(cell)]
+
+            results['results'].append(self._create_result(
+                similarities[index],
+                self._get_text(title_tag[0]) if title_tag else '',
+                content_column,
+                [str(link) for link in self._links(misc_info_tag[0])]
+            ))
+
+        return results
+
+    def _get_text(self, tag, replace_br: bool = False) -> str:
+        """Retrieve the text of the tag equal to the text of the BeautifulSoup tag
+
+        :type tag: lxml.html.HtmlElement
+        :type replace_br: bool
+        :return:
+        """
+        parts = []
+        self._collect_text(tag, parts, replace_br)
+        return ''.join(parts)
+
+    def _collect_text(self, tag, parts: list, replace_br: bool):
+        """Collect the normalized text of the tag and its children, skipping comments
+
+        :type tag: lxml.html.HtmlElement
+        :type parts: list
+        :type replace_br: bool
+        :return:
+        """
+        if replace_br and tag.tag == 'br':
+            parts.append('\n')
+        elif isinstance(tag.tag, str) and tag.text:
+            parts.append(normalize_string(tag.text))
+
+        for child in tag:
+            self._collect_text(child, parts, replace_br)
+            if child.tail:
+                parts.append(normalize_string(child.tail))
+
+
+PARSER_ENGINES = {
+    SoupResultParser.name: SoupResultParser,
+    HtmlResultParser.name: HtmlResultParser,
+    LxmlResultParser.name: LxmlResultParser,
+}
+
+# lxml builds the tree in C and is the fastest engine if it is installed
+DEFAULT_PARSER_ENGINE = LxmlResultParser.name if etree is not None else HtmlResultParser.name
+
+
+def get_parser(engine: str = None) -> ResultParser:
+    """Create the parser of the passed engine, the fastest available engine is used if none is passed
+
+    :type engine: str
+    :return:
+    """
+    if engine is None:
+        engine = DEFAULT_PARSER_ENGINE
+
+    if engine not in PARSER_ENGINES:
+        raise ValueError("unknown parser engine: {0!r}, available engines are: {1:s}".format(
+            engine, ', '.join(sorted(PARSER_ENGINES))))
+    return PARSER_ENGINES[engine]()
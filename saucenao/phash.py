@@ -0,0 +1,69 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from typing import BinaryIO, Iterable
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def dhash(file_object: BinaryIO, hash_size: int = 8) -> int:
+    """Calculate the difference hash of the image, which stays the same for resized or re-encoded copies
+    and only differs in a few bits for slightly modified images
+
+    :type file_object: BinaryIO
+    :type hash_size: int
+    :return:
+    """
+    if Image is None:
+        raise ImportError("perceptual hashes require Pillow, install it with: pip install SauceNAO[preprocess]")
+
+    image = Image.open(file_object)
+    # let the JPEG decoder already scale down while decoding
+    image.draft('L', (hash_size * 8, hash_size * 8))
+    image = image.convert('L').resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = image.tobytes()
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for column in range(hash_size):
+            value = value << 1 | (pixels[offset + column] > pixels[offset + column + 1])
+    return value
+
+
+def hamming_distance(x: int, y: int) -> int:
+    """Return the amount of differing bits of both hashes
+
+    :type x: int
+    :type y: int
+    :return:
+    """
+    return bin(x ^ y).count('1')
+
+
+def cluster_by_hash(hashed_items: Iterable[tuple], threshold: int) -> list:
+    """Group the (item, hash) pairs into clusters of near-duplicates with a distance of at most threshold
+    to the first item of the cluster, items without hash get their own cluster.
+    Returns (representative, [members]) tuples in the order of the representatives
+
+    :type hashed_items: Iterable[tuple]
+    :type threshold: int
+    :return:
+    """
+    clusters = []
+    representatives = []
+    for item, item_hash in hashed_items:
+        if item_hash is not None:
+            for representative_hash, members in representatives:
+                if hamming_distance(item_hash, representative_hash) <= threshold:
+                    members.append(item)
+                    break
+            else:
+                members = []
+                representatives.append((item_hash, members))
+                clusters.append((item, members))
+        else:
+            clusters.append((item, []))
+    return clusters
@@ -0,0 +1,120 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import io
+import threading
+from collections import OrderedDict
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from saucenao.upload import UploadBuffer
+
+
+class ImagePreprocessor(object):
+    """
+    downscale and re-encode images exceeding the maximum dimension or byte budget before uploading them,
+    SauceNAO compares downscaled images anyways so a thumbnail finds the same results
+    """
+
+    def __init__(self, max_dimension: int = 1200, max_bytes: int = 2 * 1024 * 1024, quality: int = 90,
+                 minimum_quality: int = 60, cache_size: int = 128, cache_bytes: int = 16 * 1024 * 1024):
+        """Initializing function
+
+        :type max_dimension: int
+        :type max_bytes: int
+        :type quality: int
+        :type minimum_quality: int
+        :type cache_size: int
+        :type cache_bytes: int
+        """
+        if Image is None:
+            raise ImportError("the image preprocessing requires Pillow, "
+                              "install it with: pip install SauceNAO[preprocess]")
+
+        self.max_dimension = max_dimension
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self.minimum_quality = minimum_quality
+        self.cache_size = cache_size
+        self.cache_bytes = cache_bytes
+
+        # derived thumbnails by digest of the original, so repeated checks of a file don't process it again,
+        # limited by the number of entries and the total size of the thumbnails
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def process(self, upload_buffer: UploadBuffer):
+        """Return the re-encoded thumbnail of the payload or None if the original can be uploaded
+
+        :type upload_buffer: UploadBuffer
+        :return: bytes|None
+        """
+        digest = upload_buffer.digest
+        with self._lock:
+            if digest in self._cache:
+                self._cache.move_to_end(digest)
+                return self._cache[digest]
+
+        thumbnail = self.__create_thumbnail(upload_buffer)
+
+        size = self.__get_size(thumbnail)
+        if size > self.cache_bytes:
+            return thumbnail
+
+        with self._lock:
+            if digest in self._cache:
+                self._cached_bytes -= self.__get_size(self._cache.pop(digest))
+            self._cache[digest] = thumbnail
+            self._cached_bytes += size
+            while len(self._cache) > self.cache_size or self._cached_bytes > self.cache_bytes:
+                self._cached_bytes -= self.__get_size(self._cache.popitem(last=False)[1])
+        return thumbnail
+
+    @staticmethod
+    def __get_size(thumbnail) -> int:
+        """Return the size of the cached thumbnail, originals which are uploaded unmodified are cached as None
+
+        :type thumbnail: bytes|None
+        :return:
+        """
+        return len(thumbnail) if thumbnail is not None else 0
+
+    def __create_thumbnail(self, upload_buffer: UploadBuffer):
+        """Downscale and re-encode the image if it exceeds the limits
+
+        :type upload_buffer: UploadBuffer
+        :return: bytes|None
+        """
+        try:
+            image = Image.open(upload_buffer.open())
+        except (IOError, SyntaxError, ValueError):
+            # not an image Pillow can read, upload it unmodified
+            return None
+        except Image.DecompressionBombError:
+            # decoding the image would exhaust the memory, SauceNAO decides what to do with the original
+            return None
+
+        if len(upload_buffer) <= self.max_bytes and max(image.size) <= self.max_dimension:
+            return None
+
+        size = (self.max_dimension, self.max_dimension)
+        # let the JPEG decoder already scale down while decoding
+        image.draft('RGB', size)
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        image.thumbnail(size)
+
+        quality = self.quality
+        while True:
+            output = io.BytesIO()
+            image.save(output, 'JPEG', quality=quality, optimize=True)
+            if output.tell() <= self.max_bytes or max(image.size) <= 64:
+                return output.getvalue()
+
+            if quality > self.minimum_quality:
+                quality = max(self.minimum_quality, quality - 10)
+            else:
+                image.thumbnail((int(image.size[0] * 0.75), int(image.size[1] * 0.75)))
@@ -0,0 +1,88 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+# all available account types, unregistered (always if no API key is passed), basic or premium
+ACCOUNT_TYPE_UNREGISTERED = ""
+ACCOUNT_TYPE_BASIC = "basic"
+ACCOUNT_TYPE_PREMIUM = "premium"
+
+# individual search usage limitations of the account types
+LIMIT_30_SECONDS = {
+    ACCOUNT_TYPE_UNREGISTERED: 4,
+    ACCOUNT_TYPE_BASIC: 6,
+    ACCOUNT_TYPE_PREMIUM: 15,
+}
+
+
+class QuotaState(object):
+    """
+    search quota of an account as reported in the header of the JSON API responses,
+    short is the limit per 30 seconds, long the daily limit
+    """
+
+    # numeric fields of the response header
+    HEADER_FIELDS = ('short_limit', 'short_remaining', 'long_limit', 'long_remaining')
+
+    def __init__(self):
+        """Initializing function"""
+        self._lock = threading.Lock()
+        self.short_limit = None
+        self.short_remaining = None
+        self.long_limit = None
+        self.long_remaining = None
+        self.account_type = None
+        self.user_id = None
+        self.updated = None
+
+    def __repr__(self):
+        return "QuotaState({0!r})".format(self.as_dict())
+
+    @property
+    def is_known(self) -> bool:
+        """Property if a response header with quota information has been received already
+
+        :return:
+        """
+        return self.updated is not None
+
+    def update(self, header: dict) -> bool:
+        """Update the quota with the values of the response header, returns if the header contained quota information
+
+        :type header: dict
+        :return:
+        """
+        values = {}
+        for field in self.HEADER_FIELDS:
+            try:
+                values[field] = int(header[field])
+            except (KeyError, TypeError, ValueError):
+                continue
+
+        if not values:
+            return False
+
+        with self._lock:
+            for field, value in values.items():
+                setattr(self, field, value)
+            self.account_type = header.get('account_type', self.account_type)
+            self.user_id = header.get('user_id', self.user_id)
+            self.updated = time.time()
+        return True
+
+    def as_dict(self) -> dict:
+        """Return a consistent snapshot of the current quota
+
+        :return:
+        """
+        with self._lock:
+            return {
+                'short_limit': self.short_limit,
+                'short_remaining': self.short_remaining,
+                'long_limit': self.long_limit,
+                'long_remaining': self.long_remaining,
+                'account_type': self.account_type,
+                'user_id': self.user_id,
+                'updated': self.updated,
+            }
@@ -0,0 +1,558 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import copy
+import re
+from functools import lru_cache
+from typing import Iterable
+
+CONTENT_CATEGORY_KEY = 'Material'
+CONTENT_AUTHOR_KEY = 'Creator'
+CONTENT_CHARACTERS_KEY = 'Characters'
+
+# keys of the content start a line and of the title the title itself, f.e. "<strong>Material: </strong>original"
+CONTENT_KEY_PATTERN = re.compile(r'^(.+?): ', re.MULTILINE)
+TITLE_KEY_PATTERN = re.compile(r'^(.+?): ')
+# characters with a special meaning in patterns outside of character sets
+SPECIAL_CHARACTERS_PATTERN = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+# labels of the content lines of the HTML response for the data fields of the JSON API response in their order
+CONTENT_FIELD_LABELS = (
+    ('source', 'Source'),
+    ('material', CONTENT_CATEGORY_KEY),
+    ('characters', CONTENT_CHARACTERS_KEY),
+    ('pixiv_id', 'Pixiv ID'),
+    ('nijie_id', 'Nijie ID'),
+    ('da_id', 'dA ID'),
+    ('member_name', 'Member'),
+    ('author_name', 'Author'),
+    ('part', 'Part'),
+    ('year', 'Year'),
+    ('est_time', 'Est Time'),
+)
+# fields only the HTML response contains, enriched results list the fields which couldn't be derived in their header
+ENRICHED_DATA_FIELDS = ('title', 'content')
+MISSING_FIELDS_KEY = 'missing_fields'
+
+# placeholder of the data of results whose dictionary view wasn't built yet
+_LAZY_DATA = object()
+
+
+@lru_cache(maxsize=256)
+def get_key_patterns(key: str) -> tuple:
+    """Return the compiled search and split pattern of the key,
+    the key is used as pattern like it always was, so keys with special characters behave the same
+
+    :type key: str
+    :return:
+    """
+    return re.compile(r'{0:s}: .*'.format(key)), re.compile(r'{0:s}: '.format(key))
+
+
+def is_plain_key(key: str) -> bool:
+    """Check if the key contains no special characters of patterns, so it only matches itself
+
+    :type key: str
+    :return:
+    """
+    return not SPECIAL_CHARACTERS_PATTERN.search(key)
+
+
+def extract_value(text: str, key: str) -> list:
+    """Return the lines following the first occurrence of the key in the text
+
+    :type text: str
+    :type key: str
+    :return:
+    """
+    return ''.join(get_key_patterns(key)[1].split(text)[1:]).rstrip("\n").split('\n')
+
+
+def extract_content_value(content, key: str):
+    """Return the value of the first content line containing the key or None if no line contains it
+
+    :type content: Iterable[str]
+    :type key: str
+    :return: list|None
+    """
+    search_pattern = get_key_patterns(key)[0]
+    for line in content:
+        if search_pattern.search(line):
+            return extract_value(line, key)
+    return None
+
+
+def extract_title_value(title: str, key: str):
+    """Return the value of the title if it starts with the key or None if it doesn't
+
+    :type title: str
+    :type key: str
+    :return: list|None
+    """
+    if get_key_patterns(key)[0].match(title):
+        return extract_value(title, key)
+    return None
+
+
+def build_content_index(content) -> dict:
+    """Build the index of all keys starting a line of the content,
+    every key is mapped to the value the extraction of the key returns.
+    Values of plain keys are taken from the content line the key starts in if no previous line contains the key,
+    only the other keys require the extraction searching all lines again
+
+    :type content: Iterable[str]
+    :return:
+    """
+    content = tuple(content)
+    index = {}
+    for position, line in enumerate(content):
+        for key in CONTENT_KEY_PATTERN.findall(line):
+            if key in index:
+                continue
+
+            needle = key + ': '
+            if is_plain_key(key) and not any(needle in previous for previous in content[:position]):
+                value = extract_value(line, key)
+            else:
+                value = extract_content_value(content, key)
+            if value is not None:
+                index[key] = tuple(value)
+    return index
+
+
+def build_title_index(title: str) -> dict:
+    """Build the index of the key the title starts with
+
+    :type title: str
+    :return:
+    """
+    index = {}
+    match = TITLE_KEY_PATTERN.match(title)
+    if match:
+        value = extract_title_value(title, match.group(1))
+        if value is not None:
+            index[match.group(1)] = tuple(value)
+    return index
+
+
+def format_field_value(value) -> str:
+    """Format the value of a data field like the HTML response displays it
+
+    :type value: str|int|list
+    :return:
+    """
+    if isinstance(value, list):
+        return ', '.join(str(item) for item in value)
+    return str(value)
+
+
+def enrich_result(result: dict) -> dict:
+    """Derive the title and content of the HTML response from the data fields of a JSON API result,
+    so a single JSON request provides the fields of both response types.
+    Fields which can't be derived are listed in the missing fields of the header
+
+    :type result: dict
+    :return:
+    """
+    header = dict(result.get('header', {}))
+    data = dict(result.get('data', {}))
+
+    lines = ['{0:s}: {1:s}'.format(label, format_field_value(data[field])) for field, label in CONTENT_FIELD_LABELS
+             if data.get(field) not in (None, '', [])]
+
+    # single creators are the title of results without title, multiple creators are listed in the content
+    creator = data.get('creator')
+    if not isinstance(data.get('title'), str) and isinstance(creator, str) and creator:
+        data['title'] = '{0:s}: {1:s}'.format(CONTENT_AUTHOR_KEY, creator)
+    elif creator:
+        lines.append('{0:s}(s): {1:s}'.format(CONTENT_AUTHOR_KEY, format_field_value(creator)))
+
+    if not isinstance(data.get('content'), list) and lines:
+        data['content'] = ['\n'.join(lines) + '\n']
+
+    header[MISSING_FIELDS_KEY] = [field for field in ENRICHED_DATA_FIELDS if field not in data]
+    return {'header': header, 'data': data}
+
+
+def extract_line_value(content, key: str):
+    """Return the value of the first occurrence of the key in the content up to the end of its line
+    or None if no line contains the key
+
+    :type content: Iterable[str]
+    :type key: str
+    :return: str|None
+    """
+    needle = key + ': '
+    for text in content:
+        position = text.find(needle)
+        if position != -1:
+            return text[position + len(needle):].split('\n', 1)[0]
+    return None
+
+
+def copy_fields(fields: dict) -> dict:
+    """Copy the fields of the result including their lists, so modifications don't affect the passed fields
+
+    :type fields: dict
+    :return:
+    """
+    return {key: copy.copy(value) if isinstance(value, (list, dict)) else value for key, value in fields.items()}
+
+
+def extract_content_values(result_sets: Iterable[Iterable], key: str) -> list:
+    """Return the content value of the key of the first matching result for every set of results,
+    '' for sets without the key
+
+    :type result_sets: Iterable[Iterable[SauceNaoResult|dict]]
+    :type key: str
+    :return:
+    """
+    values = []
+    for results in result_sets:
+        for result in results:
+            if isinstance(result, SauceNaoResult):
+                value = result.get_content_value(key)
+            elif 'content' in result['data']:
+                value = extract_content_value(result['data']['content'], key)
+            else:
+                continue
+
+            if value is not None:
+                values.append(list(value))
+                break
+        else:
+            values.append('')
+    return values
+
+
+def extract_title_values(result_sets: Iterable[Iterable], key: str) -> list:
+    """Return the title value of the key of the first matching result for every set of results,
+    '' for sets without the key
+
+    :type result_sets: Iterable[Iterable[SauceNaoResult|dict]]
+    :type key: str
+    :return:
+    """
+    values = []
+    for results in result_sets:
+        for result in results:
+            if isinstance(result, SauceNaoResult):
+                value = result.get_title_value(key)
+            elif 'title' in result['data']:
+                value = extract_title_value(result['data']['title'], key)
+            else:
+                continue
+
+            if value is not None:
+                values.append(list(value))
+                break
+        else:
+            values.append('')
+    return values
+
+
+class SauceNaoResult(dict):
+    """
+    typed result of a search with the similarity as float and the keys of the content and title indexed once.
+    The typed fields are stored in slots, the result is still a dictionary in the format of the JSON API response,
+    so it can be serialized and modified like the results always could.
+    The data of the dictionary view is only built on the first access, from then on the typed fields are read from it
+    """
+
+    __slots__ = ('similarity', '_data', '_title', '_content', '_ext_urls', '_content_index', '_title_index')
+
+    def __init__(self, header: dict, data: dict, similarity: float = None):
+        """Initializing function
+
+        :type header: dict
+        :type data: dict
+        :type similarity: float
+        """
+        # the data of the dictionary view is a placeholder until it gets built
+        super().__init__(header=header, data=_LAZY_DATA)
+        self.similarity = float(header['similarity']) if similarity is None else similarity
+
+        title, content, ext_urls = data.get('title'), data.get('content'), data.get('ext_urls')
+        self._title = title if isinstance(title, str) else None
+        self._content = tuple(content) if isinstance(content, list) else None
+        self._ext_urls = tuple(ext_urls) if isinstance(ext_urls, list) else None
+        # remaining fields of the data and fields of unexpected types, most HTML results have none
+        typed = {'title': self._title, 'content': self._content, 'ext_urls': self._ext_urls}
+        self._data = {key: value for key, value in data.items() if typed.get(key) is None} or None
+
+        # indices of the keys with their values as immutable tuples, built on the first lookup
+        self._content_index = None
+        self._title_index = None
+
+    @classmethod
+    def from_dict(cls, result, similarity: float = None):
+        """Create the result from a result of the JSON API response format, the passed result isn't modified
+
+        :type result: dict|SauceNaoResult
+        :type similarity: float
+        :return: SauceNaoResult
+        """
+        if isinstance(result, cls):
+            return result
+
+        return cls(header=copy_fields(result.get('header', {})), data=copy_fields(result.get('data', {})),
+                   similarity=similarity)
+
+    def _build(self):
+        """Build the data of the dictionary view from the typed fields if it wasn't built yet
+
+        :return:
+        """
+        if not self._is_built:
+            data = {}
+            if self._ext_urls is not None:
+                data['ext_urls'] = list(self._ext_urls)
+            if self._title is not None:
+                data['title'] = self._title
+            if self._content is not None:
+                data['content'] = list(self._content)
+            if self._data:
+                data.update(self._data)
+            dict.__setitem__(self, 'data', data)
+            # the dictionary view is the only copy of the fields from now on
+            self._data = self._title = self._content = self._ext_urls = None
+
+    def to_dict(self) -> dict:
+        """Return a copy of the result in the format of the JSON API response
+
+        :return:
+        """
+        self._build()
+        return copy.deepcopy(dict(super().items()))
+
+    @property
+    def header(self) -> dict:
+        """Property for the header of the result in the format of the JSON API response
+
+        :return:
+        """
+        # the header is always stored in the dictionary, so it doesn't build the data
+        return dict.__getitem__(self, 'header')
+
+    @property
+    def data(self) -> dict:
+        """Property for the data of the result in the format of the JSON API response
+
+        :return:
+        """
+        return self['data']
+
+    @property
+    def _is_built(self) -> bool:
+        """Property if the data of the dictionary view was already built
+
+        :return:
+        """
+        return dict.get(self, 'data') is not _LAZY_DATA
+
+    @property
+    def title(self):
+        """Property for the title of the result
+
+        :return: str|None
+        """
+        if not self._is_built:
+            return self._title
+        title = self['data'].get('title')
+        return title if isinstance(title, str) else None
+
+    @property
+    def content(self):
+        """Property for the content lines of the result
+
+        :return: tuple|None
+        """
+        if not self._is_built:
+            return self._content
+        content = self['data'].get('content')
+        return tuple(content) if isinstance(content, list) else None
+
+    @property
+    def ext_urls(self):
+        """Property for the external urls of the result
+
+        :return: tuple|None
+        """
+        if not self._is_built:
+            return self._ext_urls
+        ext_urls = self['data'].get('ext_urls')
+        return tuple(ext_urls) if isinstance(ext_urls, list) else None
+
+    @property
+    def material(self):
+        """Property for the material of the content, the value ends with its line
+
+        :return: str|None
+        """
+        return extract_line_value(self.content or (), CONTENT_CATEGORY_KEY)
+
+    @property
+    def characters(self):
+        """Property for the characters of the content, the value ends with its line
+
+        :return: str|None
+        """
+        return extract_line_value(self.content or (), CONTENT_CHARACTERS_KEY)
+
+    @property
+    def creator(self):
+        """Property for the creator of the title, the value ends with its line
+
+        :return: str|None
+        """
+        title = self.title
+        prefix = CONTENT_AUTHOR_KEY + ': '
+        if title is None or not title.startswith(prefix):
+            return None
+        return title[len(prefix):].split('\n', 1)[0]
+
+    @property
+    def content_index(self) -> dict:
+        """Property for the index of the keys starting a line of the content
+
+        :return:
+        """
+        if self._content_index is None:
+            content = self.content
+            self._content_index = build_content_index(content) if content is not None else {}
+        return self._content_index
+
+    @property
+    def title_index(self) -> dict:
+        """Property for the index of the key the title starts with
+
+        :return:
+        """
+        if self._title_index is None:
+            title = self.title
+            self._title_index = build_title_index(title) if title is not None else {}
+        return self._title_index
+
+    def get_content_value(self, key: str):
+        """Return the value of the first content line containing the key or None if no line contains it
+
+        :type key: str
+        :return: tuple|None
+        """
+        content = self.content
+        if content is None:
+            return None
+
+        value = self.content_index.get(key)
+        if value is not None:
+            return value
+
+        # keys not starting a line can still be contained in it, which only a search finds
+        needle = key + ': '
+        if is_plain_key(key) and not any(needle in line for line in content):
+            return None
+        return self._to_tuple(extract_content_value(content, key))
+
+    def get_title_value(self, key: str):
+        """Return the value of the title if it starts with the key or None if it doesn't
+
+        :type key: str
+        :return: tuple|None
+        """
+        title = self.title
+        if title is None:
+            return None
+
+        value = self.title_index.get(key)
+        if value is not None:
+            return value
+
+        if is_plain_key(key) and not title.startswith(key + ': '):
+            return None
+        return self._to_tuple(extract_title_value(title, key))
+
+    @staticmethod
+    def _to_tuple(value):
+        """Convert the extracted value to a tuple
+
+        :type value: list|None
+        :return: tuple|None
+        """
+        if value is None:
+            return None
+        return tuple(value)
+
+    def __getitem__(self, key):
+        self._build()
+        return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        self._build()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._build()
+        super().__delitem__(key)
+
+    def __iter__(self):
+        self._build()
+        return super().__iter__()
+
+    def __eq__(self, other):
+        self._build()
+        if isinstance(other, SauceNaoResult):
+            other._build()
+        return super().__eq__(other)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def get(self, key, default=None):
+        self._build()
+        return super().get(key, default)
+
+    def keys(self):
+        self._build()
+        return super().keys()
+
+    def values(self):
+        self._build()
+        return super().values()
+
+    def items(self):
+        self._build()
+        return super().items()
+
+    def copy(self) -> dict:
+        self._build()
+        return dict(super().items())
+
+    def pop(self, *args):
+        self._build()
+        return super().pop(*args)
+
+    def popitem(self):
+        self._build()
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        self._build()
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        self._build()
+        super().update(*args, **kwargs)
+
+    def __reduce__(self):
+        self._build()
+        return type(self), (super().__getitem__('header'), super().__getitem__('data'), self.similarity)
+
+    def __or__(self, other):
+        self._build()
+        return super().__or__(other)
+
+    def __repr__(self):
+        self._build()
+        return '{0:s}({1:s})'.format(type(self).__name__, super().__repr__())
@@ -0,0 +1,92 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import heapq
+import itertools
+import random
+import time
+
+
+class RetryPolicy(object):
+    """
+    exponential backoff with jitter for searches which should be repeated
+    """
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 10.0, max_delay: float = 120.0,
+                 jitter: float = 0.25):
+        """Initializing function
+
+        :type max_retries: int
+        :type base_delay: float
+        :type max_delay: float
+        :type jitter: float
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def can_retry(self, attempt: int) -> bool:
+        """Check if the retry budget allows the given retry attempt (starting at 1)
+
+        :type attempt: int
+        :return:
+        """
+        return attempt <= self.max_retries
+
+    def get_delay(self, attempt: int) -> float:
+        """Return the delay before the given retry attempt (starting at 1),
+        doubled on every attempt and reduced by a random part of up to `jitter`
+
+        :type attempt: int
+        :return:
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
+
+
+class RetryScheduler(object):
+    """
+    deferred queue of items waiting for their next attempt, ordered by the time they are ready
+    """
+
+    def __init__(self, policy: RetryPolicy):
+        """Initializing function
+
+        :type policy: RetryPolicy
+        """
+        self.policy = policy
+        self._queue = []
+        # tie breaker, the deferred items themselves are not comparable
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._queue)
+
+    def defer(self, item, attempt: int) -> float:
+        """Defer the item for the delay of the given retry attempt and return the delay
+
+        :type item:
+        :type attempt: int
+        :return:
+        """
+        delay = self.policy.get_delay(attempt)
+        heapq.heappush(self._queue, (time.monotonic() + delay, next(self._counter), item, attempt))
+        return delay
+
+    def time_until_ready(self) -> float:
+        """Return the seconds until the next deferred item is ready
+
+        :return:
+        """
+        if not self._queue:
+            return 0.0
+        return max(0.0, self._queue[0][0] - time.monotonic())
+
+    def pop_ready(self):
+        """Yield all items which are ready for their next attempt as (item, attempt)
+
+        :return:
+        """
+        while self._queue and self._queue[0][0] <= time.monotonic():
+            _, _, item, attempt = heapq.heappop(self._queue)
+            yield item, attempt
@@ -1,19 +1,24 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 import enum
+import io
 import json
 import logging
 import os
-import re
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Generator, BinaryIO, Iterable
 
-import requests
-from bs4 import BeautifulSoup as Soup
-from bs4 import element
-
-from saucenao import http
+from saucenao import codec, http, quota
 from saucenao.exceptions import *
+from saucenao.keypool import ApiKey, ApiKeyPool
+from saucenao.limiter import TokenBucketLimiter
+from saucenao.parser import get_parser, select_results
+from saucenao.phash import dhash
+from saucenao.quota import QuotaState
+from saucenao.result import SauceNaoResult, enrich_result, extract_content_values, extract_title_values
+from saucenao.retry import RetryPolicy
+from saucenao.upload import MultipartUpload, UploadBuffer
 
 
 class SauceNaoDatabase(enum.Enum):
@@ -74,16 +79,12 @@ class SauceNao(object):
     SEARCH_POST_URL = 'http://saucenao.com/search.php'
 
     # all available account types, unregistered (always if no API key is passed), basic or premium
-    ACCOUNT_TYPE_UNREGISTERED = ""
-    ACCOUNT_TYPE_BASIC = "basic"
-    ACCOUNT_TYPE_PREMIUM = "premium"
+    ACCOUNT_TYPE_UNREGISTERED = quota.ACCOUNT_TYPE_UNREGISTERED
+    ACCOUNT_TYPE_BASIC = quota.ACCOUNT_TYPE_BASIC
+    ACCOUNT_TYPE_PREMIUM = quota.ACCOUNT_TYPE_PREMIUM
 
     # individual search usage limitations
-    LIMIT_30_SECONDS = {
-        ACCOUNT_TYPE_UNREGISTERED: 4,
-        ACCOUNT_TYPE_BASIC: 6,
-        ACCOUNT_TYPE_PREMIUM: 15,
-    }
+    LIMIT_30_SECONDS = quota.LIMIT_30_SECONDS
 
     # 0=html, 2=json but json is omitting important data but includes more data about authors
     # taken from the API documentation(requires login): https://saucenao.com/user.php?page=search-api
@@ -94,12 +95,19 @@ class SauceNao(object):
     CONTENT_AUTHOR_KEY = 'Creator'
     CONTENT_CHARACTERS_KEY = 'Characters'
 
+    # size of the chunks of streamed responses fed to the parser
+    STREAM_CHUNK_SIZE = 16 * 1024
+
     logger = None
 
     def __init__(self, directory='', databases=SauceNaoDatabase.All, minimum_similarity=65, combine_api_types=False,
                  api_key=None, is_premium=False, exclude_categories='', move_to_categories=False,
                  use_author_as_category=False, output_type=API_HTML_TYPE, start_file=None, log_level=logging.ERROR,
-                 title_minimum_similarity=90):
+                 title_minimum_similarity=90, session=None, adapter=None,
+                 pool_connections=http.DEFAULT_POOL_CONNECTIONS, pool_maxsize=http.DEFAULT_POOL_MAXSIZE,
+                 max_retries=http.DEFAULT_MAX_RETRIES, limiter=None, api_keys=None, retry_policy=None,
+                 preprocessor=None, cache=None, index=None, parser_engine=None, max_results=None,
+                 stream_responses=False, enrich_results=False):
         """Initializing function
 
         :type directory: str
@@ -115,11 +123,29 @@ class SauceNao(object):
         :type start_file: str
         :type log_level: int
         :type title_minimum_similarity: float
+        :type session: requests.Session
+        :type adapter: requests.adapters.HTTPAdapter
+        :type pool_connections: int
+        :type pool_maxsize: int
+        :type max_retries: int|urllib3.util.retry.Retry
+        :type limiter: RateLimiter
+        :type api_keys: Iterable[ApiKey|str]
+        :type retry_policy: RetryPolicy
+        :type preprocessor: ImagePreprocessor
+        :type cache: ResultCache
+        :type index: PerceptualIndex
+        :type parser_engine: str
+        :type max_results: int
+        :type stream_responses: bool
+        :type enrich_results: bool
         """
         self.directory = directory
         self.databases = databases
         self.minimum_similarity = minimum_similarity
-        self.combine_api_types = combine_api_types
+        self.max_results = max_results
+        # enriched results provide the fields of both API types with a single request and replace combined API types
+        self.enrich_results = enrich_results
+        self.combine_api_types = combine_api_types and not enrich_results
         self.api_key = api_key
         self.is_premium = is_premium
         self.exclude_categories = exclude_categories
@@ -128,21 +154,58 @@ class SauceNao(object):
         self.output_type = output_type
         self.start_file = start_file
         self.title_minimum_similarity = title_minimum_similarity
+        self.preprocessor = preprocessor
+        self.cache = cache
+        self.index = index
+        # engine parsing the HTML responses, the fastest available engine if none is passed
+        self.parser = get_parser(parser_engine)
+        # HTML responses are parsed while they arrive and not read any further once the results are complete
+        self.stream_responses = stream_responses
 
         if self.api_key:
             if self.is_premium:
-                account_type = self.ACCOUNT_TYPE_PREMIUM
+                self.account_type = self.ACCOUNT_TYPE_PREMIUM
             else:
-                account_type = self.ACCOUNT_TYPE_BASIC
-            self.search_limit_30s = self.LIMIT_30_SECONDS[account_type]
+                self.account_type = self.ACCOUNT_TYPE_BASIC
         else:
-            self.search_limit_30s = self.LIMIT_30_SECONDS[self.ACCOUNT_TYPE_UNREGISTERED]
+            self.account_type = self.ACCOUNT_TYPE_UNREGISTERED
+        self.search_limit_30s = self.LIMIT_30_SECONDS[self.account_type]
+
+        # every request to SauceNAO takes a token, so the limiter works with the unmodified account limit
+        if limiter is None:
+            limiter = TokenBucketLimiter(limit=self.LIMIT_30_SECONDS[self.account_type], period=30)
+        self.limiter = limiter
+
+        # with multiple API keys every key is limited by its own limiter and the limits add up
+        self.key_pool = None
+        if api_keys:
+            self.key_pool = ApiKeyPool(api_keys)
+            self.search_limit_30s = self.key_pool.limit_30s
 
         if self.combine_api_types:
             # if we combine the API types we require twice as many API requests, so half the limit per 30 seconds
             self.search_limit_30s /= 2
 
-        self.previous_status_code = None
+        # searches which should be repeated are either retried with a blocking backoff
+        # or raise a RetryLaterException, so the caller can schedule the retry itself
+        self.retry_policy = retry_policy or RetryPolicy()
+
+        # quota reported by the JSON API, API keys of the pool track their own quota
+        self.quota = QuotaState()
+        self.defer_retries = False
+
+        # all requests of this instance share one pooled keep-alive transport,
+        # only sessions created by us are closed again on close()
+        self._owns_session = session is None
+        if session is None:
+            session = http.create_session(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                          max_retries=max_retries, adapter=adapter)
+        elif adapter is not None:
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+        # the requests of combined API types are sent concurrently, threads are only started on demand
+        self.request_executor = ThreadPoolExecutor(max_workers=max(2, pool_maxsize))
 
         logging.basicConfig(level=log_level)
         self.logger = logging.getLogger("saucenao_logger")
@@ -150,46 +213,217 @@ class SauceNao(object):
         if SauceNaoDatabase.is_uncompleted(self.databases):
             self.logger.warning("Database #{db} is uncompleted and should not be used.".format(db=self.databases))
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Close the request threads and the pooled connections of the session if it was created by this instance
+
+        :return:
+        """
+        if self._owns_session:
+            self.session.close()
+        self.request_executor.shutdown(wait=False)
+
     def check_file(self, file_name: str) -> list:
         """Check the given file for results on SauceNAO
 
         :type file_name: str
         :return:
         """
+        return self._check_file(file_name)[0]
+
+    def check_file_object(self, file_content: BinaryIO) -> list:
+        """Check the passed file content for results on SauceNAO
+
+        :type file_content: BinaryIO
+        :return:
+        """
+        return self._check_upload(file_content)[0]
+
+    def _check_file(self, file_name: str, with_digest: bool = False) -> tuple:
+        """Check the given file for results on SauceNAO
+
+        :type file_name: str
+        :type with_digest: bool
+        :return: the filtered results and the SHA-256 hex digest of the file if requested
+        """
         self.logger.info("checking file: {0:s}".format(file_name))
         file_path = os.path.join(self.directory, file_name)
         with open(file_path, 'rb') as file_object:
-            return self.check_file_object(file_object)
+            return self._check_upload(file_object, with_digest)
 
-    def check_file_object(self, file_content: BinaryIO) -> list:
+    def _check_upload(self, file_content: BinaryIO, with_digest: bool = False) -> tuple:
         """Check the passed file content for results on SauceNAO
 
-        :type file_content: bytes
-        :return:
+        :type file_content: BinaryIO
+        :type with_digest: bool
+        :return: the filtered results and the SHA-256 hex digest of the content if requested
         """
-        if self.combine_api_types:
-            result = self.__check_image(file_content, self.API_HTML_TYPE)
-            sorted_results = self.parse_results_json(result)
+        # all requests and retries stream the payload from the same buffer
+        with UploadBuffer(file_content) as upload_buffer:
+            # the payload is already in memory, so the content doesn't have to get read again for the digest
+            digest = upload_buffer.digest if with_digest else None
+            return self.__check_upload_buffer(upload_buffer), digest
 
-            file_content.seek(0)
-            additional_result = self.__check_image(file_content, self.API_JSON_TYPE)
-            additional_sorted_results = self.parse_results_json(additional_result)
-            sorted_results = self.__merge_results(sorted_results, additional_sorted_results)
-        else:
-            result = self.__check_image(file_content, self.output_type)
-            sorted_results = self.parse_results_json(result)
+    def __check_upload_buffer(self, upload_buffer: UploadBuffer) -> list:
+        """Check the buffered payload for results on SauceNAO
+
+        :type upload_buffer: UploadBuffer
+        :return:
+        """
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.get_key(upload_buffer.digest, self.databases, self.__result_type)
+            sorted_results = self.cache.get(cache_key)
+            if sorted_results is not None:
+                self.logger.debug("using cached results of {0:s}".format(upload_buffer.digest))
+                return self.__filter_results(self.__from_dicts(sorted_results))
+
+        perceptual_hash = None
+        if self.index:
+            perceptual_hash = self.__get_perceptual_hash(upload_buffer)
+            if perceptual_hash is not None:
+                sorted_results = self.index.search(perceptual_hash, self.__search_options)
+                if sorted_results is not None:
+                    self.logger.debug("using results of an indexed similar image")
+                    return self.__filter_results(self.__from_dicts(sorted_results))
+
+        sorted_results = self.__search_preprocessed(upload_buffer)
+
+        if self.cache:
+            self.cache.set(cache_key, [res.to_dict() for res in sorted_results])
+
+        if self.__filter_while_parsing:
+            # the parsers already skipped all results which would get filtered
+            return sorted_results
 
         filtered_results = self.__filter_results(sorted_results)
+        # only identified images are indexed, similar images of unidentified images have to be searched again
+        if perceptual_hash is not None and filtered_results:
+            self.index.add(perceptual_hash, self.__search_options, [res.to_dict() for res in filtered_results])
         return filtered_results
 
-    def __get_http_data(self, file_object: BinaryIO, output_type: int):
-        """Prepare the http relevant data(files, headers, params) for the given file path and output type
+    @staticmethod
+    def __from_dicts(results: list) -> list:
+        """Convert the stored results in the format of the JSON API response to result objects
+
+        :type results: list
+        :return:
+        """
+        return [SauceNaoResult.from_dict(res) for res in results]
+
+    @property
+    def __filter_while_parsing(self) -> bool:
+        """Property if the results can be filtered while parsing them,
+        the cache and the perceptual index store all results to serve any minimum similarity
+
+        :return:
+        """
+        return not self.cache and not self.index
+
+    @property
+    def __result_selection(self) -> tuple:
+        """Property for the minimum similarity and the limit of the results passed to the parsers
+
+        :return:
+        """
+        if self.__filter_while_parsing:
+            return float(self.minimum_similarity), self.max_results
+        return None, None
+
+    @property
+    def __result_type(self):
+        """Property for the type of the returned results, which is part of the cache key
+
+        :return: int|str
+        """
+        if self.enrich_results:
+            return 'enriched'
+        if self.combine_api_types:
+            return 'combined'
+        return self.output_type
+
+    @property
+    def __search_options(self) -> str:
+        """Property for the search options the results of the perceptual index depend on
+
+        :return:
+        """
+        return '{0}:{1}'.format(getattr(self.databases, 'value', self.databases), self.__result_type)
+
+    def __get_perceptual_hash(self, upload_buffer: UploadBuffer):
+        """Return the perceptual hash of the uploaded image or None if it's no image
+
+        :type upload_buffer: UploadBuffer
+        :return: int|None
+        """
+        try:
+            return dhash(upload_buffer.open())
+        except (IOError, SyntaxError, ValueError):
+            self.logger.info("unable to calculate the perceptual hash of {0:s}".format(upload_buffer.digest))
+            return None
+
+    def __search_preprocessed(self, upload_buffer: UploadBuffer) -> list:
+        """Search the thumbnail of the preprocessor if configured or else the uploaded buffer on SauceNAO
 
-        :param file_object:
+        :type upload_buffer: UploadBuffer
+        :return:
+        """
+        if self.preprocessor:
+            thumbnail = self.preprocessor.process(upload_buffer)
+            if thumbnail is not None:
+                self.logger.debug("uploading thumbnail ({0:d} of {1:d} bytes)".format(len(thumbnail),
+                                                                                      len(upload_buffer)))
+                with UploadBuffer(io.BytesIO(thumbnail)) as thumbnail_buffer:
+                    return self.__search(thumbnail_buffer)
+
+        return self.__search(upload_buffer)
+
+    def __search(self, upload_buffer: UploadBuffer) -> list:
+        """Search the uploaded buffer on SauceNAO and return the results sorted by similarity
+
+        :type upload_buffer: UploadBuffer
+        :return:
+        """
+        if self.combine_api_types:
+            # send the HTML and JSON request at the same time, both searches are taken from the limiter at once
+            # so the second request doesn't wait for the limiter after the first one went out
+            pooled_key = self.__acquire(searches=2)
+            html_request = self.request_executor.submit(self.__check_image, upload_buffer, self.API_HTML_TYPE,
+                                                        0, True, pooled_key)
+            json_request = self.request_executor.submit(self.__check_image, upload_buffer, self.API_JSON_TYPE,
+                                                        0, True, pooled_key)
+            # the buffer may only be released after both requests finished
+            wait((html_request, json_request))
+
+            minimum_similarity, limit = self.__result_selection
+            sorted_results = self.parse_results(html_request.result(), minimum_similarity, limit)
+            additional_sorted_results = self.parse_results(json_request.result(), minimum_similarity, limit)
+            return self.__merge_results(sorted_results, additional_sorted_results)
+
+        if self.enrich_results:
+            # the JSON response contains the most fields, the title and content of the HTML response get derived
+            response = self.__check_image(upload_buffer, self.API_JSON_TYPE)
+            response = {'header': response.get('header', {}),
+                        'results': [enrich_result(res) for res in response.get('results', [])]}
+            return self.parse_results(response, *self.__result_selection)
+
+        result = self.__check_image(upload_buffer, self.output_type)
+        return self.parse_results(result, *self.__result_selection)
+
+    def __get_http_data(self, upload_buffer: UploadBuffer, output_type: int, api_key: str = None):
+        """Prepare the http relevant data(body, headers, params) for the given upload buffer and output type
+
+        :param upload_buffer:
         :param output_type:
+        :param api_key:
         :return:
         """
-        files = {'file': file_object.read()}
+        body = MultipartUpload(upload_buffer)
 
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
@@ -198,11 +432,11 @@ class SauceNao(object):
             'Accept-Language': 'en-DE,en-US;q=0.9,en;q=0.8',
             'Accept-Encoding': 'gzip, deflate, br',
             'DNT': '1',
-            'Connection': 'keep-alive'
+            'Connection': 'keep-alive',
+            'Content-Type': body.content_type,
         }
 
         params = {
-            'file': file_object,
             # parameters taken from form on main page: https://saucenao.com/
             'url': None,
             'frame': 1,
@@ -212,109 +446,189 @@ class SauceNao(object):
             'db': self.databases,
         }
 
-        if self.api_key:
-            params['api_key'] = self.api_key
+        if api_key:
+            params['api_key'] = api_key
+
+        return body, params, headers
+
+    def __acquire(self, searches: int = 1):
+        """Take the searches from the API key pool or the rate limiter and block until they are allowed
+
+        :type searches: int
+        :return: the selected key of the API key pool if configured
+        """
+        if self.key_pool:
+            return self.key_pool.acquire(searches)
 
-        return files, params, headers
+        waited = self.limiter.acquire(searches)
+        if waited:
+            self.logger.debug("waited '{:.2f}' seconds for the rate limiter".format(waited))
+        return None
 
-    def __check_image(self, file_object: BinaryIO, output_type: int) -> str:
-        """Check the possible sources for the given file object
+    def __check_image(self, upload_buffer: UploadBuffer, output_type: int, attempt: int = 0, acquired: bool = False,
+                      pooled_key: ApiKey = None) -> dict:
+        """Check the possible sources for the given upload buffer
 
         :type output_type: int
-        :type file_object: typing.BinaryIO
+        :type upload_buffer: UploadBuffer
+        :type attempt: int
+        :type acquired: bool
+        :type pooled_key: ApiKey
         :return:
         """
-        files, params, headers = self.__get_http_data(file_object=file_object, output_type=output_type)
-        link = requests.post(url=self.SEARCH_POST_URL, files=files, params=params, headers=headers)
+        if not acquired:
+            pooled_key = self.__acquire()
+        api_key = pooled_key.key if pooled_key else self.api_key
+
+        body, params, headers = self.__get_http_data(upload_buffer=upload_buffer, output_type=output_type,
+                                                     api_key=api_key)
+        link = self.session.post(url=self.SEARCH_POST_URL, data=body, params=params, headers=headers,
+                                 stream=self.stream_responses)
+
+        try:
+            code, msg = http.verify_status_code(link)
+            if code == http.STATUS_CODE_OK:
+                return self.__read_response(link, output_type, pooled_key)
+        except DailyLimitReachedException as e:
+            if not pooled_key:
+                raise
+            # retire only the exhausted key and continue with the remaining keys of the pool
+            self.logger.warning("{0:s}, retiring API key {1!r}".format(str(e), pooled_key))
+            self.key_pool.retire(pooled_key)
+            code = None
+        finally:
+            # streamed responses only return their connection to the pool once they're closed,
+            # which has to happen before waiting for the retries
+            link.close()
+
+        if code is None:
+            return self.__check_image(upload_buffer, output_type, attempt)
+        elif code == http.STATUS_CODE_SKIP:
+            self.logger.error(msg)
+            return {'header': {}, 'results': []}
 
-        code, msg = http.verify_status_code(link)
+        if self.defer_retries:
+            raise RetryLaterException(msg)
 
-        if code == http.STATUS_CODE_SKIP:
-            self.logger.error(msg)
-            return json.dumps({'results': []})
-        elif code == http.STATUS_CODE_REPEAT:
-            if not self.previous_status_code:
-                self.previous_status_code = code
-                self.logger.info(
-                    "Received an unexpected status code (message: {msg}), repeating after 10 seconds...".format(msg=msg)
-                )
-                time.sleep(10)
-                return self.__check_image(file_object, output_type)
-            else:
-                raise UnknownStatusCodeException(msg)
-        else:
-            self.previous_status_code = None
+        attempt += 1
+        if not self.retry_policy.can_retry(attempt):
+            raise UnknownStatusCodeException(msg)
 
+        delay = self.retry_policy.get_delay(attempt)
+        self.logger.info(
+            "Received an unexpected status code (message: {msg}), repeating after {delay:.2f} seconds...".format(
+                msg=msg, delay=delay)
+        )
+        time.sleep(delay)
+        return self.__check_image(upload_buffer, output_type, attempt)
+
+    def __read_response(self, link, output_type: int, pooled_key: ApiKey = None) -> dict:
+        """Read the results of the successful search from the response
+
+        :type link: requests.Response
+        :type output_type: int
+        :type pooled_key: ApiKey
+        :return:
+        """
         if output_type == self.API_HTML_TYPE:
-            return self.parse_results_html_to_json(link.text)
+            if self.stream_responses:
+                return self.parser.parse_stream(link.iter_content(chunk_size=self.STREAM_CHUNK_SIZE),
+                                                http.get_response_encoding(link), *self.__result_selection)
+            return self.parser.parse(http.get_response_text(link), *self.__result_selection)
+
+        # JSON is always UTF-8, decoding the bytes directly skips building the text of the response
+        response = codec.loads(link.content)
+        self.__update_quota(response.get('header', {}), pooled_key)
+        return response
+
+    def __update_quota(self, header: dict, pooled_key: ApiKey = None):
+        """Update the quota of the used API key with the response header
+        and pace the following searches with the reported limits instead of the account type limits
+
+        :type header: dict
+        :type pooled_key: ApiKey
+        :return:
+        """
+        quota = pooled_key.quota if pooled_key else self.quota
+        if not quota.update(header):
+            return
+
+        limiter = pooled_key.limiter if pooled_key else self.limiter
+        limiter.update(limit=quota.short_limit, available=quota.short_remaining)
+        self.logger.debug("quota: {0!r}".format(quota))
+
+        if pooled_key:
+            self.search_limit_30s = self.key_pool.limit_30s
+        elif quota.short_limit:
+            self.search_limit_30s = quota.short_limit
+        if self.combine_api_types:
+            self.search_limit_30s /= 2
 
-        return link.text
+        if quota.long_remaining is not None and quota.long_remaining <= 0:
+            if pooled_key:
+                self.logger.warning("daily limit reported, retiring API key {0!r}".format(pooled_key))
+                self.key_pool.retire(pooled_key)
+            else:
+                self.logger.warning("daily search limit reported, the following searches will fail")
 
     @staticmethod
     def parse_results_html_to_json(html: str) -> str:
-        """Parse the results and sort them descending by similarity
+        """Parse the results into the format of the JSON API response,
+        only kept for backwards compatibility, use parse_results_html to avoid the serialization
 
         :type html: str
         :return:
         """
-        soup = Soup(html, 'html.parser')
-        # basic format of json API response
-        results = {'header': {}, 'results': []}
+        # the output doesn't depend on the installed codecs
+        return json.dumps(SauceNao.parse_results_html(html))
 
-        for res in soup.find_all('td', attrs={"class": "resulttablecontent"}):  # type: element.Tag
-            # optional field in SauceNao
-            title_tag = res.find_next('div', attrs={"class": "resulttitle"})
-            if title_tag:
-                title = title_tag.text
-            else:
-                title = ''
-
-            # mandatory field in SauceNao
-            similarity = res.find_next('div', attrs={"class": "resultsimilarityinfo"}).text.replace('%', '')
-            alternate_links = [a_tag['href'] for a_tag in
-                               res.find_next('div', attrs={"class": "resultmiscinfo"}).find_all('a', href=True)]
-            content_column = []
-            content_column_tags = res.find_all('div', attrs={"class": "resultcontentcolumn"})
-            for content_column_tag in content_column_tags:
-                for br in content_column_tag.find_all('br'):
-                    br.replace_with('\n')
-                content_column.append(content_column_tag.text)
-
-            result = {
-                'header': {
-                    'similarity': similarity
-                },
-                'data': {
-                    'title': title,
-                    'content': content_column,
-                    'ext_urls': alternate_links
-                }
-            }
-            results['results'].append(result)
-
-        return json.dumps(results)
+    @staticmethod
+    def parse_results_html(html: str, engine: str = None) -> dict:
+        """Parse the results into the structure of the decoded JSON API response
+
+        :type html: str
+        :type engine: str
+        :return:
+        """
+        return get_parser(engine).parse(html)
 
     @staticmethod
     def parse_results_json(text: str) -> list:
-        """Parse the results and sort them descending by similarity
+        """Parse the results and sort them descending by similarity,
+        only kept for backwards compatibility, use parse_results with the decoded response
 
         :type text: str
         :return:
         """
-        result = json.loads(text)
-        results = [res for res in result['results']]
-        return sorted(results, key=lambda k: float(k['header']['similarity']), reverse=True)
+        return SauceNao.parse_results(codec.loads(text))
+
+    @staticmethod
+    def parse_results(response: dict, minimum_similarity: float = None, limit: int = None) -> list:
+        """Sort the results of the decoded response descending by similarity,
+        optionally only the results with at least the minimum similarity and limited to the most similar results
+
+        :type response: dict
+        :type minimum_similarity: float
+        :type limit: int
+        :return:
+        """
+        similarities = [float(res['header']['similarity']) for res in response['results']]
+        selected = select_results(similarities, minimum_similarity, limit)
+        return [SauceNaoResult.from_dict(response['results'][index], similarity=similarities[index])
+                for index in sorted(selected, key=lambda index: similarities[index], reverse=True)]
 
     def __filter_results(self, sorted_results) -> list:
         """Return results with a similarity bigger or the same as the defined similarity from the arguments
-        (default 65%)
+        (default 65%), limited to the maximum amount of results if defined
 
-        :type sorted_results: list|tuple|Generator
+        :type sorted_results: list|tuple|Generator[SauceNaoResult]
         :return:
         """
         filtered_results = []
         for res in sorted_results:
-            if float(res['header']['similarity']) >= float(self.minimum_similarity):
+            if self.max_results is not None and len(filtered_results) >= self.max_results:
+                break
+            if res.similarity >= float(self.minimum_similarity):
                 filtered_results.append(res)
             else:
                 # we can break here since the results are sorted by similarity anyways
@@ -330,12 +644,7 @@ class SauceNao(object):
         :type key: str
         :return:
         """
-        for result in results:
-            if 'content' in list(result['data'].keys()):
-                for content in result['data']['content']:
-                    if re.search(r'{0:s}: .*'.format(key), content):
-                        return ''.join(re.split(r'{0:s}: '.format(key), content)[1:]).rstrip("\n").split('\n')
-        return ''
+        return extract_content_values([results], key)[0]
 
     @staticmethod
     def get_title_value(results: Iterable, key: str):
@@ -346,12 +655,27 @@ class SauceNao(object):
         :type key: str
         :return:
         """
-        for result in results:
-            if 'title' in list(result['data'].keys()):
-                if re.match('{0:s}: .*'.format(key), result['data']['title']):
-                    return ''.join(re.split(r'{0:s}: '.format(key), result['data']['title'])[1:]).rstrip("\n") \
-                        .split('\n')
-        return ''
+        return extract_title_values([results], key)[0]
+
+    @staticmethod
+    def get_content_values(result_sets: Iterable[Iterable], key: str) -> list:
+        """Batch form of get_content_value returning the value for every set of results of a run
+
+        :type result_sets: Iterable[Iterable]
+        :type key: str
+        :return:
+        """
+        return extract_content_values(result_sets, key)
+
+    @staticmethod
+    def get_title_values(result_sets: Iterable[Iterable], key: str) -> list:
+        """Batch form of get_title_value returning the value for every set of results of a run
+
+        :type result_sets: Iterable[Iterable]
+        :type key: str
+        :return:
+        """
+        return extract_title_values(result_sets, key)
 
     @staticmethod
     def merge_dicts(x: dict, y: dict) -> dict:
@@ -378,7 +702,7 @@ class SauceNao(object):
             length = len(additional_result)
 
         for i in range(length):
-            for key in list(result[i].keys()):
-                result[i][key] = self.merge_dicts(result[i][key], additional_result[i][key])
+            result[i] = SauceNaoResult.from_dict({key: self.merge_dicts(result[i][key], additional_result[i][key])
+                                                  for key in list(result[i].keys())})
 
         return result
@@ -0,0 +1,163 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import hashlib
+import io
+import mmap
+import os
+from typing import BinaryIO
+from uuid import uuid4
+
+
+class UploadBuffer(object):
+    """
+    read-only view of the upload payload without copying it, real files get memory mapped,
+    in-memory streams expose their buffer and only other streams are read once
+    """
+
+    def __init__(self, file_object: BinaryIO):
+        """Initializing function
+
+        :type file_object: BinaryIO
+        """
+        self._mmap = None
+        self._buffer = None
+        self._digest = None
+        self.view = None
+
+        position = file_object.tell()
+        try:
+            file_number = file_object.fileno()
+            if os.fstat(file_number).st_size > position:
+                self._mmap = mmap.mmap(file_number, 0, access=mmap.ACCESS_READ)
+                self._buffer = memoryview(self._mmap)
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            pass
+
+        if self._buffer is None:
+            if isinstance(file_object, io.BytesIO):
+                self._buffer = file_object.getbuffer()
+            else:
+                self._buffer = memoryview(file_object.read())
+                position = 0
+
+        self.view = self._buffer[position:]
+
+    def __len__(self):
+        return len(self.view)
+
+    @property
+    def digest(self) -> str:
+        """Property for the SHA-256 hex digest of the payload, calculated only once
+
+        :return:
+        """
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.view).hexdigest()
+        return self._digest
+
+    def open(self) -> io.BufferedReader:
+        """Return a seekable file object reading from the view without copying the payload
+
+        :return:
+        """
+        return io.BufferedReader(_ViewReader(self.view))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Release the views of the buffer and unmap the file
+
+        :return:
+        """
+        self.view.release()
+        self._buffer.release()
+        if self._mmap is not None:
+            self._mmap.close()
+
+
+class _ViewReader(io.RawIOBase):
+    """
+    raw stream reading from a memoryview
+    """
+
+    def __init__(self, view: memoryview):
+        super().__init__()
+        self._view = view
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._position = max(0, offset)
+        return self._position
+
+    def readinto(self, buffer):
+        chunk = self._view[self._position:self._position + len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+
+class MultipartUpload(object):
+    """
+    multipart/form-data body streamed in chunks from an upload buffer,
+    the payload itself is never copied into the body
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, upload_buffer: UploadBuffer, field_name: str = 'file', file_name: str = 'file'):
+        """Initializing function
+
+        :type upload_buffer: UploadBuffer
+        :type field_name: str
+        :type file_name: str
+        """
+        self.boundary = uuid4().hex
+        self.content_type = 'multipart/form-data; boundary={0:s}'.format(self.boundary)
+
+        preamble = ('--{0:s}\r\nContent-Disposition: form-data; name="{1:s}"; filename="{2:s}"\r\n'
+                    'Content-Type: application/octet-stream\r\n\r\n').format(self.boundary, field_name, file_name)
+        epilogue = '\r\n--{0:s}--\r\n'.format(self.boundary)
+
+        self._parts = [memoryview(preamble.encode('utf-8')), upload_buffer.view, memoryview(epilogue.encode('utf-8'))]
+        self._length = sum(len(part) for part in self._parts)
+        self._part = 0
+        self._offset = 0
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size: int = -1):
+        """Return the next chunk of the body, chunks of the payload are views and not copies
+
+        :type size: int
+        :return:
+        """
+        if size is None or size < 0:
+            size = self.CHUNK_SIZE
+
+        while self._part < len(self._parts):
+            part = self._parts[self._part]
+            if self._offset < len(part):
+                chunk = part[self._offset:self._offset + size]
+                self._offset += len(chunk)
+                return chunk
+            self._part += 1
+            self._offset = 0
+        return b''
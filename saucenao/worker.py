@@ -1,7 +1,9 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
+import io
+import os
 import time
-from typing import BinaryIO, Union, Iterable
+from typing import BinaryIO, Union, Iterable, Sequence
 
 try:
     from titlesearch import get_similar_titles
@@ -9,6 +11,11 @@ except ImportError:
     get_similar_titles = None
 
 from saucenao import SauceNao, FileHandler
+from saucenao.exceptions import RetryLaterException, UnknownStatusCodeException
+from saucenao.files.manifest import ScanManifest
+from saucenao.journal import ProgressJournal
+from saucenao.phash import cluster_by_hash, dhash
+from saucenao.retry import RetryScheduler
 
 
 class Worker(SauceNao):
@@ -16,46 +23,199 @@ class Worker(SauceNao):
     Worker class for checking a list of files
     """
 
-    def __init__(self, files: Iterable[Union[BinaryIO, str]], *args, **kwargs):
+    def __init__(self, files: Iterable[Union[BinaryIO, str]], *args, cluster_threshold: int = None,
+                 manifest: ScanManifest = None, journal: ProgressJournal = None, **kwargs):
         """
         initializing function
 
         :type files: Iterable
         :type args:
+        :type cluster_threshold: int
+        :type manifest: ScanManifest
+        :type journal: ProgressJournal
         :param kwargs:
         """
         super().__init__(*args, **kwargs)
         self.complete_file_list = files
+        self.cluster_threshold = cluster_threshold
+        # outcomes of the checked files are recorded, so FileHandler.get_files skips them in following runs
+        self.manifest = manifest
+        # completed files are journaled, so an interrupted run resumes where it stopped
+        self.journal = journal
+        # throttled files get deferred while the other files keep getting checked
+        self.defer_retries = True
 
     def run(self):
         """Check all files with SauceNao and execute the specified tasks
 
         :return:
         """
-        for file_name in self.files:
-            start_time = time.time()
+        scheduler = RetryScheduler(self.retry_policy)
 
-            if isinstance(file_name, BinaryIO):
-                filtered_results = self.check_file_object(file_name)
-            else:
-                filtered_results = self.check_file(file_name)
+        finished = False
+        try:
+            for file_name, duplicates in self.clusters:
+                for (deferred_file_name, deferred_duplicates, position), attempt in scheduler.pop_ready():
+                    yield from self.__check(deferred_file_name, deferred_duplicates, scheduler, attempt, position)
+
+                yield from self.__check(file_name, duplicates, scheduler)
+
+            while scheduler:
+                wait = scheduler.time_until_ready()
+                if wait > 0:
+                    self.logger.debug("sleeping '{:.2f}' seconds for deferred files".format(wait))
+                    time.sleep(wait)
 
-            if not filtered_results:
-                self.logger.info('No results found for image: {0:s}'.format(file_name))
-                continue
+                for (deferred_file_name, deferred_duplicates, position), attempt in scheduler.pop_ready():
+                    yield from self.__check(deferred_file_name, deferred_duplicates, scheduler, attempt, position)
+            finished = True
+        finally:
+            self._end_journal(finished)
 
-            if self.move_to_categories:
-                self.__move_to_categories(file_name=file_name, results=filtered_results)
+        if self.cache:
+            self.logger.info("result cache statistics: {0!r}".format(self.cache.stats))
+
+    def __check(self, file_name, duplicates: list, scheduler: RetryScheduler, attempt: int = 0,
+                position: int = None):
+        """Check the file and execute the specified tasks for it and its duplicates,
+        throttled files get deferred in the scheduler
+
+        :type file_name: str|BinaryIO
+        :type duplicates: list
+        :type scheduler: RetryScheduler
+        :type attempt: int
+        :type position: int
+        :return:
+        """
+        digest = None
+        try:
+            if isinstance(file_name, str):
+                filtered_results, digest = self._check_file(file_name, self.manifest is not None)
             else:
-                yield {
-                    'filename': file_name,
-                    'results': filtered_results
-                }
+                # repeated attempts of file objects have to start from the position of the first attempt again,
+                # streams positioned at an offset, f.e. members of archives, are uploaded from there
+                if attempt:
+                    file_name.seek(position)
+                else:
+                    position = file_name.tell()
+                filtered_results = self.check_file_object(file_name)
+        except RetryLaterException as e:
+            attempt += 1
+            if not self.retry_policy.can_retry(attempt):
+                self._record(file_name, ScanManifest.STATUS_FAILED)
+                raise UnknownStatusCodeException(str(e))
+
+            delay = scheduler.defer((file_name, duplicates, position), attempt)
+            self.logger.info("{0:s}, deferring {1} for {2:.2f} seconds".format(str(e), file_name, delay))
+            return
+        except Exception:
+            self._record(file_name, ScanManifest.STATUS_FAILED)
+            raise
 
-            duration = time.time() - start_time
-            if duration < (30 / self.search_limit_30s):
-                self.logger.debug("sleeping '{:.2f}' seconds".format((30 / self.search_limit_30s) - duration))
-                time.sleep((30 / self.search_limit_30s) - duration)
+        status = ScanManifest.STATUS_FOUND if filtered_results else ScanManifest.STATUS_NOT_FOUND
+        for checked_file_name in [file_name] + duplicates:
+            # recorded before the results get processed, which may move the file,
+            # the duplicates have a different content and get hashed by the manifest
+            self._record(checked_file_name, status, digest if checked_file_name is file_name else None)
+            result = self._process_results(file_name=checked_file_name, filtered_results=filtered_results)
+            self._journal_completed(checked_file_name)
+            if result:
+                yield result
+
+    def _record(self, file_name, status: str, content_hash: str = None):
+        """Record the outcome of the check of the file in the manifest if configured,
+        the digest of the uploaded content is passed so the file doesn't get hashed again
+
+        :type file_name: str|BinaryIO
+        :type status: str
+        :type content_hash: str
+        :return:
+        """
+        if self.manifest is not None and isinstance(file_name, str):
+            self.manifest.record(self.directory, file_name, status, content_hash)
+
+    def _journal_completed(self, file_name):
+        """Append the completed file to the progress journal if configured
+
+        :type file_name: str|BinaryIO
+        :return:
+        """
+        if self.journal is not None and isinstance(file_name, str):
+            self.journal.record(file_name)
+
+    def _end_journal(self, finished: bool):
+        """Sync the progress journal at the end of the run, it gets cleared if all files were checked,
+        so the next run starts from the beginning again
+
+        :type finished: bool
+        :return:
+        """
+        if self.journal is None:
+            return
+
+        if finished:
+            self.journal.reset()
+        else:
+            self.journal.sync()
+            self.logger.info("journaled {0:d} completed files, the next run resumes from there".format(
+                len(self.journal)))
+
+    @property
+    def clusters(self):
+        """Property for the files to check paired with their near-duplicates which share their results,
+        the perceptual hashes are only calculated if a cluster threshold is set
+
+        :return:
+        """
+        if self.cluster_threshold is None:
+            return ((file_name, []) for file_name in self.files)
+
+        clusters = cluster_by_hash(((file_name, self.__get_perceptual_hash(file_name)) for file_name in self.files),
+                                   threshold=self.cluster_threshold)
+        self.logger.info("checking {0:d} clusters of near-duplicates".format(len(clusters)))
+        return clusters
+
+    def __get_perceptual_hash(self, file_name):
+        """Return the perceptual hash of the file or None if it's no image
+
+        :type file_name: str|BinaryIO
+        :return: int|None
+        """
+        try:
+            if isinstance(file_name, str):
+                with open(os.path.join(self.directory, file_name), 'rb') as file_object:
+                    return dhash(file_object)
+
+            # streams positioned at an offset, f.e. members of archives, are hashed from there like they are uploaded
+            # and keep their position, Pillow would always start at the beginning of the stream
+            position = file_name.tell()
+            try:
+                return dhash(io.BytesIO(file_name.read()))
+            finally:
+                file_name.seek(position)
+        except (IOError, SyntaxError, ValueError):
+            self.logger.info("unable to calculate the perceptual hash of {0}".format(file_name))
+            return None
+
+    def _process_results(self, file_name, filtered_results: list):
+        """Execute the specified tasks for the checked file and return the results to yield if any
+
+        :type file_name: str|BinaryIO
+        :type filtered_results: list
+        :return: dict|None
+        """
+        if not filtered_results:
+            self.logger.info('No results found for image: {0}'.format(file_name))
+            return None
+
+        if self.move_to_categories:
+            self.__move_to_categories(file_name=file_name, results=filtered_results)
+            return None
+
+        return {
+            'filename': file_name,
+            'results': filtered_results
+        }
 
     @property
     def excludes(self):
@@ -74,14 +234,35 @@ class Worker(SauceNao):
 
         :return:
         """
+        files = self.complete_file_list
         if self.start_file:
-            # change files from generator to list
-            files = list(self.complete_file_list)
-            try:
-                return files[files.index(self.start_file):]
-            except ValueError:
-                return self.complete_file_list
-        return self.complete_file_list
+            files = self.__skip_to_start_file(files)
+        if self.journal is not None:
+            files = self.journal.filter(files)
+        return files
+
+    def __skip_to_start_file(self, files: Iterable):
+        """Skip the files before the start file while streaming the files
+
+        :type files: Iterable
+        :return:
+        """
+        found = False
+        for file_name in files:
+            if not found:
+                if file_name != self.start_file:
+                    continue
+                found = True
+            yield file_name
+
+        if found:
+            return
+
+        if isinstance(self.complete_file_list, Sequence):
+            self.logger.warning("start file {0!r} not found, checking all files".format(self.start_file))
+            yield from self.complete_file_list
+        else:
+            self.logger.warning("start file {0!r} not found, no files were checked".format(self.start_file))
 
     def __get_category(self, results: Union[Iterable]):
         """retrieve the category of the checked image based which can be either
@@ -31,9 +31,20 @@ setup(name=about['__title__'],
           'titlesearch': [
               'titlesearch>=0.0.1'
           ],
+          'preprocess': [
+              'Pillow>=5.0.0'
+          ],
+          'lxml': [
+              'lxml>=4.0.0'
+          ],
+          'orjson': [
+              'orjson>=3.0.0'
+          ],
           'dev': [
               'python-dotenv>=0.7.1',
               'Pillow>=5.0.0',
+              'lxml>=4.0.0',
+              'orjson>=3.0.0',
               'requests_mock>=1.4.0',
               'nose-exclude>=0.5.0',
               'coveralls>=1.10.0'
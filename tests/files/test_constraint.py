@@ -73,6 +73,44 @@ class TestConstraint(unittest.TestCase):
         self.assertEqual(Constraint.cmp_value_not_equals(2, 2), False)
         self.assertEqual(Constraint.cmp_value_not_equals(2, 1), True)
 
+    def test_value_in(self):
+        """Test compare functions cmp_value_in and cmp_value_not_in
+
+        :return:
+        """
+        self.assertEqual(Constraint.cmp_value_in('.jpg', ['.jpg', '.png']), True)
+        self.assertEqual(Constraint.cmp_value_in('.gif', ['.jpg', '.png']), False)
+        self.assertEqual(Constraint.cmp_value_not_in('.gif', ['.jpg', '.png']), True)
+
+    def test_value_matches(self):
+        """Test compare function cmp_value_matches
+
+        :return:
+        """
+        self.assertEqual(Constraint.cmp_value_matches('named_file.jpg', r'named'), True)
+        self.assertEqual(Constraint.cmp_value_matches('file_named.jpg', r'named'), False)
+
+    def test_compile(self):
+        """Test that the compiled predicates agree with the compare functions
+
+        :return:
+        """
+        constraint = Constraint(['.jpg', '.png'], cmp_func=Constraint.cmp_value_in)
+        predicate = constraint.compile()
+        for value in ('.jpg', '.png', '.gif', ''):
+            self.assertEqual(predicate(value), Constraint.cmp_value_in(value, constraint.value))
+            self.assertEqual(Constraint(constraint.value, Constraint.cmp_value_not_in).compile()(value),
+                             Constraint.cmp_value_not_in(value, constraint.value))
+
+        predicate = Constraint(r'named.*\.jpg', cmp_func=Constraint.cmp_value_matches).compile()
+        for value in ('named_file.jpg', 'named_file.png', 'file_named.jpg'):
+            self.assertEqual(predicate(value), Constraint.cmp_value_matches(value, r'named.*\.jpg'))
+
+        # unhashable values and custom compare functions keep working
+        self.assertTrue(Constraint([['a']], cmp_func=Constraint.cmp_value_in).compile()(['a']))
+        self.assertTrue(Constraint(2, cmp_func=Constraint.cmp_value_bigger).compile()(3))
+        self.assertFalse(Constraint(2, cmp_func=lambda x, y: x == y).compile()(3))
+
 
 if __name__ == '__main__':
     suite = unittest.TestLoader().loadTestsFromTestCase(TestConstraint)
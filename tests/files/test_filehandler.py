@@ -53,6 +53,27 @@ class TestFileHandler(unittest.TestCase):
         files = FileHandler.get_files(directory=self.dir, file_filter=file_filter)
         self.assertEqual(len(list(files)), 1)
 
+    def test_get_files_recursive(self):
+        """Test the recursive walk of the file handler returning the paths relative to the directory
+
+        :return:
+        """
+        os.makedirs(os.path.join(self.dir, 'sub', 'deep'))
+        open(os.path.join(self.dir, 'sub', 'deep', 'nested.jpg'), 'wb').close()
+
+        self.assertEqual(len(list(FileHandler.get_files(directory=self.dir))), 1)
+        files = list(FileHandler.get_files(directory=self.dir, recursive=True))
+        self.assertEqual(len(files), 2)
+        self.assertIn(os.path.join('sub', 'deep', 'nested.jpg'), files)
+
+        self.assertEqual(list(FileHandler.get_files(directory=self.dir, recursive=True, include=['*.jpg'])),
+                         [os.path.join('sub', 'deep', 'nested.jpg')])
+        self.assertEqual(len(list(FileHandler.get_files(directory=self.dir, recursive=True, max_depth=1))), 1)
+
+        # files of subdirectories get moved without their subdirectories
+        FileHandler.move_to_category(os.path.join('sub', 'deep', 'nested.jpg'), 'Example Category', self.dir)
+        self.assertTrue(os.path.isfile(os.path.join(self.dir, 'Example Category', 'nested.jpg')))
+
     def test_move_to_category(self):
         """Test moving the file to a category folder
 
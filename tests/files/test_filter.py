@@ -9,6 +9,7 @@ import unittest
 import uuid
 from stat import ST_MTIME, ST_ATIME
 from time import time, sleep
+from unittest import mock
 
 from saucenao.files.constraint import Constraint
 from saucenao.files.filter import Filter
@@ -165,6 +166,60 @@ class TestFilesFilter(unittest.TestCase):
         files = list(file_filter.apply(directory=self.dir, file_system_objects=['not-existent-file']))
         self.assertEqual(files, [])
 
+    def test_lazy_stat(self):
+        """Test that the FSOs only get stat'ed if a constraint requires it
+
+        :return:
+        """
+        expected_files = sorted(f for f in os.listdir(self.dir) if os.path.isfile(os.path.join(self.dir, f)))
+        with mock.patch('os.stat', side_effect=AssertionError('unexpected stat')):
+            self.assertEqual(sorted(Filter(assert_is_file=True).apply(self.dir)), expected_files)
+
+        # explicitly passed FSOs get stat'ed once for all checks
+        with mock.patch('os.stat', side_effect=os.stat) as stat:
+            file_filter = Filter(assert_is_file=True, size=Constraint(0, cmp_func=Constraint.cmp_value_bigger))
+            self.assertEqual(list(file_filter.apply(self.dir, ['big_file', 'named_file.jpg'])), ['big_file'])
+            self.assertEqual(stat.call_count, 2)
+
+    def test_compiled_plan(self):
+        """Test that the date strings get parsed once and the name checks run before the stat
+
+        :return:
+        """
+        date_string = datetime.datetime.fromtimestamp(self.time_modifying).strftime('%d.%m.%Y %H:%M:%S')
+        with mock.patch.object(Filter, '_get_timestamp_from_datestring',
+                               side_effect=Filter._get_timestamp_from_datestring) as get_timestamp:
+            file_filter = Filter(modified_date=Constraint(date_string, cmp_func=Constraint.cmp_value_bigger),
+                                 creation_date=Constraint('01.01.2000', cmp_func=Constraint.cmp_value_bigger))
+            self.assertEqual(len(list(file_filter.apply(self.dir))), 1)
+            self.assertEqual(get_timestamp.call_count, 2)
+
+        file_filter = Filter(assert_is_file=True, name=Constraint(r'named', cmp_func=Constraint.cmp_value_matches),
+                             file_type=Constraint(['.jpg'], cmp_func=Constraint.cmp_value_in),
+                             size=Constraint(0, cmp_func=Constraint.cmp_value_equals))
+        self.assertEqual(list(file_filter.apply(self.dir)), ['named_file.jpg'])
+        # passed FSOs not matching the name don't get stat'ed at all
+        with mock.patch('os.stat', side_effect=os.stat) as stat:
+            self.assertEqual(list(file_filter.apply(self.dir, ['big_file', 'named_file.jpg', 'named.png'])),
+                             ['named_file.jpg'])
+            self.assertEqual(stat.call_count, 1)
+
+    @unittest.skipUnless(hasattr(os, 'symlink'), 'symlinks are not supported')
+    def test_symlinks(self):
+        """Test that symlinks are followed and broken symlinks removed like non existent files
+
+        :return:
+        """
+        try:
+            os.symlink(os.path.join(self.dir, 'named_file.jpg'), os.path.join(self.dir, 'link.jpg'))
+            os.symlink(os.path.join(self.dir, 'not-existent-file'), os.path.join(self.dir, 'broken.jpg'))
+        except OSError:
+            self.skipTest('symlinks can not be created')
+
+        file_filter = Filter(file_type=Constraint(['.jpg'], cmp_func=lambda value, expected: value in expected))
+        self.assertEqual(sorted(file_filter.apply(self.dir)), ['link.jpg', 'named_file.jpg'])
+        self.assertEqual(list(file_filter.apply(self.dir, ['link.jpg', 'broken.jpg'])), ['link.jpg'])
+
     def test_empty_filter(self):
         """Test empty filter
 
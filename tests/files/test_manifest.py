@@ -0,0 +1,180 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import os
+import shutil
+import unittest
+import uuid
+from unittest import mock
+
+import requests_mock
+
+from saucenao import FileHandler, SauceNao, Worker
+from saucenao.aio import AsyncWorker
+from saucenao.exceptions import UnknownStatusCodeException
+from saucenao.files.manifest import ScanManifest
+from saucenao.limiter import TokenBucketLimiter
+from saucenao.retry import RetryPolicy
+
+
+class TestScanManifest(unittest.TestCase):
+    """
+    test cases for the incremental scan manifest
+    """
+
+    def setUp(self):
+        """Constructor for the unittest
+
+        :return:
+        """
+        self.dir = os.path.join(os.getcwd(), str(uuid.uuid4()))
+        os.mkdir(self.dir)
+        for i in range(5):
+            self.write_file('file_{0:d}.jpg'.format(i), 'content {0:d}'.format(i).encode())
+
+        self.manifest_path = os.path.join(self.dir, 'manifest.sqlite')
+        self.manifest = ScanManifest(self.manifest_path)
+
+    def tearDown(self):
+        """Destructor for the unittest
+
+        :return:
+        """
+        self.manifest.close()
+        shutil.rmtree(self.dir)
+
+    def write_file(self, file_name: str, content: bytes):
+        """Write the content into the file of the test directory
+
+        :type file_name: str
+        :type content: bytes
+        :return:
+        """
+        with open(os.path.join(self.dir, file_name), 'wb') as file_handler:
+            file_handler.write(content)
+
+    def get_files(self) -> list:
+        """Return the image files of the test directory which have to be checked according to the manifest
+
+        :return:
+        """
+        return sorted(FileHandler.get_files(self.dir, include=['*.jpg'], manifest=self.manifest))
+
+    def test_filter(self):
+        """Test that only new, modified and failed files get returned
+
+        :return:
+        """
+        self.assertEqual(len(self.get_files()), 5)
+
+        self.manifest.record(self.dir, 'file_0.jpg', ScanManifest.STATUS_FOUND)
+        self.manifest.record(self.dir, 'file_1.jpg', ScanManifest.STATUS_NOT_FOUND)
+        self.manifest.record(self.dir, 'file_2.jpg', ScanManifest.STATUS_FAILED)
+        self.assertEqual(self.get_files(), ['file_2.jpg', 'file_3.jpg', 'file_4.jpg'])
+        self.assertEqual(self.manifest.get_status(self.dir, 'file_2.jpg'), ScanManifest.STATUS_FAILED)
+
+        # modified content gets checked again
+        self.write_file('file_0.jpg', b'modified content')
+        self.assertIn('file_0.jpg', self.get_files())
+
+        # touched files with the same content are recognized by their hash without checking them again
+        stat = os.stat(os.path.join(self.dir, 'file_1.jpg'))
+        os.utime(os.path.join(self.dir, 'file_1.jpg'), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertNotIn('file_1.jpg', self.get_files())
+
+        # as are moved files
+        os.mkdir(os.path.join(self.dir, 'category'))
+        FileHandler.move_to_category('file_1.jpg', 'category', self.dir)
+        self.assertEqual(sorted(FileHandler.get_files(self.dir, recursive=True, include=['*.jpg'],
+                                                      manifest=self.manifest)),
+                         ['file_0.jpg', 'file_2.jpg', 'file_3.jpg', 'file_4.jpg'])
+
+        # the manifest persists between runs
+        self.manifest.close()
+        self.manifest = ScanManifest(self.manifest_path)
+        self.assertEqual(self.manifest.get_status(self.dir, os.path.join('category', 'file_1.jpg')),
+                         ScanManifest.STATUS_NOT_FOUND)
+
+    def test_batches(self):
+        """Test that the files are looked up in batches and unchanged files don't get hashed
+
+        :return:
+        """
+        for i in range(5):
+            self.manifest.record(self.dir, 'file_{0:d}.jpg'.format(i), ScanManifest.STATUS_FOUND)
+
+        with mock.patch.object(ScanManifest, 'BATCH_SIZE', 2), \
+                mock.patch.object(ScanManifest, 'get_hash', side_effect=AssertionError('unexpected hash')):
+            self.assertEqual(self.get_files(), [])
+
+    def test_worker(self):
+        """Test that the worker records the outcome of the checked files
+
+        :return:
+        """
+        adapter = requests_mock.Adapter()
+        adapter.register_uri('POST', SauceNao.SEARCH_POST_URL, [
+            {'text': json.dumps({'header': {}, 'results': [
+                {'header': {'similarity': '90.00'}, 'data': {'title': 'found'}}]})},
+            {'text': json.dumps({'header': {}, 'results': []})},
+            {'status_code': 500},
+        ])
+
+        worker = Worker(files=['file_0.jpg', 'file_1.jpg', 'file_2.jpg'], directory=self.dir, manifest=self.manifest,
+                        output_type=SauceNao.API_JSON_TYPE, adapter=adapter,
+                        limiter=TokenBucketLimiter(limit=10, period=1, burst=10),
+                        retry_policy=RetryPolicy(max_retries=0))
+        results = worker.run()
+        self.assertEqual(next(results)['filename'], 'file_0.jpg')
+        with self.assertRaises(UnknownStatusCodeException):
+            next(results)
+
+        self.assertEqual(self.manifest.get_status(self.dir, 'file_0.jpg'), ScanManifest.STATUS_FOUND)
+        self.assertEqual(self.manifest.get_status(self.dir, 'file_1.jpg'), ScanManifest.STATUS_NOT_FOUND)
+        self.assertEqual(self.manifest.get_status(self.dir, 'file_2.jpg'), ScanManifest.STATUS_FAILED)
+        self.assertEqual(self.get_files(), ['file_2.jpg', 'file_3.jpg', 'file_4.jpg'])
+
+    def test_worker_digest(self):
+        """Test that the workers record the digest of the uploaded content instead of hashing the files again
+
+        :return:
+        """
+        adapter = requests_mock.Adapter()
+        adapter.register_uri('POST', SauceNao.SEARCH_POST_URL, text=json.dumps({'header': {}, 'results': []}))
+
+        async def collect(results):
+            return [result async for result in results]
+
+        for worker_class in (Worker, AsyncWorker):
+            with self.subTest(worker=worker_class.__name__):
+                self.manifest.close()
+                os.remove(self.manifest_path)
+                self.manifest = ScanManifest(self.manifest_path)
+
+                worker = worker_class(files=['file_0.jpg', 'file_1.jpg'], directory=self.dir, manifest=self.manifest,
+                                      output_type=SauceNao.API_JSON_TYPE, adapter=adapter,
+                                      limiter=TokenBucketLimiter(limit=10, period=1, burst=10))
+                with mock.patch.object(ScanManifest, 'get_hash', side_effect=AssertionError('unexpected hash')):
+                    results = worker.run()
+                    if worker_class is AsyncWorker:
+                        loop = asyncio.new_event_loop()
+                        try:
+                            loop.run_until_complete(collect(results))
+                        finally:
+                            loop.close()
+                    else:
+                        list(results)
+                worker.close()
+
+                # touched files are only recognized if the recorded digest matches the content hash
+                for file_name in ('file_0.jpg', 'file_1.jpg'):
+                    stat = os.stat(os.path.join(self.dir, file_name))
+                    os.utime(os.path.join(self.dir, file_name),
+                             ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+                self.assertEqual(self.get_files(), ['file_2.jpg', 'file_3.jpg', 'file_4.jpg'])
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestScanManifest)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,166 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import threading
+import time
+import unittest
+import uuid
+from unittest import mock
+
+from saucenao.files.constraint import Constraint
+from saucenao.files.filter import Filter
+from saucenao.files.walker import DirectoryWalker
+
+
+class TestDirectoryWalker(unittest.TestCase):
+    """
+    test cases for the recursive walk of directory trees
+    """
+
+    TREE = (
+        'a.jpg',
+        'b.png',
+        os.path.join('sub', 'c.jpg'),
+        os.path.join('sub', 'd.txt'),
+        os.path.join('sub', 'deep', 'e.jpg'),
+        os.path.join('raw', 'f.jpg'),
+    )
+
+    def setUp(self):
+        """Constructor for the unittest
+
+        :return:
+        """
+        self.dir = os.path.join(os.getcwd(), str(uuid.uuid4()))
+        for path in self.TREE:
+            os.makedirs(os.path.join(self.dir, os.path.dirname(path)), exist_ok=True)
+            with open(os.path.join(self.dir, path), 'wb') as file_handler:
+                file_handler.write(b'\0' * len(path))
+
+    def tearDown(self):
+        """Destructor for the unittest
+
+        :return:
+        """
+        shutil.rmtree(self.dir)
+
+    def walk(self, **kwargs) -> list:
+        """Walk the test directory with the passed options
+
+        :return:
+        """
+        return sorted(DirectoryWalker(**kwargs).walk(self.dir))
+
+    def test_walk(self):
+        """Test the recursive walk with depth limits and globs
+
+        :return:
+        """
+        self.assertEqual(self.walk(), sorted(self.TREE))
+        self.assertEqual(self.walk(workers=1, queue_size=1), sorted(self.TREE))
+        self.assertEqual(self.walk(max_depth=0), ['a.jpg', 'b.png'])
+        self.assertEqual(self.walk(max_depth=1), sorted(path for path in self.TREE if 'deep' not in path))
+
+        self.assertEqual(self.walk(include=['*.jpg'], exclude=['raw']),
+                         ['a.jpg', os.path.join('sub', 'c.jpg'), os.path.join('sub', 'deep', 'e.jpg')])
+        self.assertEqual(self.walk(include=['sub*'], exclude=['*deep*', '*.txt']), [os.path.join('sub', 'c.jpg')])
+
+        self.assertRaises(FileNotFoundError, list, DirectoryWalker().walk(os.path.join(self.dir, 'missing')))
+
+    def test_filter(self):
+        """Test that the constraints of the filter get applied in every directory
+
+        :return:
+        """
+        file_filter = Filter(file_type=Constraint(['.jpg'], cmp_func=Constraint.cmp_value_in),
+                             size=Constraint(len('a.jpg'), cmp_func=Constraint.cmp_value_bigger))
+        self.assertEqual(self.walk(file_filter=file_filter),
+                         sorted(path for path in self.TREE if path.endswith('.jpg') and path != 'a.jpg'))
+
+        file_filter = Filter(assert_is_folder=True)
+        self.assertEqual(self.walk(file_filter=file_filter),
+                         ['raw', 'sub', os.path.join('sub', 'deep')])
+
+    @unittest.skipUnless(hasattr(os, 'symlink'), 'symlinks are not supported')
+    def test_symlink_loops(self):
+        """Test that symlinks to directories are followed once and loops don't get walked
+
+        :return:
+        """
+        try:
+            os.symlink(self.dir, os.path.join(self.dir, 'sub', 'deep', 'loop'))
+            os.symlink(os.path.join(self.dir, 'raw'), os.path.join(self.dir, 'link'))
+        except OSError:
+            self.skipTest('symlinks can not be created')
+
+        files = self.walk()
+        self.assertEqual(len(files), len(self.TREE))
+        self.assertEqual(len([path for path in files if path.endswith('f.jpg')]), 1)
+        self.assertEqual(self.walk(follow_symlinks=False), sorted(self.TREE))
+
+    def test_lazy_walk(self):
+        """Test that the files are returned while the walk continues and stopping early ends the walk
+
+        :return:
+        """
+        for i in range(50):
+            os.makedirs(os.path.join(self.dir, 'many', str(i)))
+            open(os.path.join(self.dir, 'many', str(i), 'file.jpg'), 'wb').close()
+
+        walk = DirectoryWalker(workers=4, queue_size=2).walk(self.dir)
+        self.assertIsNotNone(next(walk))
+        walk.close()
+
+        # the scanning threads stop once the consumer stopped
+        for thread in threading.enumerate():
+            if thread is not threading.current_thread() and thread.name.startswith(DirectoryWalker.THREAD_NAME_PREFIX):
+                thread.join(timeout=5)
+                self.assertFalse(thread.is_alive())
+
+    def test_lazy_scan(self):
+        """Test that the files of a directory are passed to the consumer while the directory is still being read
+
+        :return:
+        """
+        os.makedirs(os.path.join(self.dir, 'many'))
+        for i in range(100):
+            open(os.path.join(self.dir, 'many', '{0:d}.jpg'.format(i)), 'wb').close()
+
+        read_entries = []
+        scandir = os.scandir
+
+        class CountingScandir:
+            """
+            directory iterator counting the read entries
+            """
+
+            def __init__(self, path):
+                self.entries = scandir(path)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, exc_type, exc_val, exc_tb):
+                self.entries.close()
+
+            def __iter__(self):
+                return self
+
+            def __next__(self):
+                entry = next(self.entries)
+                read_entries.append(entry.name)
+                return entry
+
+        with mock.patch('saucenao.files.walker.os.scandir', CountingScandir):
+            walk = DirectoryWalker(workers=1, queue_size=1).walk(os.path.join(self.dir, 'many'))
+            self.assertIsNotNone(next(walk))
+            # the scanning thread waits for the consumer instead of reading the whole directory first
+            time.sleep(0.2)
+            self.assertLess(len(read_entries), 10)
+            self.assertEqual(len(list(walk)), 99)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestDirectoryWalker)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,220 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import asyncio
+import io
+import json
+import os
+import shutil
+import threading
+import time
+import unittest
+from uuid import uuid4
+
+import requests_mock
+from PIL import Image
+
+from saucenao import AsyncSauceNao, AsyncWorker, SauceNao
+from saucenao.exceptions import UnknownStatusCodeException
+from saucenao.files.manifest import ScanManifest
+from saucenao.journal import ProgressJournal
+from saucenao.limiter import TokenBucketLimiter
+from saucenao.retry import RetryPolicy
+
+
+class TestAsyncSauceNao(unittest.TestCase):
+    SAUCENAO_MIN_WIDTH = 3
+    SAUCENAO_MIN_HEIGHT = 3
+
+    def setUp(self):
+        """Constructor for unittest classes
+
+        :return:
+        """
+        directory = str(uuid4())
+        os.mkdir(directory)
+        self.directory = os.path.abspath(directory)
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        """Destructor for unittest classes
+
+        :return:
+        """
+        self.loop.close()
+        shutil.rmtree(self.directory)
+
+    def generate_small_jpg(self):
+        """Generate a rather small jpg file to upload faster(631 bytes)
+
+        :return:
+        """
+        file_name = str(uuid4()) + ".jpg"
+        im = Image.new("RGB", (self.SAUCENAO_MIN_WIDTH, self.SAUCENAO_MIN_HEIGHT))
+        im.save(os.path.join(self.directory, file_name), "JPEG")
+        return file_name
+
+    @staticmethod
+    def mock_response(mock):
+        """Register a JSON API response with a single result
+
+        :return:
+        """
+        mock.post(SauceNao.SEARCH_POST_URL, text=json.dumps({'header': {}, 'results': [
+            {'header': {'similarity': '93.20'}, 'data': {'title': 'title', 'ext_urls': []}}
+        ]}))
+
+    @requests_mock.mock()
+    def test_check_file(self, mock):
+        """Test the coroutine versions of check_file and check_file_object
+
+        :return:
+        """
+        self.mock_response(mock)
+
+        async def check():
+            async with AsyncSauceNao(directory=self.directory, output_type=SauceNao.API_JSON_TYPE,
+                                     limiter=TokenBucketLimiter(limit=10, period=1, burst=10)) as saucenao:
+                return await asyncio.gather(saucenao.check_file(self.generate_small_jpg()),
+                                            saucenao.check_file_object(io.BytesIO(b'\x00')))
+
+        results = self.loop.run_until_complete(check())
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertEqual(result[0]['header']['similarity'], '93.20')
+
+    @requests_mock.mock()
+    def test_run_worker(self, mock):
+        """Test the async generator of the AsyncWorker with file names and file objects
+
+        :return:
+        """
+        self.mock_response(mock)
+
+        async def collect():
+            worker = AsyncWorker(files=(self.generate_small_jpg(), io.BytesIO(b'\x00')), directory=self.directory,
+                                 output_type=SauceNao.API_JSON_TYPE,
+                                 limiter=TokenBucketLimiter(limit=10, period=1, burst=10))
+            with worker:
+                return [result async for result in worker.run()]
+
+        results = self.loop.run_until_complete(collect())
+        self.assertEqual(len(results), 2)
+        self.assertEqual(mock.call_count, 2)
+
+    @requests_mock.mock()
+    def test_resume_worker(self, mock):
+        """Test that the AsyncWorker skips the journaled files and clears the journal after the completed run
+
+        :return:
+        """
+        self.mock_response(mock)
+        files = [self.generate_small_jpg() for _ in range(4)]
+
+        async def collect(journal):
+            worker = AsyncWorker(files=files, directory=self.directory, output_type=SauceNao.API_JSON_TYPE,
+                                 limiter=TokenBucketLimiter(limit=10, period=1, burst=10), journal=journal)
+            with worker:
+                return [result async for result in worker.run()]
+
+        with ProgressJournal(os.path.join(self.directory, 'journal.jsonl')) as journal:
+            journal.record(files[1])
+            results = self.loop.run_until_complete(collect(journal))
+            self.assertEqual(sorted(result['filename'] for result in results), sorted(files[:1] + files[2:]))
+            self.assertEqual(mock.call_count, 3)
+            self.assertEqual(len(journal), 0)
+
+    def test_manifest(self):
+        """Test that the AsyncWorker records the outcome of the checked files in the manifest
+
+        :return:
+        """
+        files = [self.generate_small_jpg() for _ in range(3)]
+        adapter = requests_mock.Adapter()
+        adapter.register_uri('POST', SauceNao.SEARCH_POST_URL, [
+            {'text': json.dumps({'header': {}, 'results': [
+                {'header': {'similarity': '90.00'}, 'data': {'title': 'found'}}]})},
+            {'text': json.dumps({'header': {}, 'results': []})},
+            {'status_code': 500},
+        ])
+
+        async def collect(manifest):
+            worker = AsyncWorker(files=files, directory=self.directory, output_type=SauceNao.API_JSON_TYPE,
+                                 adapter=adapter, limiter=TokenBucketLimiter(limit=10, period=1, burst=10),
+                                 retry_policy=RetryPolicy(max_retries=0), manifest=manifest)
+            # searched one after another, so the responses are assigned in the order of the files
+            worker.concurrency = 1
+            with worker:
+                return [result async for result in worker.run()]
+
+        with ScanManifest(os.path.join(self.directory, 'manifest.sqlite')) as manifest:
+            with self.assertRaises(UnknownStatusCodeException):
+                self.loop.run_until_complete(collect(manifest))
+
+            self.assertEqual([manifest.get_status(self.directory, file_name) for file_name in files],
+                             [ScanManifest.STATUS_FOUND, ScanManifest.STATUS_NOT_FOUND, ScanManifest.STATUS_FAILED])
+
+    @requests_mock.mock()
+    def test_iterate_in_executor(self, mock):
+        """Test that the files are pulled in the executor instead of blocking the event loop
+
+        :return:
+        """
+        self.mock_response(mock)
+        files = [self.generate_small_jpg() for _ in range(3)]
+        threads = []
+
+        def iterate_files():
+            for file_name in files:
+                threads.append(threading.current_thread())
+                yield file_name
+
+        async def collect():
+            worker = AsyncWorker(files=iterate_files(), directory=self.directory, output_type=SauceNao.API_JSON_TYPE,
+                                 limiter=TokenBucketLimiter(limit=10, period=1, burst=10))
+            with worker:
+                return [result async for result in worker.run()]
+
+        self.assertEqual(len(self.loop.run_until_complete(collect())), 3)
+        self.assertEqual(len(threads), 3)
+        self.assertNotIn(threading.main_thread(), threads)
+
+    @requests_mock.mock()
+    def test_cancel_pending(self, mock):
+        """Test that the searches in flight get cancelled if a search fails or the consumer stops iterating
+
+        :return:
+        """
+        def slow_response(request, context):
+            time.sleep(0.2)
+            return json.dumps({'header': {}, 'results': [
+                {'header': {'similarity': '93.20'}, 'data': {'title': 'title', 'ext_urls': []}}
+            ]})
+
+        files = [self.generate_small_jpg() for _ in range(4)]
+
+        async def check(stop_after_first):
+            worker = AsyncWorker(files=files, directory=self.directory, output_type=SauceNao.API_JSON_TYPE,
+                                 limiter=TokenBucketLimiter(limit=10, period=1, burst=10),
+                                 retry_policy=RetryPolicy(max_retries=0))
+            with worker:
+                results = worker.run()
+                try:
+                    await results.__anext__()
+                finally:
+                    if stop_after_first:
+                        await results.aclose()
+            # only the current task is left, the searches in flight were cancelled and awaited
+            return asyncio.all_tasks()
+
+        mock.post(SauceNao.SEARCH_POST_URL, [{'status_code': 500}, {'text': slow_response}])
+        with self.assertRaises(UnknownStatusCodeException):
+            self.loop.run_until_complete(check(False))
+        self.assertFalse([task for task in asyncio.all_tasks(self.loop) if not task.done()])
+
+        mock.post(SauceNao.SEARCH_POST_URL, text=slow_response)
+        self.assertEqual(len(self.loop.run_until_complete(check(True))), 1)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestAsyncSauceNao)
+    unittest.TextTestRunner(verbosity=2).run(suite)
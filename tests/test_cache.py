@@ -0,0 +1,114 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+import shutil
+import time
+import unittest
+from uuid import uuid4
+
+import requests_mock
+
+from saucenao import SauceNao, SauceNaoDatabase
+from saucenao.cache import ResultCache
+from saucenao.limiter import TokenBucketLimiter
+
+
+class TestResultCache(unittest.TestCase):
+    """
+    test cases for the persistent result cache
+    """
+
+    RESULTS = [{'header': {'similarity': '90.00'}, 'data': {'title': 'title'}}]
+
+    def setUp(self):
+        """Constructor for unittest classes
+
+        :return:
+        """
+        directory = str(uuid4())
+        os.mkdir(directory)
+        self.directory = os.path.abspath(directory)
+        self.path = os.path.join(self.directory, 'cache.sqlite')
+
+    def tearDown(self):
+        """Destructor for unittest classes
+
+        :return:
+        """
+        shutil.rmtree(self.directory)
+
+    def test_get_and_set(self):
+        """Test caching results, statistics and sharing the cache between connections
+
+        :return:
+        """
+        key = ResultCache.get_key('digest', SauceNaoDatabase.All, SauceNao.API_JSON_TYPE)
+        self.assertEqual(key, 'digest:999:2')
+
+        with ResultCache(self.path) as cache:
+            self.assertIsNone(cache.get(key))
+            cache.set(key, self.RESULTS)
+            self.assertEqual(cache.get(key), self.RESULTS)
+            self.assertEqual(cache.stats, {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+        with ResultCache(self.path) as cache:
+            self.assertEqual(cache.get(key), self.RESULTS)
+
+    def test_expiration(self):
+        """Test the TTL of results and the shorter TTL of empty results
+
+        :return:
+        """
+        with ResultCache(self.path, ttl=60, negative_ttl=0.05) as cache:
+            cache.set('empty', [])
+            cache.set('results', self.RESULTS)
+            self.assertEqual(cache.get('empty'), [])
+
+            time.sleep(0.1)
+            self.assertIsNone(cache.get('empty'))
+            self.assertEqual(cache.get('results'), self.RESULTS)
+
+    def test_eviction(self):
+        """Test that the least recently used entries get evicted
+
+        :return:
+        """
+        with ResultCache(self.path, max_entries=2) as cache:
+            for key in ('first', 'second', 'third'):
+                cache.set(key, self.RESULTS)
+                # make sure the access times differ
+                time.sleep(0.01)
+            cache.get('first')
+            cache.evict()
+
+            self.assertEqual(cache.entries, 2)
+            self.assertIsNone(cache.get('second'))
+            self.assertIsNotNone(cache.get('first'))
+
+    @requests_mock.mock()
+    def test_check_file_object(self, mock):
+        """Test that the same content is only searched once, independent of the minimum similarity
+
+        :return:
+        """
+        mock.post(SauceNao.SEARCH_POST_URL, text=json.dumps({'header': {}, 'results': self.RESULTS}))
+        with ResultCache(self.path) as cache:
+            saucenao = SauceNao(output_type=SauceNao.API_JSON_TYPE, cache=cache,
+                                limiter=TokenBucketLimiter(limit=10, period=1, burst=10))
+            self.assertEqual(saucenao.check_file_object(io.BytesIO(b'\x00')), self.RESULTS)
+            saucenao.minimum_similarity = 95
+            self.assertEqual(saucenao.check_file_object(io.BytesIO(b'\x00')), [])
+            self.assertEqual(mock.call_count, 1)
+
+            # other search options are cached separately
+            saucenao.output_type = SauceNao.API_HTML_TYPE
+            mock.post(SauceNao.SEARCH_POST_URL, text='')
+            self.assertEqual(saucenao.check_file_object(io.BytesIO(b'\x00')), [])
+            self.assertEqual(mock.call_count, 2)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestResultCache)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,66 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import json
+import os
+import unittest
+
+from saucenao import SauceNao, codec
+from saucenao.codec import JSON_CODECS, JsonCodec, get_codec
+
+RESOURCES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources')
+
+
+class TestJsonCodec(unittest.TestCase):
+    """
+    parity test cases of the JSON codecs against the JSON codec of the standard library
+    """
+
+    def setUp(self):
+        """Constructor for unittest classes
+
+        :return:
+        """
+        with open(os.path.join(RESOURCES_DIRECTORY, 'search_results.json'), 'rb') as f:
+            self.content = f.read()
+        self.codecs = [name for name, json_codec in JSON_CODECS.items() if json_codec.available]
+
+    def test_recorded_response(self):
+        """Test that all installed codecs decode and encode the recorded API response the same way
+
+        :return:
+        """
+        expected = json.loads(self.content.decode('utf-8'))
+        for name in self.codecs:
+            with self.subTest(codec=name):
+                json_codec = get_codec(name)
+                # bytes get decoded as UTF-8 without decoding the text first
+                response = json_codec.loads(self.content)
+                self.assertEqual(response, expected)
+                self.assertEqual(json_codec.loads(self.content.decode('utf-8')), expected)
+                self.assertEqual(response['results'][1]['data']['title'], '夏の日 & ひまわり')
+
+                # the encoded documents can be decoded by every other codec
+                encoded = json_codec.dumps(response)
+                self.assertIsInstance(encoded, str)
+                for other in self.codecs:
+                    self.assertEqual(get_codec(other).loads(encoded), expected)
+
+        self.assertEqual(SauceNao.parse_results(codec.loads(self.content)), SauceNao.parse_results(expected))
+
+    def test_get_codec(self):
+        """Test the selection of the codecs
+
+        :return:
+        """
+        self.assertIs(get_codec('json'), JsonCodec)
+        self.assertEqual(get_codec().name, next(name for name in ('orjson', 'ujson', 'json') if name in self.codecs))
+        self.assertRaises(ValueError, get_codec, 'unknown')
+
+        for name, json_codec in JSON_CODECS.items():
+            if not json_codec.available:
+                self.assertRaises(ImportError, get_codec, name)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestJsonCodec)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -78,6 +78,38 @@ class TestHttp(unittest.TestCase):
             verify_status_code(request_response=requests.get(self.dummy_url))
             self.assertEqual(str(exception), 'Daily search limit reached')
 
+    def test_create_session(self):
+        """Test the pooled session creation with default and custom transport adapters
+
+        :return:
+        """
+        session = create_session(pool_maxsize=4, max_retries=2)
+        adapter = session.get_adapter('https://saucenao.com')
+        self.assertIs(adapter, session.get_adapter('http://saucenao.com'))
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertEqual(adapter.max_retries.total, 2)
+
+        custom_adapter = requests_mock.Adapter()
+        session = create_session(adapter=custom_adapter)
+        self.assertIs(session.get_adapter('https://saucenao.com'), custom_adapter)
+
+    @requests_mock.mock()
+    def test_response_encoding(self, mock):
+        """Test that responses are decoded with the declared charset or else as UTF-8 without guessing
+
+        :return:
+        """
+        content = 'ひまわり'.encode('utf-8')
+        mock.get(self.dummy_url, content=content, headers={'Content-Type': 'text/html'})
+        response = requests.get(self.dummy_url)
+        self.assertEqual(get_response_encoding(response), 'utf-8')
+        self.assertEqual(get_response_text(response), 'ひまわり')
+
+        mock.get(self.dummy_url, content='ü'.encode('latin-1'), headers={'Content-Type': 'text/html; charset=latin-1'})
+        response = requests.get(self.dummy_url)
+        self.assertEqual(get_response_encoding(response), 'latin-1')
+        self.assertEqual(get_response_text(response), 'ü')
+
 
 if __name__ == '__main__':
     suite = unittest.TestLoader().loadTestsFromTestCase(TestHttp)
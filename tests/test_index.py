@@ -0,0 +1,115 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+import random
+import shutil
+import unittest
+from uuid import uuid4
+
+import requests_mock
+from PIL import Image
+
+from saucenao import SauceNao
+from saucenao.index import PerceptualIndex
+from saucenao.limiter import TokenBucketLimiter
+
+
+class TestPerceptualIndex(unittest.TestCase):
+    """
+    test cases for the persistent perceptual index
+    """
+
+    RESULTS = [{'header': {'similarity': '90.00'}, 'data': {'title': 'title'}}]
+
+    def setUp(self):
+        """Constructor for unittest classes
+
+        :return:
+        """
+        directory = str(uuid4())
+        os.mkdir(directory)
+        self.directory = os.path.abspath(directory)
+        self.path = os.path.join(self.directory, 'index.sqlite')
+
+    def tearDown(self):
+        """Destructor for unittest classes
+
+        :return:
+        """
+        shutil.rmtree(self.directory)
+
+    def test_search(self):
+        """Test searching hashes within the maximum distance
+
+        :return:
+        """
+        value = random.Random(0).getrandbits(64) | 1 << 63
+        with PerceptualIndex(self.path, max_distance=4) as index:
+            index.add(value, 'options', self.RESULTS)
+            index.add(value ^ 0b11, 'options', [])
+
+            self.assertEqual(index.search(value, 'options'), self.RESULTS)
+            # flipped bits spread over the whole hash
+            self.assertEqual(index.search(value ^ (1 | 1 << 20 | 1 << 40 | 1 << 63), 'options'), self.RESULTS)
+            self.assertIsNone(index.search(value ^ 0b111110000, 'options'))
+            self.assertIsNone(index.search(value ^ 0b100, 'options', max_distance=0))
+            self.assertIsNone(index.search(value, 'other options'))
+
+        # the distance is fixed by the chunk layout of the existing index
+        with PerceptualIndex(self.path, max_distance=8) as index:
+            self.assertEqual(index.max_distance, 4)
+            self.assertEqual(index.entries, 2)
+
+    @requests_mock.mock()
+    def test_check_file_object(self, mock):
+        """Test that similar images of identified images are not searched again
+
+        :return:
+        """
+        mock.post(SauceNao.SEARCH_POST_URL, text=json.dumps({'header': {}, 'results': self.RESULTS}))
+        generator = random.Random(0)
+        pattern = Image.frombytes('RGB', (12, 12), bytes(generator.randrange(256) for _ in range(12 * 12 * 3)))
+
+        def encode(size, image_format):
+            file_object = io.BytesIO()
+            pattern.resize(size, Image.BICUBIC).save(file_object, image_format)
+            file_object.seek(0)
+            return file_object
+
+        with PerceptualIndex(self.path) as index:
+            saucenao = SauceNao(output_type=SauceNao.API_JSON_TYPE, index=index,
+                                limiter=TokenBucketLimiter(limit=10, period=1, burst=10))
+            self.assertEqual(saucenao.check_file_object(encode((256, 256), 'PNG')), self.RESULTS)
+            self.assertEqual(saucenao.check_file_object(encode((128, 128), 'JPEG')), self.RESULTS)
+            self.assertEqual(mock.call_count, 1)
+
+            # files which are no images are always searched
+            saucenao.check_file_object(io.BytesIO(b'no image'))
+            self.assertEqual(mock.call_count, 2)
+
+    @requests_mock.mock()
+    def test_unidentified_images(self, mock):
+        """Test that images without results of the minimum similarity are not indexed
+
+        :return:
+        """
+        mock.post(SauceNao.SEARCH_POST_URL, text=json.dumps({'header': {}, 'results': [
+            {'header': {'similarity': '30.00'}, 'data': {'title': 'unrelated'}}]}))
+        image = io.BytesIO()
+        Image.new('RGB', (64, 64), (200, 100, 50)).save(image, 'PNG')
+
+        with PerceptualIndex(self.path) as index:
+            saucenao = SauceNao(output_type=SauceNao.API_JSON_TYPE, index=index, minimum_similarity=65,
+                                limiter=TokenBucketLimiter(limit=10, period=1, burst=10))
+            for _ in range(2):
+                image.seek(0)
+                self.assertEqual(saucenao.check_file_object(image), [])
+            # the near-duplicate gets searched again instead of returning no results permanently
+            self.assertEqual(mock.call_count, 2)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPerceptualIndex)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -1,6 +1,8 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+import contextlib
+import io
 import os
 import shutil
 import sys
@@ -54,6 +56,16 @@ class TestInit(unittest.TestCase):
         self.assertIsInstance(results, types.GeneratorType)
         results = list(results)
 
+    def test_rate_limit_file_with_api_keys(self):
+        """Test that the shared rate limit can't be combined with the API key pool, which wouldn't use it
+
+        :return:
+        """
+        sys.argv = [sys.argv[0], '-d', self.directory, '--api-keys', 'key1,key2',
+                    '--rate-limit-file', os.path.join(self.directory, 'limit')]
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertRaises(SystemExit, run_application)
+
 
 if __name__ == '__main__':
     suite = unittest.TestLoader().loadTestsFromTestCase(TestInit)
@@ -0,0 +1,162 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import json
+import os
+import shutil
+import unittest
+from unittest import mock
+from uuid import uuid4
+
+import requests_mock
+
+from saucenao import SauceNao, Worker
+from saucenao.exceptions import DailyLimitReachedException
+from saucenao.journal import ProgressJournal
+from saucenao.limiter import TokenBucketLimiter
+
+
+class TestProgressJournal(unittest.TestCase):
+    """
+    test cases for the progress journal of interrupted runs
+    """
+
+    FILES = tuple('file_{0:d}.jpg'.format(i) for i in range(5))
+
+    def setUp(self):
+        """Constructor for the unittest
+
+        :return:
+        """
+        directory = str(uuid4())
+        os.mkdir(directory)
+        self.directory = os.path.abspath(directory)
+        for file_name in self.FILES:
+            with open(os.path.join(self.directory, file_name), 'wb') as file_handler:
+                file_handler.write(file_name.encode())
+        self.path = os.path.join(self.directory, 'journal.jsonl')
+
+    def tearDown(self):
+        """Destructor for the unittest
+
+        :return:
+        """
+        shutil.rmtree(self.directory)
+
+    def get_worker(self, files, journal: ProgressJournal, **kwargs) -> Worker:
+        """Return a worker checking the files with the JSON API
+
+        :type files: Iterable
+        :type journal: ProgressJournal
+        :return:
+        """
+        return Worker(files=files, directory=self.directory, journal=journal, output_type=SauceNao.API_JSON_TYPE,
+                      limiter=TokenBucketLimiter(limit=10, period=1, burst=10), **kwargs)
+
+    @staticmethod
+    def mock_response(mock_adapter, daily_limit_after: int = None):
+        """Register JSON API responses with a single result, optionally followed by the daily limit
+
+        :return:
+        """
+        response = {'text': json.dumps({'header': {}, 'results': [
+            {'header': {'similarity': '93.20'}, 'data': {'title': 'title', 'ext_urls': []}}
+        ]})}
+        if daily_limit_after is None:
+            responses = [response]
+        else:
+            responses = [response] * daily_limit_after + [{'status_code': 429, 'text': 'Daily Search Limit Exceeded'}]
+        mock_adapter.post(SauceNao.SEARCH_POST_URL, responses)
+
+    def test_journal(self):
+        """Test that the completed files persist, torn records are cut off and completed runs clear the journal
+
+        :return:
+        """
+        with ProgressJournal(self.path) as journal:
+            journal.record('file_0.jpg')
+            journal.record(os.path.join('sub', 'file "1"\n.jpg'))
+            journal.record('file_0.jpg')
+
+        # record torn by a crash while writing
+        with open(self.path, 'ab') as file_handler:
+            file_handler.write(b'"file_2')
+
+        with ProgressJournal(self.path) as journal:
+            self.assertEqual(journal.completed, {'file_0.jpg', os.path.join('sub', 'file "1"\n.jpg')})
+            self.assertEqual(list(journal.filter(self.FILES)), list(self.FILES[1:]))
+            journal.record('file_3.jpg')
+
+        with ProgressJournal(self.path) as journal:
+            self.assertEqual(len(journal), 3)
+            self.assertIn('file_3.jpg', journal)
+            journal.reset()
+
+        with ProgressJournal(self.path) as journal:
+            self.assertEqual(len(journal), 0)
+
+    def test_undecodable_names(self):
+        """Test that names which aren't valid UTF-8 are journaled with their surrogates
+
+        :return:
+        """
+        file_name = os.fsdecode(b'caf\xe9.jpg')
+        with ProgressJournal(self.path) as journal:
+            journal.record(file_name)
+
+        with ProgressJournal(self.path) as journal:
+            self.assertIn(file_name, journal)
+            self.assertEqual(list(journal.filter([file_name, 'file_0.jpg'])), ['file_0.jpg'])
+
+    def test_sync_batches(self):
+        """Test that the journal is only synced to the disk once enough records are pending
+
+        :return:
+        """
+        with mock.patch('os.fsync') as fsync:
+            journal = ProgressJournal(self.path, sync_records=2, sync_interval=60)
+            for file_name in self.FILES:
+                journal.record(file_name)
+            self.assertEqual(fsync.call_count, 2)
+            journal.close()
+            self.assertEqual(fsync.call_count, 3)
+
+    @requests_mock.mock()
+    def test_resume(self, mock_adapter):
+        """Test that a run interrupted by the daily limit resumes with the files which weren't completed yet
+
+        :return:
+        """
+        self.mock_response(mock_adapter, daily_limit_after=2)
+        with ProgressJournal(self.path) as journal:
+            results = self.get_worker(iter(self.FILES), journal).run()
+            self.assertEqual([next(results)['filename'] for _ in range(2)], list(self.FILES[:2]))
+            self.assertRaises(DailyLimitReachedException, next, results)
+
+        self.mock_response(mock_adapter)
+        with ProgressJournal(self.path) as journal:
+            self.assertEqual(len(journal), 2)
+            results = [result['filename'] for result in self.get_worker(iter(self.FILES), journal).run()]
+            self.assertEqual(results, list(self.FILES[2:]))
+            # the run completed, so the next run starts from the beginning again
+            self.assertEqual(len(journal), 0)
+
+    def test_start_file(self):
+        """Test that the files before the start file are skipped while streaming the files
+
+        :return:
+        """
+        worker = self.get_worker(iter(self.FILES), None, start_file='file_3.jpg')
+        self.assertEqual(list(worker.files), list(self.FILES[3:]))
+
+        worker = self.get_worker(self.FILES, None, start_file='missing.jpg')
+        with self.assertLogs(worker.logger, 'WARNING'):
+            self.assertEqual(list(worker.files), list(self.FILES))
+
+        worker = self.get_worker(iter(self.FILES), None, start_file='missing.jpg')
+        with self.assertLogs(worker.logger, 'WARNING'):
+            self.assertEqual(list(worker.files), [])
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestProgressJournal)
+    unittest.TextTestRunner(verbosity=2).run(suite)
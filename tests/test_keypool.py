@@ -0,0 +1,100 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import io
+import json
+import time
+import unittest
+
+import requests_mock
+
+from saucenao import SauceNao
+from saucenao.exceptions import DailyLimitReachedException
+from saucenao.keypool import ApiKey, ApiKeyPool
+from saucenao.limiter import TokenBucketLimiter
+
+
+class TestApiKeyPool(unittest.TestCase):
+    """
+    test cases for the API key pool
+    """
+
+    def test_from_string(self):
+        """Test the command line notation of API keys
+
+        :return:
+        """
+        api_key = ApiKey.from_string(' key:premium')
+        self.assertEqual(api_key.key, 'key')
+        self.assertEqual(api_key.account_type, ApiKey.ACCOUNT_TYPE_PREMIUM)
+        self.assertEqual(api_key.limiter.limit, ApiKey.LIMIT_30_SECONDS[ApiKey.ACCOUNT_TYPE_PREMIUM])
+        self.assertEqual(ApiKey.from_string('key').account_type, ApiKey.ACCOUNT_TYPE_BASIC)
+        # the keys share the limits of the account types with the searches without pool
+        self.assertIs(ApiKey.LIMIT_30_SECONDS, SauceNao.LIMIT_30_SECONDS)
+
+    def test_proportional_scheduling(self):
+        """Test that the searches are distributed proportional to the limits of the keys
+
+        :return:
+        """
+        fast_key = ApiKey('fast', limiter=TokenBucketLimiter(limit=3, period=30, burst=3))
+        slow_key = ApiKey('slow', limiter=TokenBucketLimiter(limit=1, period=30, burst=1))
+        pool = ApiKeyPool([fast_key, slow_key])
+        self.assertEqual(pool.limit_30s, 4)
+
+        used_keys = [pool.acquire().key for _ in range(4)]
+        self.assertEqual(used_keys.count('fast'), 3)
+        self.assertEqual(used_keys.count('slow'), 1)
+        self.assertEqual(fast_key.usage, 3)
+
+    def test_daily_limit(self):
+        """Test retiring keys by their configured daily limit and by exhaustion
+
+        :return:
+        """
+        limited_key = ApiKey('limited', daily_limit=1, limiter=TokenBucketLimiter(limit=10, period=1, burst=10))
+        other_key = ApiKey('other', limiter=TokenBucketLimiter(limit=1, period=1, burst=1))
+        pool = ApiKeyPool([limited_key, other_key])
+
+        self.assertIs(pool.acquire(), limited_key)
+        self.assertIs(pool.acquire(), other_key)
+        self.assertEqual(pool.available_keys, [other_key])
+
+        pool.retire(other_key)
+        with self.assertRaises(DailyLimitReachedException):
+            pool.acquire()
+
+        # keys are available again after the daily reset
+        self.assertTrue(other_key.is_available(time.time() + ApiKey.DAILY_RESET_SECONDS))
+
+    @requests_mock.mock()
+    def test_failover(self, mock):
+        """Test that an exhausted key gets retired and the search is repeated with the next key
+
+        :return:
+        """
+
+        bodies = []
+
+        def callback(request, context):
+            bodies.append(b''.join(iter(request.body.read, b'')))
+            if 'api_key=exhausted' in request.url:
+                context.status_code = 429
+                return 'limit of 300 searches reached'
+            return json.dumps({'header': {}, 'results': []})
+
+        mock.post(SauceNao.SEARCH_POST_URL, text=callback)
+        exhausted_key = ApiKey('exhausted', limiter=TokenBucketLimiter(limit=10, period=1, burst=10))
+        saucenao = SauceNao(output_type=SauceNao.API_JSON_TYPE, api_keys=[
+            exhausted_key, ApiKey('valid', limiter=TokenBucketLimiter(limit=1, period=1, burst=1))
+        ])
+
+        self.assertEqual(saucenao.check_file_object(io.BytesIO(b'\x00')), [])
+        self.assertEqual(mock.call_count, 2)
+        # the repeated search uploads the file again from the start
+        self.assertIn(b'\r\n\r\n\x00\r\n', bodies[1])
+        self.assertNotIn(exhausted_key, saucenao.key_pool.available_keys)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestApiKeyPool)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,108 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+import shutil
+import threading
+import time
+import unittest
+from uuid import uuid4
+
+import requests_mock
+
+from saucenao import SauceNao
+from saucenao.limiter import FileLockLimiter, TokenBucketLimiter
+
+
+class TestLimiter(unittest.TestCase):
+    """
+    test cases for the rate limiter backends
+    """
+
+    def setUp(self):
+        """Constructor for unittest classes
+
+        :return:
+        """
+        directory = str(uuid4())
+        os.mkdir(directory)
+        self.directory = os.path.abspath(directory)
+
+    def tearDown(self):
+        """Destructor for unittest classes
+
+        :return:
+        """
+        shutil.rmtree(self.directory)
+
+    def test_token_bucket(self):
+        """Test burst, refill and the non-blocking functions of the in-process token bucket
+
+        :return:
+        """
+        limiter = TokenBucketLimiter(limit=20, period=1, burst=2)
+        self.assertTrue(limiter.try_acquire())
+        self.assertTrue(limiter.try_acquire())
+        self.assertFalse(limiter.try_acquire())
+        self.assertAlmostEqual(limiter.time_until_available(), 0.05, delta=0.01)
+
+        start = time.monotonic()
+        limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.03)
+
+        # more tokens than the bucket can hold only wait for a full bucket and take the remaining tokens on credit
+        limiter = TokenBucketLimiter(limit=20, period=1, burst=1)
+        self.assertEqual(limiter.reserve(2), 0)
+        self.assertAlmostEqual(limiter.time_until_available(), 0.1, delta=0.01)
+
+    def test_token_bucket_threads(self):
+        """Test that concurrent threads are queued up behind each other
+
+        :return:
+        """
+        limiter = TokenBucketLimiter(limit=50, period=1)
+        start = time.monotonic()
+        threads = [threading.Thread(target=limiter.acquire) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # the first token is available right away, the following 5 take 0.02 seconds each
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_file_lock_limiter(self):
+        """Test that limiters using the same state file share the budget
+
+        :return:
+        """
+        path = os.path.join(self.directory, 'limiter')
+        limiter = FileLockLimiter(path=path, limit=1, period=30, burst=2)
+        other_limiter = FileLockLimiter(path=path, limit=1, period=30, burst=2)
+
+        self.assertTrue(limiter.try_acquire())
+        self.assertTrue(other_limiter.try_acquire())
+        self.assertFalse(limiter.try_acquire())
+        self.assertFalse(other_limiter.try_acquire())
+        self.assertGreater(other_limiter.time_until_available(), 29)
+
+    @requests_mock.mock()
+    def test_check_file_object(self, mock):
+        """Test that every search takes a token of the limiter
+
+        :return:
+        """
+        mock.post(SauceNao.SEARCH_POST_URL, text=json.dumps({'header': {}, 'results': []}))
+        limiter = TokenBucketLimiter(limit=1, period=30, burst=2)
+        saucenao = SauceNao(output_type=SauceNao.API_JSON_TYPE, limiter=limiter)
+        saucenao.check_file_object(io.BytesIO(b'\x00'))
+        self.assertTrue(limiter.try_acquire())
+        self.assertFalse(limiter.try_acquire())
+
+        # the default limiter uses the limit of the account type
+        self.assertEqual(SauceNao(api_key='key').limiter.limit, SauceNao.LIMIT_30_SECONDS[SauceNao.ACCOUNT_TYPE_BASIC])
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestLimiter)
+    unittest.TextTestRunner(verbosity=2).run(suite)
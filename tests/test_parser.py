@@ -0,0 +1,179 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import os
+import unittest
+
+from saucenao import SauceNao
+from saucenao.parser import PARSER_ENGINES, HtmlResultParser, SoupResultParser, etree, get_parser
+
+RESOURCES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources')
+
+
+class TestResultParser(unittest.TestCase):
+    """
+    parity test cases of the HTML parser engines against the BeautifulSoup reference engine
+    """
+
+    PAGES = ('search_results.html', 'search_results_empty.html')
+
+    def setUp(self):
+        """Constructor for unittest classes
+
+        :return:
+        """
+        self.engines = [HtmlResultParser.name]
+        if etree is not None:
+            self.engines.append('lxml')
+
+    @staticmethod
+    def read_page(file_name: str) -> str:
+        """Read a recorded SauceNAO page from the resources
+
+        :type file_name: str
+        :return:
+        """
+        with open(os.path.join(RESOURCES_DIRECTORY, file_name), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def assert_parity(self, html: str):
+        """Assert that all engines produce the results of the reference engine
+
+        :type html: str
+        :return:
+        """
+        expected = SoupResultParser().parse(html)
+        for engine in self.engines:
+            with self.subTest(engine=engine):
+                self.assertEqual(get_parser(engine).parse(html), expected)
+
+    def test_recorded_pages(self):
+        """Test the parity of the engines on recorded SauceNAO pages
+
+        :return:
+        """
+        for page in self.PAGES:
+            with self.subTest(page=page):
+                self.assert_parity(self.read_page(page))
+
+        results = get_parser().parse(self.read_page('search_results.html'))['results']
+        self.assertEqual(len(results), 8)
+        self.assertEqual(results[0]['header'], {'similarity': '94.26'})
+        self.assertEqual(results[0]['data']['title'], 'Creator: hiten (hitenkei)')
+        self.assertEqual(results[0]['data']['content'], ['Material: original\nCharacters: original girl\n'])
+        self.assertEqual(results[0]['data']['ext_urls'], [
+            'https://danbooru.donmai.us/post/show/3074432',
+            'https://gelbooru.com/index.php?page=post&s=view&id=4040212',
+            'https://yande.re/post/show/457103',
+        ])
+        # entities get decoded and content columns of a cell are separated
+        self.assertEqual(results[1]['data']['title'], '夏の日 & ひまわり')
+        self.assertEqual(len(results[2]['data']['content']), 2)
+        # results without title take the following title like the original parser did
+        self.assertEqual(results[4]['data']['title'], 'Creator: tagme')
+
+    def test_markup_variants(self):
+        """Test the parity of the engines on unusual markup
+
+        :return:
+        """
+        self.assert_parity('')
+        self.assert_parity('<td class="resulttablecontent"><div class="resultsimilarityinfo">50%</div>'
+                           '<div class="resultmiscinfo"><a href>empty</a><a name="x">no link</a></div>'
+                           '<div class="resultcontentcolumn">a<br>b<br/>c<!-- comment -->d</div></td>')
+        self.assert_parity('<td class="other resulttablecontent"><div class="resulttitle">  </div>'
+                           '<div class="x resultsimilarityinfo">70.5%</div><div class="resultmiscinfo"></div>'
+                           '<div class="resultcontentcolumn">\n\t<br />\n\t</div></td>')
+
+    def test_minimum_similarity_and_limit(self):
+        """Test that the engines skip results below the minimum similarity and outside of the limit
+        like filtering the completely parsed results
+
+        :return:
+        """
+        html = self.read_page('search_results.html')
+        results = SoupResultParser().parse(html)['results']
+
+        for minimum_similarity in (None, 0, 65, 72.4, 100):
+            for limit in (None, 0, 1, 3):
+                expected = [res for res in results
+                            if minimum_similarity is None or float(res['header']['similarity']) >= minimum_similarity]
+                if limit is not None:
+                    expected = SauceNao.parse_results({'results': expected})[:limit]
+                    expected = [res for res in results if res in expected]
+
+                for engine in self.engines + [SoupResultParser.name]:
+                    with self.subTest(engine=engine, minimum_similarity=minimum_similarity, limit=limit):
+                        self.assertEqual(get_parser(engine).parse(html, minimum_similarity, limit)['results'],
+                                         expected)
+
+        # the result without title still takes the title of the following skipped result
+        results = get_parser().parse(html, minimum_similarity=65)['results']
+        self.assertEqual([res['header']['similarity'] for res in results],
+                         ['94.26', '93.87', '87.12', '72.40', '66.01'])
+        self.assertEqual(results[-1]['data']['title'], 'Creator: tagme')
+
+    def test_parse_stream(self):
+        """Test that the streamed pages result in the same results independent of the chunk size
+        and the html engine stops reading once the following results can't be selected anymore
+
+        :return:
+        """
+        html = self.read_page('search_results.html')
+        content = html.encode('utf-8')
+        read_chunks = []
+
+        def chunks(size):
+            for i in range(0, len(content), size):
+                read_chunks.append(i)
+                yield content[i:i + size]
+
+        # multibyte characters get split by the small chunk sizes
+        for size in (1, 100, len(content)):
+            for minimum_similarity, limit in ((None, None), (65, None), (65, 2), (None, 1), (100, None)):
+                expected = SoupResultParser().parse(html, minimum_similarity, limit)
+                for engine in self.engines + [SoupResultParser.name]:
+                    with self.subTest(engine=engine, size=size, minimum_similarity=minimum_similarity, limit=limit):
+                        self.assertEqual(get_parser(engine).parse_stream(chunks(size), 'utf-8', minimum_similarity,
+                                                                         limit), expected)
+
+        read_chunks.clear()
+        results = HtmlResultParser().parse_stream(chunks(100), minimum_similarity=90)['results']
+        self.assertEqual(len(results), 2)
+        self.assertLess(len(read_chunks), len(content) / 100 / 2)
+
+        # pages not understood by the engine fall back to BeautifulSoup after reading them completely
+        content = b'<td class="resulttablecontent"><div class="resultmiscinfo"></div></td>'
+        self.assertRaises(AttributeError, HtmlResultParser().parse_stream, chunks(10))
+
+    def test_fallback(self):
+        """Test that pages the fast engines don't understand are parsed by BeautifulSoup
+
+        :return:
+        """
+        # result without the mandatory similarity raises the error of the original parser
+        html = '<td class="resulttablecontent"><div class="resultmiscinfo"></div></td>'
+        for engine in PARSER_ENGINES:
+            if engine == 'lxml' and etree is None:
+                continue
+
+            with self.subTest(engine=engine):
+                self.assertRaises(AttributeError, get_parser(engine).parse, html)
+
+    def test_get_parser(self):
+        """Test the selection of the parser engines
+
+        :return:
+        """
+        self.assertIsInstance(get_parser('bs4'), SoupResultParser)
+        self.assertIsInstance(get_parser('html'), HtmlResultParser)
+        self.assertEqual(get_parser().name, 'lxml' if etree is not None else 'html')
+        self.assertRaises(ValueError, get_parser, 'unknown')
+
+        self.assertEqual(SauceNao(parser_engine='bs4').parser.name, 'bs4')
+        self.assertEqual(SauceNao.parse_results_html(self.read_page('search_results.html'), engine='html'),
+                         SoupResultParser().parse(self.read_page('search_results.html')))
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestResultParser)
+    unittest.TextTestRunner(verbosity=2).run(suite)
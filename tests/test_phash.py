@@ -0,0 +1,112 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+import random
+import shutil
+import unittest
+from uuid import uuid4
+
+import requests_mock
+from PIL import Image
+
+from saucenao import SauceNao, Worker
+from saucenao.limiter import TokenBucketLimiter
+from saucenao.phash import cluster_by_hash, dhash, hamming_distance
+
+
+class TestPerceptualHash(unittest.TestCase):
+    """
+    test cases for the perceptual hashes and the near-duplicate clustering of the worker
+    """
+
+    def setUp(self):
+        """Constructor for unittest classes
+
+        :return:
+        """
+        directory = str(uuid4())
+        os.mkdir(directory)
+        self.directory = os.path.abspath(directory)
+
+    def tearDown(self):
+        """Destructor for unittest classes
+
+        :return:
+        """
+        shutil.rmtree(self.directory)
+
+    def generate_image(self, size, seed=0, image_format='PNG'):
+        """Generate a smooth random pattern in the test directory and return the file name
+
+        :return:
+        """
+        generator = random.Random(seed)
+        pattern = bytes(generator.randrange(256) for _ in range(12 * 12 * 3))
+        im = Image.frombytes('RGB', (12, 12), pattern).resize(size, Image.BICUBIC)
+        file_name = str(uuid4()) + '.' + image_format.lower()
+        im.convert('RGB').save(os.path.join(self.directory, file_name), image_format)
+        return file_name
+
+    def get_hash(self, file_name):
+        with open(os.path.join(self.directory, file_name), 'rb') as file_object:
+            return dhash(file_object)
+
+    def test_dhash(self):
+        """Test that resized and re-encoded copies have similar hashes and different images don't
+
+        :return:
+        """
+        original = self.get_hash(self.generate_image((256, 256)))
+        copy = self.get_hash(self.generate_image((120, 120), image_format='JPEG'))
+        other = self.get_hash(self.generate_image((256, 256), seed=1))
+
+        self.assertLessEqual(hamming_distance(original, copy), 4)
+        self.assertGreater(hamming_distance(original, other), 16)
+
+    def test_cluster_by_hash(self):
+        """Test the greedy clustering of hashed items
+
+        :return:
+        """
+        clusters = cluster_by_hash([('a', 0b0000), ('b', 0b1111), ('c', 0b0001), ('d', None), ('e', 0b0111)], 1)
+        self.assertEqual(clusters, [('a', ['c']), ('b', ['e']), ('d', [])])
+
+    @requests_mock.mock()
+    def test_worker_clusters(self, mock):
+        """Test that only one file per cluster is searched and its results are shared with the duplicates
+
+        :return:
+        """
+        mock.post(SauceNao.SEARCH_POST_URL, text=json.dumps({'header': {}, 'results': [
+            {'header': {'similarity': '90.00'}, 'data': {'title': 'title'}}
+        ]}))
+        files = [self.generate_image((256, 256)), self.generate_image((256, 256), seed=1),
+                 self.generate_image((100, 100), image_format='JPEG')]
+        worker = Worker(files=files + [io.BytesIO(b'no image')], directory=self.directory, cluster_threshold=4,
+                        output_type=SauceNao.API_JSON_TYPE, limiter=TokenBucketLimiter(limit=10, period=1, burst=10))
+
+        results = list(worker.run())
+        self.assertEqual(mock.call_count, 3)
+        self.assertEqual([result['filename'] for result in results[:2]], [files[0], files[2]])
+        self.assertEqual(len(results), 4)
+
+    def test_stream_position(self):
+        """Test that hashing streams positioned at an offset keeps their position
+
+        :return:
+        """
+        file_name = self.generate_image((256, 256))
+        with open(os.path.join(self.directory, file_name), 'rb') as file_object:
+            stream = io.BytesIO(b'archive header' + file_object.read())
+        stream.seek(len(b'archive header'))
+
+        worker = Worker(files=[file_name, stream], directory=self.directory, cluster_threshold=4)
+        self.assertEqual(worker.clusters, [(file_name, [stream])])
+        self.assertEqual(stream.tell(), len(b'archive header'))
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPerceptualHash)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,118 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+import unittest
+from unittest import mock
+
+import requests_mock
+from PIL import Image
+
+from saucenao import SauceNao
+from saucenao.limiter import TokenBucketLimiter
+from saucenao.preprocess import ImagePreprocessor
+from saucenao.upload import UploadBuffer
+
+
+class TestImagePreprocessor(unittest.TestCase):
+    """
+    test cases for the downscaling and re-encoding of images before the upload
+    """
+
+    @staticmethod
+    def generate_png(width, height) -> io.BytesIO:
+        """Generate a noisy png image which doesn't compress well
+
+        :return:
+        """
+        im = Image.frombytes("RGB", (width, height), os.urandom(width * height * 3))
+        file_object = io.BytesIO()
+        im.save(file_object, "PNG")
+        file_object.seek(0)
+        return file_object
+
+    def test_small_image(self):
+        """Test that images inside of the limits are uploaded unmodified
+
+        :return:
+        """
+        preprocessor = ImagePreprocessor(max_dimension=100)
+        with UploadBuffer(self.generate_png(50, 50)) as upload_buffer:
+            self.assertIsNone(preprocessor.process(upload_buffer))
+
+        with UploadBuffer(io.BytesIO(b'no image')) as upload_buffer:
+            self.assertIsNone(preprocessor.process(upload_buffer))
+
+    def test_downscale(self):
+        """Test downscaling images exceeding the dimension and byte budget
+
+        :return:
+        """
+        preprocessor = ImagePreprocessor(max_dimension=100, max_bytes=8 * 1024)
+        with UploadBuffer(self.generate_png(400, 200)) as upload_buffer:
+            thumbnail = preprocessor.process(upload_buffer)
+            self.assertLessEqual(len(thumbnail), 8 * 1024)
+
+            image = Image.open(io.BytesIO(thumbnail))
+            self.assertEqual(image.format, 'JPEG')
+            self.assertLessEqual(max(image.size), 100)
+            self.assertAlmostEqual(image.size[0] / image.size[1], 2, delta=0.1)
+
+            # the derived thumbnail gets cached for repeated checks
+            self.assertIs(preprocessor.process(upload_buffer), thumbnail)
+
+    def test_cache_bytes(self):
+        """Test that the cached thumbnails are limited by their total size
+
+        :return:
+        """
+        with UploadBuffer(self.generate_png(400, 200)) as first, UploadBuffer(self.generate_png(400, 200)) as second:
+            thumbnail = ImagePreprocessor(max_dimension=100).process(first)
+            preprocessor = ImagePreprocessor(max_dimension=100, cache_bytes=len(thumbnail) * 3 // 2)
+            thumbnail = preprocessor.process(first)
+            self.assertIs(preprocessor.process(first), thumbnail)
+
+            # the thumbnail of the second image exceeds the budget with the first one, which gets evicted
+            preprocessor.process(second)
+            self.assertIsNot(preprocessor.process(first), thumbnail)
+
+            # thumbnails larger than the whole budget aren't cached at all
+            preprocessor = ImagePreprocessor(max_dimension=100, cache_bytes=len(thumbnail) - 1)
+            self.assertIsNot(preprocessor.process(first), preprocessor.process(first))
+
+    def test_decompression_bomb(self):
+        """Test that images exceeding the pixel limit of Pillow are uploaded unmodified instead of failing
+
+        :return:
+        """
+        preprocessor = ImagePreprocessor(max_dimension=100)
+        with UploadBuffer(self.generate_png(400, 400)) as upload_buffer, \
+                mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 100):
+            self.assertIsNone(preprocessor.process(upload_buffer))
+
+    @requests_mock.mock()
+    def test_check_file_object(self, mock):
+        """Test that the thumbnail instead of the original is uploaded
+
+        :return:
+        """
+        bodies = []
+
+        def callback(request, context):
+            bodies.append(b''.join(iter(request.body.read, b'')))
+            return json.dumps({'header': {}, 'results': []})
+
+        mock.post(SauceNao.SEARCH_POST_URL, text=callback)
+        saucenao = SauceNao(output_type=SauceNao.API_JSON_TYPE, preprocessor=ImagePreprocessor(max_dimension=100),
+                            limiter=TokenBucketLimiter(limit=10, period=1, burst=10))
+        original = self.generate_png(400, 400)
+        saucenao.check_file_object(original)
+
+        self.assertLess(len(bodies[0]), len(original.getvalue()))
+        self.assertIn(b'JFIF', bodies[0])
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestImagePreprocessor)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,82 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import io
+import json
+import unittest
+
+import requests_mock
+
+from saucenao import SauceNao
+from saucenao.keypool import ApiKey
+from saucenao.limiter import TokenBucketLimiter
+from saucenao.quota import QuotaState
+
+
+class TestQuota(unittest.TestCase):
+    """
+    test cases for the quota reported in the header of JSON API responses
+    """
+
+    HEADER = {
+        'user_id': '1234',
+        'account_type': '1',
+        'short_limit': '8',
+        'long_limit': '200',
+        'long_remaining': 150,
+        'short_remaining': 0,
+        'status': 0,
+    }
+
+    def test_update(self):
+        """Test updating the quota with a response header
+
+        :return:
+        """
+        quota = QuotaState()
+        self.assertFalse(quota.is_known)
+        self.assertFalse(quota.update({'status': 0}))
+        self.assertFalse(quota.is_known)
+
+        self.assertTrue(quota.update(self.HEADER))
+        self.assertEqual(quota.short_limit, 8)
+        self.assertEqual(quota.long_remaining, 150)
+        self.assertEqual(quota.as_dict()['account_type'], '1')
+        self.assertTrue(quota.is_known)
+
+    @requests_mock.mock()
+    def test_pacing(self, mock):
+        """Test that the reported quota adjusts the limiter of the instance
+
+        :return:
+        """
+        mock.post(SauceNao.SEARCH_POST_URL, text=json.dumps({'header': self.HEADER, 'results': []}))
+        saucenao = SauceNao(output_type=SauceNao.API_JSON_TYPE,
+                            limiter=TokenBucketLimiter(limit=4, period=30, burst=5))
+        saucenao.check_file_object(io.BytesIO(b'\x00'))
+
+        self.assertEqual(saucenao.quota.short_remaining, 0)
+        self.assertEqual(saucenao.limiter.limit, 8)
+        self.assertEqual(saucenao.search_limit_30s, 8)
+        # no searches remaining in the current 30 seconds
+        self.assertFalse(saucenao.limiter.try_acquire())
+
+    @requests_mock.mock()
+    def test_key_pool_quota(self, mock):
+        """Test that pooled keys track their own quota and get retired once the daily limit is reported
+
+        :return:
+        """
+        header = dict(self.HEADER, long_remaining=0)
+        mock.post(SauceNao.SEARCH_POST_URL, text=json.dumps({'header': header, 'results': []}))
+        api_key = ApiKey('key', limiter=TokenBucketLimiter(limit=6, period=30, burst=5))
+        saucenao = SauceNao(output_type=SauceNao.API_JSON_TYPE, api_keys=[api_key])
+        saucenao.check_file_object(io.BytesIO(b'\x00'))
+
+        self.assertEqual(api_key.quota.long_remaining, 0)
+        self.assertFalse(saucenao.quota.is_known)
+        self.assertEqual(saucenao.key_pool.available_keys, [])
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestQuota)
+    unittest.TextTestRunner(verbosity=2).run(suite)
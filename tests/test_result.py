@@ -0,0 +1,260 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import copy
+import json
+import os
+import pickle
+import re
+import unittest
+from unittest import mock
+
+from saucenao import SauceNao, SauceNaoResult
+from saucenao.parser import SoupResultParser
+from saucenao.result import MISSING_FIELDS_KEY, build_content_index, enrich_result, extract_content_value
+
+RESOURCES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources')
+
+
+class TestSauceNaoResult(unittest.TestCase):
+    """
+    test cases for the compact result model
+    """
+
+    HTML_RESULT = {
+        'header': {'similarity': '94.26'},
+        'data': {
+            'title': 'Creator: hiten (hitenkei)',
+            'content': ['Material: original\nCharacters: original girl\n'],
+            'ext_urls': ['https://danbooru.donmai.us/post/show/3074432']
+        }
+    }
+
+    JSON_RESULT = {
+        'header': {'similarity': '93.87', 'index_id': 5, 'index_name': 'Index #5: Pixiv Images'},
+        'data': {'ext_urls': ['https://www.pixiv.net/member_illust.php?mode=medium&illust_id=69321542'],
+                 'title': 'ひまわり', 'pixiv_id': 69321542, 'member_name': 'Hiten'}
+    }
+
+    def test_typed_fields(self):
+        """Test that the fields get converted and the categorisation fields parsed once
+
+        :return:
+        """
+        result = SauceNaoResult.from_dict(self.HTML_RESULT)
+        self.assertEqual(result.similarity, 94.26)
+        self.assertEqual(result.title, 'Creator: hiten (hitenkei)')
+        self.assertEqual(result.content, ('Material: original\nCharacters: original girl\n',))
+        self.assertEqual(result.ext_urls, ('https://danbooru.donmai.us/post/show/3074432',))
+        # the typed fields end with their line unlike the values of get_content_value
+        self.assertEqual(result.material, 'original')
+        self.assertEqual(result.characters, 'original girl')
+        self.assertEqual(result.creator, 'hiten (hitenkei)')
+        self.assertEqual(result.get_content_value('Material'), ('original', 'Characters: original girl'))
+        self.assertFalse(hasattr(result, '__dict__'))
+
+        result = SauceNaoResult.from_dict(self.JSON_RESULT)
+        self.assertEqual(result.title, 'ひまわり')
+        self.assertIsNone(result.content)
+        self.assertIsNone(result.material)
+        self.assertIsNone(result.creator)
+
+        # fields of unexpected types stay untouched in the remaining data
+        response_result = {'header': {'similarity': '50.0'}, 'data': {'title': None}}
+        result = SauceNaoResult.from_dict(response_result)
+        self.assertIsNone(result.title)
+        self.assertIsNone(result.creator)
+        self.assertEqual(result, response_result)
+
+    def test_dict_view(self):
+        """Test that the result is a dictionary in the format of the JSON API response
+
+        :return:
+        """
+        for response_result in (self.HTML_RESULT, self.JSON_RESULT):
+            result = SauceNaoResult.from_dict(response_result)
+            self.assertIsInstance(result, dict)
+            self.assertEqual(result, response_result)
+            self.assertEqual(dict(result), response_result)
+            self.assertEqual(result.to_dict(), response_result)
+            self.assertEqual(result['header']['similarity'], response_result['header']['similarity'])
+            self.assertEqual(json.loads(json.dumps(result)), response_result)
+            self.assertEqual(json.loads(json.dumps([result])), [response_result])
+            self.assertEqual(pickle.loads(pickle.dumps(result)), result)
+            self.assertRaises(KeyError, result.__getitem__, 'results')
+
+        # modifications persist in the result without changing the passed result
+        result = SauceNaoResult.from_dict(self.HTML_RESULT)
+        result['data']['content'].append('Material: modified')
+        result['data']['x'] = 'y'
+        result['header'].update(index_id=5)
+        self.assertEqual(result['data']['content'][-1], 'Material: modified')
+        self.assertEqual(result.content[-1], 'Material: modified')
+        self.assertEqual(result['data']['x'], 'y')
+        self.assertEqual(result.header['index_id'], 5)
+        self.assertEqual(json.loads(json.dumps(result))['data']['x'], 'y')
+        self.assertNotEqual(result, self.HTML_RESULT)
+        self.assertNotIn('x', self.HTML_RESULT['data'])
+
+    def test_lazy_view(self):
+        """Test that the typed fields are read without building the dictionary view and every access builds it
+
+        :return:
+        """
+        result = SauceNaoResult.from_dict(self.HTML_RESULT)
+        with mock.patch.object(SauceNaoResult, '_build', side_effect=AssertionError('unexpected view')):
+            self.assertEqual(result.similarity, 94.26)
+            self.assertEqual(result.header, {'similarity': '94.26'})
+            self.assertEqual((result.title, result.material, result.characters, result.creator),
+                             ('Creator: hiten (hitenkei)', 'original', 'original girl', 'hiten (hitenkei)'))
+            self.assertEqual(len(result.ext_urls), 1)
+            self.assertEqual(result.get_content_value('Characters'), ('original girl',))
+
+        conversions = (dict, copy.copy, copy.deepcopy, lambda res: {**res}, lambda res: res | {},
+                       lambda res: res.copy(), lambda res: json.loads(json.dumps(res)),
+                       lambda res: pickle.loads(pickle.dumps(res)))
+        for conversion in conversions:
+            with self.subTest(conversion=conversion):
+                self.assertEqual(conversion(SauceNaoResult.from_dict(self.HTML_RESULT)), self.HTML_RESULT)
+        self.assertEqual(SauceNaoResult.from_dict(self.HTML_RESULT), SauceNaoResult.from_dict(self.HTML_RESULT))
+        self.assertNotEqual(SauceNaoResult.from_dict(self.HTML_RESULT), SauceNaoResult.from_dict(self.JSON_RESULT))
+
+    def test_category_values(self):
+        """Test that the values of the result objects are equal to the values of the dictionaries
+
+        :return:
+        """
+        dicts = [self.JSON_RESULT, self.HTML_RESULT]
+        results = [SauceNaoResult.from_dict(res) for res in dicts]
+        for key in (SauceNao.CONTENT_CATEGORY_KEY, SauceNao.CONTENT_CHARACTERS_KEY, 'Source', 'unknown'):
+            self.assertEqual(SauceNao.get_content_value(results, key), SauceNao.get_content_value(dicts, key))
+        for key in (SauceNao.CONTENT_AUTHOR_KEY, 'unknown'):
+            self.assertEqual(SauceNao.get_title_value(results, key), SauceNao.get_title_value(dicts, key))
+
+        # the returned values can be modified without changing the result
+        SauceNao.get_content_value(results, SauceNao.CONTENT_CATEGORY_KEY).remove('original')
+        self.assertEqual(results[1].get_content_value(SauceNao.CONTENT_CATEGORY_KEY),
+                         ('original', 'Characters: original girl'))
+
+    @staticmethod
+    def get_content_value(results, key: str):
+        """Previous implementation of SauceNao.get_content_value as reference
+
+        :return:
+        """
+        for result in results:
+            if 'content' in list(result['data'].keys()):
+                for content in result['data']['content']:
+                    if re.search(r'{0:s}: .*'.format(key), content):
+                        return ''.join(re.split(r'{0:s}: '.format(key), content)[1:]).rstrip("\n").split('\n')
+        return ''
+
+    @staticmethod
+    def get_title_value(results, key: str):
+        """Previous implementation of SauceNao.get_title_value as reference
+
+        :return:
+        """
+        for result in results:
+            if 'title' in list(result['data'].keys()):
+                if re.match('{0:s}: .*'.format(key), result['data']['title']):
+                    return ''.join(re.split(r'{0:s}: '.format(key), result['data']['title'])[1:]).rstrip("\n") \
+                        .split('\n')
+        return ''
+
+    def test_key_index(self):
+        """Test that the indexed lookups return the same values as the previous implementation
+
+        :return:
+        """
+        with open(os.path.join(RESOURCES_DIRECTORY, 'search_results.html'), 'r', encoding='utf-8') as f:
+            dicts = SoupResultParser().parse(f.read())['results']
+        results = [SauceNaoResult.from_dict(res) for res in dicts]
+
+        self.assertEqual(results[0].content_index, {'Material': ('original', 'Characters: original girl'),
+                                                    'Characters': ('original girl',)})
+        self.assertEqual(results[0].title_index, {'Creator': ('hiten (hitenkei)',)})
+
+        keys = {key for res in results for key in list(res.content_index) + list(res.title_index)}
+        # keys inside of lines, containing pattern characters or the separator and unknown keys
+        keys.update(('ID', 'Member', 'Creator(s)', 'Creator: hiten', 'Creator.', 'unknown'))
+        for key in keys:
+            with self.subTest(key=key):
+                for index in range(len(results)):
+                    self.assertEqual(SauceNao.get_content_value(results[index:], key),
+                                     self.get_content_value(dicts[index:], key))
+                    self.assertEqual(SauceNao.get_title_value(results[index:], key),
+                                     self.get_title_value(dicts[index:], key))
+                    self.assertEqual(SauceNao.get_content_value(dicts[index:], key),
+                                     self.get_content_value(dicts[index:], key))
+
+    def test_build_content_index(self):
+        """Test that the values of plain keys are taken from their line and equal the extracted values
+
+        :return:
+        """
+        content = ['Source: title Part: 1\n', 'Part: 2\nMember: artist\nx+: y\n', 'Member: other\n']
+        with mock.patch('saucenao.result.extract_content_value', wraps=extract_content_value) as extract:
+            index = build_content_index(content)
+        # only the key also contained in a previous line and the key with pattern characters are extracted
+        self.assertEqual(sorted(call.args[1] for call in extract.call_args_list), ['Part', 'x+'])
+
+        self.assertEqual(index, {key: tuple(extract_content_value(content, key))
+                                 for key in ('Source', 'Part', 'Member')})
+        self.assertEqual(index['Part'], ('1',))
+
+    def test_batch_values(self):
+        """Test the batch form of the value lookups over the results of multiple files
+
+        :return:
+        """
+        result_sets = [[SauceNaoResult.from_dict(self.HTML_RESULT)], [], [self.JSON_RESULT]]
+        self.assertEqual(SauceNao.get_content_values(result_sets, SauceNao.CONTENT_CATEGORY_KEY),
+                         [['original', 'Characters: original girl'], '', ''])
+        self.assertEqual(SauceNao.get_title_values(result_sets, SauceNao.CONTENT_AUTHOR_KEY),
+                         [['hiten (hitenkei)'], '', ''])
+
+    def test_enrich_result(self):
+        """Test that the fields of the HTML response get derived from the recorded JSON API response
+
+        :return:
+        """
+        with open(os.path.join(RESOURCES_DIRECTORY, 'search_results.json'), 'r', encoding='utf-8') as f:
+            response = json.load(f)
+        with open(os.path.join(RESOURCES_DIRECTORY, 'search_results.html'), 'r', encoding='utf-8') as f:
+            html_results = SoupResultParser().parse(f.read())['results']
+
+        results = [SauceNaoResult.from_dict(enrich_result(res)) for res in response['results']]
+        # the categorisation values are the same as the values of the HTML response of the same search
+        for index in (0, 1, 5):
+            self.assertEqual(results[index].creator, SauceNaoResult.from_dict(html_results[index]).creator)
+            self.assertEqual(results[index].material, SauceNaoResult.from_dict(html_results[index]).material)
+            self.assertEqual(results[index].characters, SauceNaoResult.from_dict(html_results[index]).characters)
+
+        # the fields of the JSON API response are kept
+        self.assertEqual(results[0]['header']['index_id'], 9)
+        self.assertEqual(results[0]['data']['danbooru_id'], 3074432)
+        self.assertEqual(results[0].ext_urls, tuple(response['results'][0]['data']['ext_urls']))
+        self.assertEqual(results[1].title, '夏の日 & ひまわり')
+        self.assertEqual(results[1].get_content_value('Member'), ('Hiten',))
+        self.assertEqual(results[4].content, ('Source: (C94) [Circle (Author)] Title (Original) [English]\n'
+                                              'Creator(s): author\n',))
+
+        # fields which can't be derived are flagged explicitly
+        self.assertEqual([res['header'][MISSING_FIELDS_KEY] for res in results],
+                         [[], [], ['title'], [], ['title'], [], [], ['title', 'content']])
+        # the passed result isn't modified
+        self.assertNotIn(MISSING_FIELDS_KEY, response['results'][0]['header'])
+
+    def test_parse_results(self):
+        """Test that the parsed results are result objects sorted by their similarity
+
+        :return:
+        """
+        results = SauceNao.parse_results({'header': {}, 'results': [self.JSON_RESULT, self.HTML_RESULT]})
+        self.assertTrue(all(isinstance(res, SauceNaoResult) for res in results))
+        self.assertEqual(results, [self.HTML_RESULT, self.JSON_RESULT])
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestSauceNaoResult)
+    unittest.TextTestRunner(verbosity=2).run(suite)
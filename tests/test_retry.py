@@ -0,0 +1,152 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import asyncio
+import io
+import json
+import time
+import unittest
+
+import requests_mock
+
+from saucenao import AsyncWorker, SauceNao, Worker
+from saucenao.exceptions import UnknownStatusCodeException
+from saucenao.limiter import TokenBucketLimiter
+from saucenao.retry import RetryPolicy, RetryScheduler
+
+
+class TestRetry(unittest.TestCase):
+    """
+    test cases for the retry policy and the deferred retries of the worker
+    """
+
+    @staticmethod
+    def register_flaky_response(mock, failing_payloads):
+        """Register a response failing once with a status code to repeat for every payload in failing_payloads,
+        returns the list the request bodies get collected in
+
+        :return:
+        """
+
+        def callback(request, context):
+            body = b''.join(iter(request.body.read, b''))
+            bodies.append(body)
+            for payload in failing_payloads:
+                if payload in body:
+                    failing_payloads.remove(payload)
+                    context.status_code = 503
+                    return ''
+            return json.dumps({'header': {}, 'results': [
+                {'header': {'similarity': '90.00'}, 'data': {'title': str(body.count(b'\x01'))}}
+            ]})
+
+        bodies = []
+        mock.post(SauceNao.SEARCH_POST_URL, text=callback)
+        return bodies
+
+    def test_policy(self):
+        """Test the exponential backoff with jitter and the retry budget
+
+        :return:
+        """
+        policy = RetryPolicy(max_retries=3, base_delay=1, max_delay=3, jitter=0.5)
+        self.assertTrue(policy.can_retry(3))
+        self.assertFalse(policy.can_retry(4))
+        for attempt, expected_delay in ((1, 1), (2, 2), (3, 3), (4, 3)):
+            delay = policy.get_delay(attempt)
+            self.assertLessEqual(delay, expected_delay)
+            self.assertGreaterEqual(delay, expected_delay / 2)
+
+    def test_scheduler(self):
+        """Test that deferred items are only returned once they are ready
+
+        :return:
+        """
+        scheduler = RetryScheduler(RetryPolicy(base_delay=0.05, jitter=0))
+        scheduler.defer('later', 2)
+        scheduler.defer('sooner', 1)
+        self.assertEqual(len(scheduler), 2)
+        self.assertEqual(list(scheduler.pop_ready()), [])
+
+        time.sleep(scheduler.time_until_ready())
+        self.assertEqual(list(scheduler.pop_ready()), [('sooner', 1)])
+        time.sleep(scheduler.time_until_ready())
+        self.assertEqual(list(scheduler.pop_ready()), [('later', 2)])
+        self.assertFalse(scheduler)
+
+    @requests_mock.mock()
+    def test_blocking_retry(self, mock):
+        """Test the blocking retries of check_file_object and the exhausted retry budget
+
+        :return:
+        """
+        bodies = self.register_flaky_response(mock, [b'\x00'])
+        saucenao = SauceNao(output_type=SauceNao.API_JSON_TYPE, retry_policy=RetryPolicy(base_delay=0.01),
+                            limiter=TokenBucketLimiter(limit=100, period=1, burst=10))
+        self.assertEqual(len(saucenao.check_file_object(io.BytesIO(b'\x00'))), 1)
+        self.assertEqual(mock.call_count, 2)
+        # the repeated request uploaded the file again
+        self.assertIn(b'\r\n\r\n\x00\r\n', bodies[1])
+
+        mock.post(SauceNao.SEARCH_POST_URL, status_code=503)
+        saucenao.retry_policy = RetryPolicy(max_retries=2, base_delay=0.01)
+        with self.assertRaises(UnknownStatusCodeException):
+            saucenao.check_file_object(io.BytesIO(b'\x00'))
+        self.assertEqual(mock.call_count, 5)
+
+    @requests_mock.mock()
+    def test_deferred_retry(self, mock):
+        """Test that the worker continues with the other files while a throttled file waits for its retry
+
+        :return:
+        """
+        self.register_flaky_response(mock, [b'\x01'])
+        worker = Worker(files=(io.BytesIO(b'\x01'), io.BytesIO(b'\x01\x01')), output_type=SauceNao.API_JSON_TYPE,
+                        retry_policy=RetryPolicy(base_delay=0.05),
+                        limiter=TokenBucketLimiter(limit=100, period=1, burst=10))
+        results = list(worker.run())
+        self.assertEqual([result['results'][0]['data']['title'] for result in results], ['2', '1'])
+        self.assertEqual(mock.call_count, 3)
+
+
+    @requests_mock.mock()
+    def test_retry_offset(self, mock):
+        """Test that the retries of streams positioned at an offset upload the same payload as the first attempt
+
+        :return:
+        """
+        for stream_type in (io.BytesIO, lambda content: io.BufferedReader(io.BytesIO(content))):
+            for worker_type in (Worker, AsyncWorker):
+                with self.subTest(stream_type=stream_type, worker_type=worker_type):
+                    bodies = self.register_flaky_response(mock, [b'PAYLOAD'])
+                    stream = stream_type(b'HEADERxxPAYLOAD')
+                    stream.seek(len(b'HEADERxx'))
+                    worker = worker_type(files=[stream], output_type=SauceNao.API_JSON_TYPE,
+                                         retry_policy=RetryPolicy(base_delay=0.01),
+                                         limiter=TokenBucketLimiter(limit=100, period=1, burst=10))
+                    if worker_type is AsyncWorker:
+                        loop = asyncio.new_event_loop()
+                        try:
+                            loop.run_until_complete(self.collect(worker))
+                        finally:
+                            loop.close()
+                    else:
+                        list(worker.run())
+
+                    self.assertEqual(len(bodies), 2)
+                    for body in bodies:
+                        self.assertIn(b'\r\n\r\nPAYLOAD\r\n', body)
+                        self.assertNotIn(b'HEADER', body)
+
+    @staticmethod
+    async def collect(worker) -> list:
+        """Collect the results of the async worker
+
+        :return:
+        """
+        with worker:
+            return [result async for result in worker.run()]
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestRetry)
+    unittest.TextTestRunner(verbosity=2).run(suite)
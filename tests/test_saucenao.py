@@ -3,12 +3,20 @@
 import io
 import os
 import shutil
+import json
+import threading
 import unittest
+from unittest import mock
 from uuid import uuid4
 
+import requests
+import requests_mock
 from PIL import Image
 
-from saucenao import SauceNao
+from saucenao import SauceNao, codec
+from saucenao.exceptions import RetryLaterException
+from saucenao.limiter import TokenBucketLimiter
+from saucenao.retry import RetryPolicy
 
 
 class TestSauceNao(unittest.TestCase):
@@ -66,6 +74,194 @@ class TestSauceNao(unittest.TestCase):
         self.assertIsInstance(results, list)
         print(results)
 
+    def test_session_reuse(self):
+        """Test that all requests are sent over the passed session and transport adapter
+
+        :return:
+        """
+        adapter = requests_mock.Adapter()
+        adapter.register_uri('POST', SauceNao.SEARCH_POST_URL, text=json.dumps({'header': {}, 'results': []}))
+
+        session = requests.Session()
+        saucenao = SauceNao(session=session, adapter=adapter, output_type=SauceNao.API_JSON_TYPE,
+                            limiter=TokenBucketLimiter(limit=10, period=1, burst=10))
+        self.assertIs(saucenao.session, session)
+
+        saucenao.check_file_object(io.BytesIO(b'\x00'))
+        saucenao.check_file_object(io.BytesIO(b'\x00'))
+        self.assertEqual(adapter.call_count, 2)
+
+        # passed sessions are owned by the caller and stay usable
+        saucenao.close()
+        self.assertIs(session.get_adapter(SauceNao.SEARCH_POST_URL), adapter)
+
+    def test_combine_api_types(self):
+        """Test that the HTML and JSON request of combined API types are sent concurrently and get merged
+
+        :return:
+        """
+        # both requests have to arrive before either of them gets answered
+        barrier = threading.Barrier(2, timeout=5)
+        bodies = []
+
+        def callback(request, context):
+            bodies.append(b''.join(iter(request.body.read, b'')))
+            barrier.wait()
+            if 'output_type={0:d}'.format(SauceNao.API_JSON_TYPE) in request.url:
+                return json.dumps({'header': {}, 'results': [
+                    {'header': {'similarity': '93.20', 'index_id': 5}, 'data': {'member_name': 'author'}}
+                ]})
+            return '<table><tr><td class="resulttablecontent">' \
+                   '<div class="resultsimilarityinfo">93.20%</div><div class="resultmiscinfo"></div>' \
+                   '<div class="resultcontent"><div class="resulttitle">title</div>' \
+                   '<div class="resultcontentcolumn">Material: original</div></div></td></tr></table>'
+
+        # both searches are taken at once from the default limiters with a burst of a single search
+        for kwargs in ({}, {'api_keys': ['key']}):
+            with self.subTest(**kwargs):
+                bodies.clear()
+                # the mocker of requests_mock serializes all requests, so mount the adapter directly
+                adapter = requests_mock.Adapter()
+                adapter.register_uri('POST', SauceNao.SEARCH_POST_URL, text=callback)
+                saucenao = SauceNao(combine_api_types=True, adapter=adapter, **kwargs)
+                with mock.patch('time.sleep', side_effect=AssertionError('unexpected wait')):
+                    results = saucenao.check_file_object(io.BytesIO(b'\x00'))
+
+                self.assertEqual(adapter.call_count, 2)
+                for body in bodies:
+                    self.assertIn(b'\r\n\r\n\x00\r\n', body)
+                self.assertEqual(results[0]['header'], {'similarity': '93.20', 'index_id': 5})
+                self.assertEqual(results[0]['data']['title'], 'title')
+                self.assertEqual(results[0]['data']['member_name'], 'author')
+
+                # the following search waits for both taken searches
+                limiter = saucenao.key_pool.keys[0].limiter if saucenao.key_pool else saucenao.limiter
+                self.assertGreater(limiter.time_until_available(), 30 / limiter.limit)
+
+    def test_enrich_results(self):
+        """Test that enriched results provide the fields of combined API types with a single JSON request
+
+        :return:
+        """
+        adapter = requests_mock.Adapter()
+        adapter.register_uri('POST', SauceNao.SEARCH_POST_URL, text=json.dumps({'header': {}, 'results': [
+            {'header': {'similarity': '93.20', 'index_id': 9},
+             'data': {'ext_urls': ['https://danbooru.donmai.us/post/show/1'], 'creator': 'artist',
+                      'material': 'original', 'characters': 'girl'}}
+        ]}))
+        saucenao = SauceNao(enrich_results=True, combine_api_types=True, adapter=adapter,
+                            limiter=TokenBucketLimiter(limit=10, period=1, burst=10))
+        # enriched results replace the combined API types, so the limit isn't halved
+        self.assertFalse(saucenao.combine_api_types)
+        self.assertEqual(saucenao.search_limit_30s, SauceNao.LIMIT_30_SECONDS[SauceNao.ACCOUNT_TYPE_UNREGISTERED])
+
+        results = saucenao.check_file_object(io.BytesIO(b'\x00'))
+        self.assertEqual(adapter.call_count, 1)
+        self.assertIn('output_type={0:d}'.format(SauceNao.API_JSON_TYPE), adapter.last_request.url)
+        self.assertEqual(results[0]['header']['index_id'], 9)
+        self.assertEqual(results[0]['header']['missing_fields'], [])
+        self.assertEqual(results[0]['data']['title'], 'Creator: artist')
+        self.assertEqual(SauceNao.get_content_value(results, SauceNao.CONTENT_CATEGORY_KEY), ['original',
+                                                                                               'Characters: girl'])
+        self.assertEqual(SauceNao.get_title_value(results, SauceNao.CONTENT_AUTHOR_KEY), ['artist'])
+
+    def test_parse_results_html(self):
+        """Test that the HTML results get parsed into the structure of the JSON API response
+
+        :return:
+        """
+        html = '<table><tr><td class="resulttablecontent">' \
+               '<div class="resultsimilarityinfo">88.10%</div><div class="resultmiscinfo">' \
+               '<a href="https://danbooru.donmai.us/post/show/1"></a></div>' \
+               '<div class="resultcontent"><div class="resulttitle">Creator: artist</div>' \
+               '<div class="resultcontentcolumn">Material: original<br/>Characters: girl</div></div>' \
+               '</td></tr></table>'
+
+        results = SauceNao.parse_results_html(html)
+        self.assertEqual(results, {'header': {}, 'results': [{
+            'header': {'similarity': '88.10'},
+            'data': {
+                'title': 'Creator: artist',
+                'content': ['Material: original\nCharacters: girl'],
+                'ext_urls': ['https://danbooru.donmai.us/post/show/1']
+            }
+        }]})
+
+        # the serialized form stays available for backwards compatibility in the format of the json module
+        self.assertEqual(json.loads(SauceNao.parse_results_html_to_json(html)), results)
+        with mock.patch.object(codec, 'dumps', side_effect=lambda obj: json.dumps(obj, separators=(',', ':'))):
+            self.assertEqual(SauceNao.parse_results_html_to_json(html), json.dumps(results))
+        self.assertEqual(SauceNao.parse_results_json(SauceNao.parse_results_html_to_json(html)),
+                         SauceNao.parse_results(results))
+
+    def test_minimum_similarity_and_max_results(self):
+        """Test that the results are filtered while parsing and the filter of the results agrees with it
+
+        :return:
+        """
+        response = {'header': {}, 'results': [
+            {'header': {'similarity': '50.00'}, 'data': {}},
+            {'header': {'similarity': '90.00'}, 'data': {}},
+            {'header': {'similarity': '70.00'}, 'data': {}},
+            {'header': {'similarity': '90.00'}, 'data': {'first': False}},
+        ]}
+        self.assertEqual(SauceNao.parse_results(response, minimum_similarity=65, limit=2),
+                         [response['results'][1], response['results'][3]])
+        self.assertEqual(SauceNao.parse_results(response, minimum_similarity=65), SauceNao.parse_results(response)[:3])
+
+        adapter = requests_mock.Adapter()
+        adapter.register_uri('POST', SauceNao.SEARCH_POST_URL, text=json.dumps(response))
+        saucenao = SauceNao(adapter=adapter, output_type=SauceNao.API_JSON_TYPE, minimum_similarity=65, max_results=2,
+                            limiter=TokenBucketLimiter(limit=10, period=1, burst=10))
+        results = saucenao.check_file_object(io.BytesIO(b'\x00'))
+        self.assertEqual([res['header']['similarity'] for res in results], ['90.00', '90.00'])
+
+    def test_stream_responses(self):
+        """Test that streamed HTML responses result in the same results as completely read responses
+
+        :return:
+        """
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources', 'search_results.html'),
+                  'rb') as f:
+            content = f.read()
+
+        adapter = requests_mock.Adapter()
+        # without declared charset the page has to get decoded as UTF-8
+        adapter.register_uri('POST', SauceNao.SEARCH_POST_URL, content=content, headers={'Content-Type': 'text/html'})
+        results = []
+        for stream_responses in (False, True):
+            saucenao = SauceNao(adapter=adapter, stream_responses=stream_responses, parser_engine='html',
+                                limiter=TokenBucketLimiter(limit=10, period=1, burst=10))
+            results.append(saucenao.check_file_object(io.BytesIO(b'\x00')))
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual([res.similarity for res in results[1]], [94.26, 93.87, 87.12, 72.40, 66.01])
+        self.assertEqual(results[1][1].title, '夏の日 & ひまわり')
+
+    def test_stream_responses_closed(self):
+        """Test that streamed responses are closed on every path, so their connections return to the pool
+
+        :return:
+        """
+        adapter = requests_mock.Adapter()
+        adapter.register_uri('POST', SauceNao.SEARCH_POST_URL, [
+            {'status_code': 500},
+            {'status_code': 413},
+            {'text': json.dumps({'header': {}, 'results': []})},
+        ])
+        saucenao = SauceNao(adapter=adapter, stream_responses=True, output_type=SauceNao.API_JSON_TYPE,
+                            limiter=TokenBucketLimiter(limit=10, period=1, burst=10),
+                            retry_policy=RetryPolicy(max_retries=0))
+        saucenao.defer_retries = True
+
+        with mock.patch.object(requests.Response, 'close', autospec=True, side_effect=requests.Response.close) \
+                as close:
+            # retried, skipped and parsed responses
+            self.assertRaises(RetryLaterException, saucenao.check_file_object, io.BytesIO(b'\x00'))
+            self.assertEqual(saucenao.check_file_object(io.BytesIO(b'\x00')), [])
+            self.assertEqual(saucenao.check_file_object(io.BytesIO(b'\x00')), [])
+            self.assertEqual(close.call_count, 3)
+
 
 if __name__ == '__main__':
     suite = unittest.TestLoader().loadTestsFromTestCase(TestSauceNao)
@@ -0,0 +1,122 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import io
+import os
+import shutil
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from uuid import uuid4
+
+import requests
+
+from saucenao.upload import MultipartUpload, UploadBuffer
+
+
+class EchoRequestHandler(BaseHTTPRequestHandler):
+    """
+    request handler answering with the received body
+    """
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestUpload(unittest.TestCase):
+    """
+    test cases for the streamed multipart uploads
+    """
+
+    PAYLOAD = bytes(range(256)) * 1024
+
+    def setUp(self):
+        """Constructor for unittest classes
+
+        :return:
+        """
+        directory = str(uuid4())
+        os.mkdir(directory)
+        self.directory = os.path.abspath(directory)
+        self.file_path = os.path.join(self.directory, 'payload')
+        with open(self.file_path, 'wb') as file_object:
+            file_object.write(self.PAYLOAD)
+
+    def tearDown(self):
+        """Destructor for unittest classes
+
+        :return:
+        """
+        shutil.rmtree(self.directory)
+
+    def test_upload_buffer(self):
+        """Test the buffer views of files, in-memory streams and other streams
+
+        :return:
+        """
+        with open(self.file_path, 'rb') as file_object:
+            with UploadBuffer(file_object) as upload_buffer:
+                self.assertEqual(upload_buffer.view, self.PAYLOAD)
+            # the file itself doesn't get consumed
+            self.assertEqual(file_object.tell(), 0)
+
+        file_object = io.BytesIO(self.PAYLOAD)
+        file_object.seek(10)
+        with UploadBuffer(file_object) as upload_buffer:
+            self.assertEqual(len(upload_buffer), len(self.PAYLOAD) - 10)
+        # the buffer export got released again
+        file_object.write(b'\x00')
+
+        with UploadBuffer(io.BufferedReader(io.BytesIO(b'\x00\x01'))) as upload_buffer:
+            self.assertEqual(upload_buffer.view, b'\x00\x01')
+
+        with open(os.path.join(self.directory, 'empty'), 'w+b') as empty_file:
+            with UploadBuffer(empty_file) as upload_buffer:
+                self.assertEqual(len(upload_buffer), 0)
+
+    def test_multipart_upload(self):
+        """Test the streamed body of the multipart upload
+
+        :return:
+        """
+        with UploadBuffer(io.BytesIO(b'\x00\x01')) as upload_buffer:
+            body = MultipartUpload(upload_buffer)
+            content = b''.join(iter(lambda: body.read(3), b''))
+
+        self.assertEqual(len(content), len(body))
+        self.assertEqual(content, (
+            '--{0:s}\r\nContent-Disposition: form-data; name="file"; filename="file"\r\n'
+            'Content-Type: application/octet-stream\r\n\r\n\x00\x01\r\n--{0:s}--\r\n'
+        ).format(body.boundary).encode('utf-8'))
+
+    def test_streamed_request(self):
+        """Test the upload of a memory mapped file over a real connection
+
+        :return:
+        """
+        server = HTTPServer(('127.0.0.1', 0), EchoRequestHandler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            with open(self.file_path, 'rb') as file_object, UploadBuffer(file_object) as upload_buffer:
+                body = MultipartUpload(upload_buffer)
+                response = requests.post('http://127.0.0.1:{0:d}'.format(server.server_port), data=body,
+                                         headers={'Content-Type': body.content_type})
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+        self.assertEqual(response.request.headers['Content-Length'], str(len(response.content)))
+        self.assertIn(b'\r\n\r\n' + self.PAYLOAD + b'\r\n', response.content)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestUpload)
+    unittest.TextTestRunner(verbosity=2).run(suite)